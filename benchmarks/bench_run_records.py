@@ -0,0 +1,72 @@
+"""Measure resident memory retained per 100k agent runs.
+
+Compares the original layout (a ``RunRecord`` dataclass, a separate log-entry
+dict with an ISO timestamp string, and ``last_output`` copied into the agent's
+notes) with the slotted ``RunRecord`` now kept in ``RunHistory``.
+
+Run with ``python benchmarks/bench_run_records.py [runs]``.
+"""
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from selfaware_ai_bank.core.history import RunHistory, RunRecord  # noqa: E402
+
+
+@dataclass
+class LegacyRunRecord:
+    agent: str
+    timestamp: datetime
+    output: Dict[str, Any]
+
+
+def legacy_runs(runs: int, outputs) -> list:
+    history = []
+    notes = {}
+    for idx in range(runs):
+        output = outputs[idx]
+        notes["last_output"] = output
+        record = LegacyRunRecord(agent="Agent", timestamp=datetime.now(timezone.utc), output=output)
+        log_entry = {"agent": record.agent, "timestamp": record.timestamp.isoformat(), "output": record.output}
+        log_entry["confidence"] = float(output["confidence"])
+        history.append(log_entry)
+    return history
+
+
+def slotted_runs(runs: int, outputs) -> RunHistory:
+    history = RunHistory()
+    for idx in range(runs):
+        history.append(RunRecord("Agent", time.time_ns(), outputs[idx]))
+    return history
+
+
+def measure(func, runs: int, outputs) -> int:
+    tracemalloc.start()
+    retained = func(runs, outputs)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return current
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    # Outputs are allocated up front: both layouts reference them, neither should be charged for them.
+    outputs = [{"status": "success", "confidence": 0.75} for _ in range(runs)]
+    legacy = measure(legacy_runs, runs, outputs)
+    slotted = measure(slotted_runs, runs, outputs)
+    print(f"{runs} runs")
+    print(f"legacy   {legacy / 1024 / 1024:8.2f} MiB")
+    print(f"slotted  {slotted / 1024 / 1024:8.2f} MiB  ({1 - slotted / legacy:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,11 @@ from pprint import pprint
 from typing import Iterable, Optional
 
 from selfaware_ai_bank import SelfAwareAIBank
-from selfaware_ai_bank.agents import CreditRiskAnalyzer, LiquidityOptimizer, StressTester
+from selfaware_ai_bank.agents import ColumnarPortfolio, CreditRiskAnalyzer, LiquidityOptimizer, StressTester
+from selfaware_ai_bank.agents.finance import CreditBook
+from selfaware_ai_bank.agents.finance.ingest import PortfolioSource, load_liquidity_levels, portfolio_chunks
+from selfaware_ai_bank.agents.finance.snapshot import read_snapshot
+from selfaware_ai_bank.core.run_log import RunLogWriter
 from selfaware_ai_bank.cyber_os_v5 import MatrixServer, SYNONYM_GROUPS, SecureBankSystem, scan_network
 
 
@@ -22,6 +26,14 @@ def calculate_total_liquidity(context: dict) -> float:
 def identify_high_risk_exposures(context: dict, threshold: float) -> list[dict]:
     # Self-awareness: Filtering exposures to focus attention on elevated portfolio risk.
     exposures = context.get("credit_portfolio", [])
+    if isinstance(exposures, (PortfolioSource, ColumnarPortfolio, CreditBook)):
+        # Filter on the probability column and expand only the matching rows.
+        return [
+            chunk.record(idx)
+            for chunk in portfolio_chunks(exposures)
+            for idx, probability in enumerate(chunk.prob_default)
+            if probability >= threshold
+        ]
     return [item for item in exposures if item.get("prob_default", 0.0) >= threshold]
 
 
@@ -72,20 +84,56 @@ def parse_args(args: Optional[Iterable[str]] = None) -> argparse.Namespace:
         type=Path,
         help="Optional file path for saving the introspection summary as JSON.",
     )
+    parser.add_argument(
+        "--run-log",
+        type=Path,
+        help="Optional directory for an append-only log of every agent run.",
+    )
     parser.add_argument(
         "--no-markdown",
         action="store_true",
         help="Disable auto-loading of markdown-defined agents.",
     )
+    parser.add_argument(
+        "--markdown-cache",
+        type=Path,
+        help="Optional cache file for parsed markdown roles; warm starts skip unchanged files.",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Run agents concurrently (threads for I/O-bound, processes for CPU-bound agents).",
+    )
+    parser.add_argument(
+        "--portfolio",
+        type=Path,
+        help="Stream the credit portfolio from a .csv, .jsonl or .parquet file instead of the demo data.",
+    )
+    parser.add_argument(
+        "--liquidity",
+        type=Path,
+        help="Load liquidity levels from an account,balance .csv, .jsonl or .parquet file.",
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        help="Memory-map the portfolio and liquidity levels from a binary context snapshot.",
+    )
     parser.add_argument(
         "--cyber-os",
         action="store_true",
         help="Run the interactive CYBER-OS v5.0 gameplay loop.",
     )
+    parser.add_argument(
+        "--matrix-backend",
+        choices=MatrixServer.BACKENDS,
+        default="threading",
+        help="Server backend for the CYBER-OS Matrix interface.",
+    )
     return parser.parse_args(args=args)
 
 
-def run_cyber_os() -> None:
+def run_cyber_os(backend: str = "threading") -> None:
     bank = SecureBankSystem()
     web = MatrixServer(bank)
 
@@ -95,7 +143,7 @@ def run_cyber_os() -> None:
         if command == "help":
             print("Modules: net-up, net-down, scan, bank, status, exit")
         elif command == "net-up":
-            web.start()
+            web.start(backend=backend)
             print("Public Matrix Interface online on http://localhost:8080")
         elif command == "net-down":
             web.stop()
@@ -133,7 +181,7 @@ def run_cyber_os() -> None:
             print("ERROR: Command not found. Type 'help'.")
 
 
-def load_markdown_agents(bank: SelfAwareAIBank, enable_markdown: bool) -> None:
+def load_markdown_agents(bank: SelfAwareAIBank, enable_markdown: bool, cache_path: Optional[Path] = None) -> None:
     # Self-awareness: Respecting user choice about dynamic agent creation.
     if not enable_markdown:
         return
@@ -142,7 +190,7 @@ def load_markdown_agents(bank: SelfAwareAIBank, enable_markdown: bool) -> None:
     if not docs_path.exists():
         return
 
-    markdown_specs = bank.load_markdown_roles(*docs_path.rglob("*.md"))
+    markdown_specs = bank.load_markdown_roles(*docs_path.rglob("*.md"), cache_path=cache_path)
     bank.load_agents_from_specs(markdown_specs)
 
 
@@ -159,26 +207,41 @@ def main(argv: Optional[Iterable[str]] = None) -> None:
     args = parse_args(argv)
 
     if args.cyber_os:
-        run_cyber_os()
+        run_cyber_os(args.matrix_backend)
         return
 
-    bank = SelfAwareAIBank(context=build_demo_context())
-    bank.register_agents(
-        [
-            LiquidityOptimizer(target_buffer=args.target_buffer),
-            CreditRiskAnalyzer(high_risk_threshold=args.high_risk_threshold),
-            StressTester(),
-        ]
-    )
-
-    load_markdown_agents(bank, enable_markdown=not args.no_markdown)
-
-    print("Running SelfAware AI Bank demo...\n")
-    results = bank.run_all()
-    for agent_name, output in results:
-        print(f"Agent: {agent_name}")
-        pprint(output)
-        print()
+    context = build_demo_context()
+    if args.snapshot:
+        context.update(read_snapshot(args.snapshot))
+    if args.portfolio:
+        context["credit_portfolio"] = PortfolioSource(args.portfolio)
+    if args.liquidity:
+        context["liquidity_levels"] = load_liquidity_levels(args.liquidity)
+
+    run_log = RunLogWriter(args.run_log) if args.run_log else None
+    bank = SelfAwareAIBank(context=context, run_sink=run_log)
+    try:
+        bank.register_agents(
+            [
+                LiquidityOptimizer(target_buffer=args.target_buffer),
+                CreditRiskAnalyzer(high_risk_threshold=args.high_risk_threshold),
+                StressTester(),
+            ]
+        )
+
+        load_markdown_agents(bank, enable_markdown=not args.no_markdown, cache_path=args.markdown_cache)
+
+        print("Running SelfAware AI Bank demo...\n")
+        results = bank.run_all(mode="parallel" if args.parallel else "sequential")
+        for agent_name, output in results:
+            print(f"Agent: {agent_name}")
+            pprint(output)
+            print()
+    finally:
+        # Release worker pools and flush the run log even when the run fails.
+        bank.close()
+        if run_log is not None:
+            run_log.close()
 
     summary = bank.summary()
     maybe_write_summary(args.summary_path, summary)
@@ -1,7 +1,9 @@
 """Agent collection exports."""
 # Self-awareness: Keeping the public surface consistent as new insights arrive.
 from .finance.credit_risk_analyzer import CreditRiskAnalyzer
+from .finance.ingest import PortfolioSource
+from .finance.portfolio import ColumnarPortfolio
 from .finance.liquidity_optimizer import LiquidityOptimizer
 from .finance.stress_tester import StressTester
 
-__all__ = ["CreditRiskAnalyzer", "LiquidityOptimizer", "StressTester"]
+__all__ = ["ColumnarPortfolio", "CreditRiskAnalyzer", "LiquidityOptimizer", "PortfolioSource", "StressTester"]
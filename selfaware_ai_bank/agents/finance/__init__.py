@@ -0,0 +1,19 @@
+"""Finance agents and the portfolio structures they share."""
+from .breakdown import GroupByAccumulator
+from .credit_book import CreditBook
+from .ingest import PortfolioSource, iter_portfolio_chunks, load_liquidity_levels
+from .portfolio import ColumnarPortfolio, RiskAccumulator
+from .snapshot import MappedPortfolio, read_snapshot, write_snapshot
+
+__all__ = [
+    "ColumnarPortfolio",
+    "CreditBook",
+    "GroupByAccumulator",
+    "MappedPortfolio",
+    "PortfolioSource",
+    "RiskAccumulator",
+    "iter_portfolio_chunks",
+    "load_liquidity_levels",
+    "read_snapshot",
+    "write_snapshot",
+]
@@ -0,0 +1,245 @@
+"""Credit portfolio that maintains its risk aggregates under row-level deltas."""
+from __future__ import annotations
+
+import threading
+from array import array
+from bisect import bisect_left, insort
+from itertools import count, repeat
+from math import fsum
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from .portfolio import ATTRIBUTE_COLUMNS, ColumnarPortfolio
+
+# (sequence number, exposure, prob_default, loss_given_default); the sequence keeps book order.
+_Row = Tuple[int, float, float, float]
+_BOOK_IDS = count()
+
+
+class CreditBook:
+    """Exposures keyed by name with running expected-loss totals.
+
+    :meth:`add`, :meth:`update` and :meth:`remove` adjust the expected loss
+    and PD sum by the delta of the touched row and keep a ``(PD, position)``
+    index sorted, so :meth:`risk_summary` costs O(flagged rows) for any
+    threshold instead of a full scan. Every ``recompute_every`` deltas the
+    totals are rebuilt with ``math.fsum`` to stop floating-point drift.
+
+    Rows keep their segment attributes (``sector``, ``region``, ...), so
+    breakdowns over a book match those over the portfolio it came from.
+
+    Placing a book under ``credit_portfolio`` lets ``CreditRiskAnalyzer`` use it
+    directly. The book mutates in place: call ``update_context`` with it after
+    a batch of deltas so dependants see the change. Deltas and queries take
+    :attr:`lock`, so agents reading the book while another thread applies
+    deltas see each call complete; hold ``lock`` around several queries that
+    must agree with each other.
+    """
+
+    def __init__(self, *, recompute_every: int = 10_000) -> None:
+        if recompute_every <= 0:
+            raise ValueError("recompute_every must be positive.")
+        self.recompute_every = recompute_every
+        self.version = 0
+        self.lock = threading.RLock()
+        self._book_id = next(_BOOK_IDS)
+        self._rows: Dict[str, _Row] = {}
+        self._attributes: Dict[str, Dict[str, str]] = {}
+        self._names: Dict[int, str] = {}
+        self._index: List[Tuple[float, int]] = []
+        self._next_seq = 0
+        self._expected_loss = 0.0
+        self._probability_sum = 0.0
+        self._pending_deltas = 0
+
+    @classmethod
+    def from_portfolio(
+        cls, portfolio: Union[ColumnarPortfolio, Iterable[Mapping[str, Any]], None], **kwargs: Any
+    ) -> "CreditBook":
+        book = cls(**kwargs)
+        columns = ColumnarPortfolio.coerce(portfolio)
+        keys = list(columns.attributes)
+        attribute_rows = zip(*columns.attributes.values()) if keys else repeat(())
+        for row, values in zip(
+            zip(columns.names, columns.exposure, columns.prob_default, columns.loss_given_default), attribute_rows
+        ):
+            if row[0] in book._rows:
+                raise ValueError(f"Duplicate exposure name {row[0]!r}; a credit book is keyed by name.")
+            book._insert(*row, dict(zip(keys, values)))
+        book.recompute()
+        return book
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        with self.lock:
+            return iter(list(self._rows))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks do not pickle; a copy in a worker process gets its own.
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def __fingerprint__(self):
+        # Hook for ``core.memo.fingerprint``: the book changes only through versioned deltas.
+        return (self._book_id, self.version)
+
+    # ------------------------------------------------------------------
+    # Deltas
+    # ------------------------------------------------------------------
+    def add(
+        self, name: str, exposure: float, prob_default: float, loss_given_default: float, **attributes: Optional[str]
+    ) -> None:
+        """Add an exposure; keyword arguments set its ``sector``/``region``/... attributes."""
+        with self.lock:
+            if name in self._rows:
+                raise ValueError(f"Exposure {name!r} is already in the book.")
+            self._insert(name, exposure, prob_default, loss_given_default, _checked(attributes))
+            self._applied()
+
+    def update(
+        self,
+        name: str,
+        *,
+        exposure: Optional[float] = None,
+        prob_default: Optional[float] = None,
+        loss_given_default: Optional[float] = None,
+        attributes: Optional[Mapping[str, Optional[str]]] = None,
+    ) -> None:
+        """Change some fields of an existing exposure; it keeps its position.
+
+        ``attributes`` are merged into the row's attributes; a ``None`` value clears one.
+        """
+        with self.lock:
+            seq, old_exposure, old_probability, old_lgd = self._rows[name]
+            new_exposure = old_exposure if exposure is None else float(exposure)
+            new_probability = old_probability if prob_default is None else float(prob_default)
+            new_lgd = old_lgd if loss_given_default is None else float(loss_given_default)
+            if attributes:
+                merged = {**self._attributes.get(name, {}), **_checked(attributes)}
+                self._set_attributes(name, merged)
+
+            self._expected_loss += new_probability * new_lgd * new_exposure - old_probability * old_lgd * old_exposure
+            self._probability_sum += new_probability - old_probability
+            if new_probability != old_probability:
+                del self._index[bisect_left(self._index, (old_probability, seq))]
+                insort(self._index, (new_probability, seq))
+            self._rows[name] = (seq, new_exposure, new_probability, new_lgd)
+            self._applied()
+
+    def remove(self, name: str) -> None:
+        with self.lock:
+            seq, exposure, probability, lgd = self._rows.pop(name)
+            del self._names[seq]
+            self._attributes.pop(name, None)
+            del self._index[bisect_left(self._index, (probability, seq))]
+            self._expected_loss -= probability * lgd * exposure
+            self._probability_sum -= probability
+            self._applied()
+
+    def _set_attributes(self, name: str, attributes: Mapping[str, Optional[str]]) -> None:
+        present = {key: value for key, value in attributes.items() if value is not None}
+        if present:
+            self._attributes[name] = present
+        else:
+            self._attributes.pop(name, None)
+
+    def _insert(
+        self,
+        name: str,
+        exposure: float,
+        prob_default: float,
+        loss_given_default: float,
+        attributes: Mapping[str, Optional[str]],
+    ) -> None:
+        seq = self._next_seq
+        self._next_seq += 1
+        row = (seq, float(exposure), float(prob_default), float(loss_given_default))
+        self._rows[name] = row
+        self._set_attributes(name, attributes)
+        self._names[seq] = name
+        insort(self._index, (row[2], seq))
+        self._expected_loss += row[2] * row[3] * row[1]
+        self._probability_sum += row[2]
+
+    def _applied(self) -> None:
+        self.version += 1
+        self._pending_deltas += 1
+        if self._pending_deltas >= self.recompute_every:
+            self.recompute()
+
+    def recompute(self) -> None:
+        """Rebuild the running totals exactly from the rows."""
+        with self.lock:
+            rows = self._rows.values()
+            self._expected_loss = fsum(probability * lgd * exposure for _, exposure, probability, lgd in rows)
+            self._probability_sum = fsum(probability for _, _, probability, _ in rows)
+            self._pending_deltas = 0
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    @property
+    def expected_loss(self) -> float:
+        return self._expected_loss
+
+    def high_risk_count(self, high_risk_threshold: float) -> int:
+        with self.lock:
+            return len(self._index) - bisect_left(self._index, (high_risk_threshold, -1))
+
+    def high_risk_exposures(self, high_risk_threshold: float, *, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rows with ``prob_default >= high_risk_threshold``, in book order."""
+        with self.lock:
+            start = bisect_left(self._index, (high_risk_threshold, -1))
+            positions = sorted(seq for _, seq in self._index[start:])
+            if limit is not None:
+                positions = positions[:limit]
+            flags = []
+            for seq in positions:
+                name = self._names[seq]
+                _, exposure, probability, _ = self._rows[name]
+                flags.append({"name": name, "prob_default": probability, "exposure": exposure})
+            return flags
+
+    def risk_summary(self, high_risk_threshold: float, *, max_flags: Optional[int] = None) -> Dict[str, Any]:
+        """Same layout as :meth:`ColumnarPortfolio.risk_summary`, without a scan."""
+        with self.lock:
+            if not self._rows:
+                return {"expected_loss": 0.0, "average_probability": 0.0, "high_risk_exposures": []}
+            return {
+                "expected_loss": self._expected_loss,
+                "average_probability": self._probability_sum / len(self._rows),
+                "high_risk_exposures": self.high_risk_exposures(high_risk_threshold, limit=max_flags),
+            }
+
+    def to_portfolio(self) -> ColumnarPortfolio:
+        with self.lock:
+            names = list(self._rows)
+            rows = list(self._rows.values())
+            keys = [key for key in ATTRIBUTE_COLUMNS if any(key in values for values in self._attributes.values())]
+            attributes = {key: [self._attributes.get(name, {}).get(key) for name in names] for key in keys}
+        return ColumnarPortfolio(
+            names,
+            array("d", (row[1] for row in rows)),
+            array("d", (row[2] for row in rows)),
+            array("d", (row[3] for row in rows)),
+            attributes,
+        )
+
+
+def _checked(attributes: Mapping[str, Optional[str]]) -> Dict[str, Optional[str]]:
+    unknown = [key for key in attributes if key not in ATTRIBUTE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown exposure attributes {unknown}; expected some of {ATTRIBUTE_COLUMNS}.")
+    return {key: None if value is None else str(value) for key, value in attributes.items()}
+
+
+__all__ = ["CreditBook"]
@@ -1,52 +1,88 @@
 """Implements a simple expected loss calculator for credit portfolios."""
 from __future__ import annotations
 
-from statistics import mean
-from typing import Any, Dict, List
+from operator import mul
+from typing import Any, Dict, Iterable, Optional
 
 from ...core.base_agent import BaseAgent
+from .breakdown import GroupByAccumulator, Grouping
+from .credit_book import CreditBook
+from .ingest import portfolio_chunks
+from .portfolio import ColumnarPortfolio, RiskAccumulator
 
 
 class CreditRiskAnalyzer(BaseAgent):
     """Calculates expected loss and flags high risk exposures."""
 
-    def __init__(self, *, high_risk_threshold: float = 0.05) -> None:
+    workload = "cpu"
+    inputs = ("credit_portfolio",)
+    outputs = ("credit_risk",)
+
+    def __init__(
+        self,
+        *,
+        high_risk_threshold: float = 0.05,
+        max_flags: Optional[int] = None,
+        breakdowns: Iterable[Grouping] = (),
+    ) -> None:
         super().__init__(
             name="CreditRiskAnalyzer",
             category="Finance",
             purpose="Estimate expected credit loss and highlight high risk assets.",
         )
         self.high_risk_threshold = high_risk_threshold
+        # Caps the listed high-risk rows for huge streamed portfolios; the count is always exact.
+        self.max_flags = max_flags
+        # Segments to break exposure and expected loss down by, e.g. ("sector", ("region", "rating")).
+        self.breakdowns = tuple(breakdowns)
+
+    def _segment(self, groups: GroupByAccumulator, chunk: ColumnarPortfolio) -> None:
+        columns = chunk._numpy_columns()
+        if columns is not None:
+            exposure, probability, lgd = columns
+            losses = probability * lgd * exposure
+        else:
+            losses = list(map(mul, map(mul, chunk.prob_default, chunk.loss_given_default), chunk.exposure))
+        groups.add(chunk, {"exposure": chunk.exposure, "expected_loss": losses})
 
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        portfolio: List[Dict[str, Any]] = context.get("credit_portfolio", [])
-        expected_losses = []
-        risk_flags = []
-
-        for exposure in portfolio:
-            probability = float(exposure.get("prob_default", 0.0))
-            lgd = float(exposure.get("loss_given_default", 0.0))
-            value = float(exposure.get("exposure", 0.0))
-            expected_loss = probability * lgd * value
-            expected_losses.append(expected_loss)
-            if probability >= self.high_risk_threshold:
-                risk_flags.append({
-                    "name": exposure.get("name", "Unknown"),
-                    "prob_default": probability,
-                    "exposure": value,
-                })
-
-        total_expected_loss = round(sum(expected_losses), 2)
-        average_probability = round(mean([e.get("prob_default", 0.0) for e in portfolio]), 4) if portfolio else 0.0
+        # ``credit_portfolio`` may be records, a ColumnarPortfolio, a streamed PortfolioSource
+        # or a CreditBook, whose running totals make a full scan unnecessary.
+        source = context.get("credit_portfolio")
+        groups = GroupByAccumulator(self.breakdowns, ("exposure", "expected_loss")) if self.breakdowns else None
+        if isinstance(source, CreditBook):
+            # One lock hold keeps the totals, count and breakdown consistent under concurrent deltas.
+            with source.lock:
+                risk = source.risk_summary(self.high_risk_threshold, max_flags=self.max_flags)
+                rows, flag_count = len(source), source.high_risk_count(self.high_risk_threshold)
+                portfolio = source.to_portfolio() if groups is not None else None
+            if portfolio is not None:
+                # A book keeps no segment totals, so breakdowns take one scan of its rows and their attributes.
+                self._segment(groups, portfolio)
+        else:
+            accumulator = RiskAccumulator(self.high_risk_threshold, max_flags=self.max_flags)
+            for chunk in portfolio_chunks(source):
+                accumulator.add(chunk)
+                if groups is not None:
+                    self._segment(groups, chunk)
+            risk = accumulator.result()
+            rows, flag_count = accumulator.rows, accumulator.flag_count
+        risk_flags = risk["high_risk_exposures"]
+
+        total_expected_loss = round(risk["expected_loss"], 2)
+        average_probability = round(risk["average_probability"], 4)
 
         self.update_state(notes={
-            "high_risk_count": len(risk_flags),
+            "high_risk_count": flag_count,
             "last_total_expected_loss": total_expected_loss,
         })
 
-        return {
+        result = {
             "expected_loss": total_expected_loss,
             "high_risk_exposures": risk_flags,
-            "confidence": 0.85 if portfolio else 0.3,
+            "confidence": 0.85 if rows else 0.3,
             "average_probability": average_probability,
         }
+        if groups is not None:
+            result["breakdowns"] = groups.result(ndigits=2)
+        return result
@@ -0,0 +1,194 @@
+"""Chunked readers for portfolio and liquidity files.
+
+Portfolios are read as a stream of :class:`ColumnarPortfolio` chunks of at
+most ``chunk_rows`` rows, so a file never has to be materialised as a list of
+dicts. Supported formats, chosen by suffix unless ``file_format`` is given:
+
+* ``.csv`` - header row with ``name,exposure,prob_default,loss_given_default``
+  and optionally any of ``sector,region,rating,currency``
+* ``.jsonl`` / ``.ndjson`` - one exposure object per line
+* ``.parquet`` - requires the optional ``pyarrow`` dependency
+
+Liquidity files use ``account,balance`` columns (or keys) in the same formats.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .portfolio import ATTRIBUTE_COLUMNS, ColumnarPortfolio
+
+try:  # Optional: only needed for parquet files.
+    import pyarrow.parquet as _parquet
+except ImportError:  # pragma: no cover - depends on the environment
+    _parquet = None
+
+DEFAULT_CHUNK_ROWS = 65_536
+PORTFOLIO_COLUMNS = ("name", "exposure", "prob_default", "loss_given_default") + ATTRIBUTE_COLUMNS
+LIQUIDITY_COLUMNS = ("account", "balance")
+_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+
+def detect_format(path: Union[str, Path]) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix not in _FORMATS:
+        raise ValueError(f"Cannot infer file format from suffix {suffix!r}; pass file_format explicitly.")
+    return _FORMATS[suffix]
+
+
+def _iter_rows(
+    path: Path, file_format: str, columns: Tuple[str, ...], chunk_rows: int
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """Yield lists of at most ``chunk_rows`` tuples ordered like ``columns``; absent fields are ``None``."""
+    if file_format == "parquet":
+        if _parquet is None:
+            raise ImportError("Reading parquet files requires the optional 'pyarrow' package.")
+        parquet_file = _parquet.ParquetFile(path)
+        present = [column for column in columns if column in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=present):
+            data = batch.to_pydict()
+            values = [data.get(column, [None] * batch.num_rows) for column in columns]
+            yield list(zip(*values))
+        return
+
+    with open(path, newline="", encoding="utf-8") as handle:
+        if file_format == "csv":
+            reader = csv.reader(handle)
+            header = next(reader, None) or []
+            positions = [header.index(column) if column in header else None for column in columns]
+            rows: Iterable[Tuple[Any, ...]] = (
+                tuple(row[idx] if idx is not None and idx < len(row) and row[idx] != "" else None for idx in positions)
+                for row in reader
+                if row
+            )
+        elif file_format == "jsonl":
+            rows = (
+                tuple(record.get(column) for column in columns)
+                for record in (json.loads(line) for line in handle if line.strip())
+            )
+        else:
+            raise ValueError(f"Unsupported file format: {file_format!r}")
+
+        chunk: List[Tuple[Any, ...]] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _float(value: Any, column: str, path: Path, row: int) -> float:
+    try:
+        return float(value or 0.0)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"{path}: row {row}: invalid {column} value {value!r}") from exc
+
+
+def _float_column(values: Tuple[Any, ...], column: str, path: Path, first_row: int) -> array:
+    """Parse one column into doubles, naming the file, data row and column of a bad value."""
+    try:
+        return array("d", (float(value or 0.0) for value in values))
+    except (TypeError, ValueError):
+        # Off the fast path only once the chunk is known to be bad.
+        return array("d", (_float(value, column, path, first_row + offset) for offset, value in enumerate(values)))
+
+
+def iter_portfolio_chunks(
+    path: Union[str, Path], *, chunk_rows: int = DEFAULT_CHUNK_ROWS, file_format: Optional[str] = None
+) -> Iterator[ColumnarPortfolio]:
+    """Stream a portfolio file as columnar chunks of at most ``chunk_rows`` rows."""
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows must be positive.")
+    path = Path(path)
+    first_row = 1
+    for rows in _iter_rows(path, file_format or detect_format(path), PORTFOLIO_COLUMNS, chunk_rows):
+        names, exposure, probability, lgd, *attribute_values = zip(*rows)
+        attributes = {
+            key: [None if value is None else str(value) for value in values]
+            for key, values in zip(ATTRIBUTE_COLUMNS, attribute_values)
+            if any(value is not None for value in values)
+        }
+        portfolio = ColumnarPortfolio(
+            ["Unknown" if name is None else str(name) for name in names],
+            _float_column(exposure, "exposure", path, first_row),
+            _float_column(probability, "prob_default", path, first_row),
+            _float_column(lgd, "loss_given_default", path, first_row),
+            attributes,
+        )
+        first_row += len(rows)
+        yield portfolio
+
+
+def load_liquidity_levels(
+    path: Union[str, Path], *, chunk_rows: int = DEFAULT_CHUNK_ROWS, file_format: Optional[str] = None
+) -> Dict[str, float]:
+    """Read ``account,balance`` rows into the ``liquidity_levels`` mapping.
+
+    Balances of an account listed more than once are added together.
+    """
+    path = Path(path)
+    levels: Dict[str, float] = {}
+    row = 0
+    for rows in _iter_rows(path, file_format or detect_format(path), LIQUIDITY_COLUMNS, chunk_rows):
+        for account, balance in rows:
+            row += 1
+            if account is None:
+                continue
+            levels[str(account)] = levels.get(str(account), 0.0) + _float(balance, "balance", path, row)
+    return levels
+
+
+class PortfolioSource:
+    """Lazily streamed portfolio file that can be placed in the bank context.
+
+    Finance agents detect a source under ``credit_portfolio`` and aggregate
+    over :meth:`chunks` instead of materialising every row. Sources pickle as
+    their path, so process-pool workers read the file themselves.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], *, chunk_rows: int = DEFAULT_CHUNK_ROWS, file_format: Optional[str] = None
+    ) -> None:
+        self.path = Path(path)
+        self.chunk_rows = chunk_rows
+        self.file_format = file_format or detect_format(self.path)
+
+    def __repr__(self) -> str:
+        return f"PortfolioSource({str(self.path)!r}, chunk_rows={self.chunk_rows})"
+
+    def chunks(self) -> Iterator[ColumnarPortfolio]:
+        return iter_portfolio_chunks(self.path, chunk_rows=self.chunk_rows, file_format=self.file_format)
+
+    def load(self) -> ColumnarPortfolio:
+        """Concatenate every chunk into one in-memory portfolio."""
+        portfolio = ColumnarPortfolio()
+        for chunk in self.chunks():
+            portfolio.extend_columns(chunk)
+        return portfolio
+
+    def __fingerprint__(self):
+        # Hook for ``core.memo.fingerprint``: a rewritten file changes mtime or size.
+        stat = self.path.stat()
+        return (str(self.path.resolve()), stat.st_mtime_ns, stat.st_size, self.chunk_rows)
+
+
+def portfolio_chunks(value: Any) -> Iterator[ColumnarPortfolio]:
+    """Iterate the chunks of a context ``credit_portfolio`` value of any supported shape."""
+    if isinstance(value, PortfolioSource):
+        return value.chunks()
+    return iter((ColumnarPortfolio.coerce(value),))
+
+
+__all__ = [
+    "DEFAULT_CHUNK_ROWS",
+    "PortfolioSource",
+    "detect_format",
+    "iter_portfolio_chunks",
+    "load_liquidity_levels",
+    "portfolio_chunks",
+]
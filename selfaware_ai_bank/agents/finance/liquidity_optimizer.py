@@ -1,48 +1,204 @@
 """Implements a small liquidity balancing agent."""
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import heapq
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from ...core.base_agent import BaseAgent
 
+Corridor = Tuple[str, str]
+_FLOW_EPSILON = 1e-9
+
 
 class LiquidityOptimizer(BaseAgent):
-    """Suggests transfers to move towards a target liquidity buffer."""
+    """Suggests transfers to move towards a target liquidity buffer.
+
+    ``mode="greedy"`` (the default) fills the weakest accounts first from the
+    largest surpluses. ``mode="min_cost"`` moves the same amount of liquidity at
+    the lowest total cost, honouring ``context["liquidity_corridors"]``: a
+    mapping of ``(source, target)`` to ``{"cost": per-unit cost, "cap": limit}``.
+    Corridors that are not listed use ``default_corridor_cost`` without a cap,
+    or are closed when it is ``None``.
+    """
 
-    def __init__(self, *, target_buffer: float = 1_000_000.0) -> None:
+    inputs = ("liquidity_levels", "liquidity_corridors")
+    outputs = ("liquidity_plan",)
+
+    def __init__(
+        self,
+        *,
+        target_buffer: float = 1_000_000.0,
+        mode: str = "greedy",
+        default_corridor_cost: Optional[float] = 0.0,
+    ) -> None:
         super().__init__(
             name="LiquidityOptimizer",
             category="Finance",
             purpose="Monitor account liquidity and recommend redistributions.",
         )
+        if mode not in {"greedy", "min_cost"}:
+            raise ValueError(f"Unknown liquidity optimizer mode: {mode!r}")
         self.target_buffer = target_buffer
+        self.mode = mode
+        self.default_corridor_cost = default_corridor_cost
 
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         liquidity_levels: Dict[str, float] = context.get("liquidity_levels", {})
+        result: Dict[str, Any] = {"action": "rebalance_liquidity"}
+        if self.mode == "min_cost":
+            transfers, cost = self.min_cost_transfers(liquidity_levels, context.get("liquidity_corridors", {}))
+            result["transfer_cost"] = cost
+        else:
+            transfers = self.greedy_transfers(liquidity_levels)
+
+        confidence = 0.5 if not transfers else 0.9
+        self.update_state(notes={"transfers": transfers})
+        result["transfers"] = transfers
+        result["confidence"] = confidence
+        return result
+
+    def greedy_transfers(self, liquidity_levels: Mapping[str, float]) -> List[Tuple[str, str, float]]:
+        """Match shortages to surpluses in O((D + S) log(D + S)).
+
+        Shortages are served from the smallest balance upwards, always drawing
+        on the largest remaining surplus (ties keep account order). A surplus
+        drained while serving one shortage is only offered again to the next
+        shortage, mirroring the original sort-per-shortage loop transfer for
+        transfer.
+        """
+        target = self.target_buffer
         transfers: List[Tuple[str, str, float]] = []
-        shortages = {acc: bal for acc, bal in liquidity_levels.items() if bal < self.target_buffer}
-        surpluses = {acc: bal for acc, bal in liquidity_levels.items() if bal > self.target_buffer}
-
-        for deficit_account, balance in sorted(shortages.items(), key=lambda item: item[1]):
-            deficit = self.target_buffer - balance
-            for surplus_account, surplus_balance in sorted(surpluses.items(), key=lambda item: item[1], reverse=True):
-                available = max(0.0, surplus_balance - self.target_buffer)
-                if available <= 0:
-                    continue
-                transfer_amount = min(deficit, available)
-                if transfer_amount <= 0:
-                    continue
+        shortages = [(acc, bal) for acc, bal in liquidity_levels.items() if bal < target]
+        heap = [(-bal, order, acc) for order, (acc, bal) in enumerate(liquidity_levels.items()) if bal > target]
+        heapq.heapify(heap)
+
+        for deficit_account, balance in sorted(shortages, key=lambda item: item[1]):
+            deficit = target - balance
+            drained = []
+            while heap:
+                neg_balance, order, surplus_account = heap[0]
+                surplus_balance = -neg_balance
+                transfer_amount = min(deficit, surplus_balance - target)
                 transfers.append((surplus_account, deficit_account, round(transfer_amount, 2)))
                 surplus_balance -= transfer_amount
                 deficit -= transfer_amount
-                surpluses[surplus_account] = surplus_balance
                 if deficit <= 0:
+                    if surplus_balance > target:
+                        heapq.heapreplace(heap, (-surplus_balance, order, surplus_account))
+                    else:
+                        heapq.heappop(heap)
                     break
+                heapq.heappop(heap)
+                if surplus_balance > target:
+                    # Float residue left after draining: eligible again from the next shortage on.
+                    drained.append((-surplus_balance, order, surplus_account))
+            for item in drained:
+                heapq.heappush(heap, item)
+        return transfers
 
-        confidence = 0.5 if not transfers else 0.9
-        self.update_state(notes={"transfers": transfers})
-        return {
-            "action": "rebalance_liquidity",
-            "transfers": transfers,
-            "confidence": confidence,
-        }
+    def min_cost_transfers(
+        self, liquidity_levels: Mapping[str, float], corridors: Mapping[Corridor, Mapping[str, float]]
+    ) -> Tuple[List[Tuple[str, str, float]], float]:
+        """Cover as much shortage as possible at minimum total corridor cost."""
+        target = self.target_buffer
+        shortages = sorted(
+            ((acc, bal) for acc, bal in liquidity_levels.items() if bal < target), key=lambda item: item[1]
+        )
+        surpluses = [(acc, bal) for acc, bal in liquidity_levels.items() if bal > target]
+
+        network = _FlowNetwork(len(surpluses) + len(shortages) + 2)
+        source, sink = 0, len(surpluses) + len(shortages) + 1
+        corridor_edges: List[Tuple[int, str, str, float]] = []
+        for idx, (acc, bal) in enumerate(surpluses, start=1):
+            network.add_edge(source, idx, bal - target, 0.0)
+        for jdx, (acc, bal) in enumerate(shortages, start=len(surpluses) + 1):
+            network.add_edge(jdx, sink, target - bal, 0.0)
+        for jdx, (deficit_account, _) in enumerate(shortages, start=len(surpluses) + 1):
+            for idx, (surplus_account, _) in enumerate(surpluses, start=1):
+                corridor = corridors.get((surplus_account, deficit_account))
+                if corridor is None:
+                    if self.default_corridor_cost is None:
+                        continue
+                    cost, cap = self.default_corridor_cost, float("inf")
+                else:
+                    cost = float(corridor.get("cost", self.default_corridor_cost or 0.0))
+                    cap = float(corridor.get("cap", float("inf")))
+                if cost < 0:
+                    raise ValueError(f"Corridor cost must be non-negative: {surplus_account}->{deficit_account}")
+                edge = network.add_edge(idx, jdx, cap, cost)
+                corridor_edges.append((edge, surplus_account, deficit_account, cost))
+
+        network.solve(source, sink)
+
+        transfers: List[Tuple[str, str, float]] = []
+        total_cost = 0.0
+        for edge, surplus_account, deficit_account, cost in corridor_edges:
+            flow = network.flow(edge)
+            if flow > _FLOW_EPSILON:
+                transfers.append((surplus_account, deficit_account, round(flow, 2)))
+                total_cost += flow * cost
+        return transfers, round(total_cost, 2)
+
+
+class _FlowNetwork:
+    """Min-cost max-flow via successive shortest paths with Dijkstra potentials."""
+
+    def __init__(self, nodes: int) -> None:
+        self.adjacency: List[List[int]] = [[] for _ in range(nodes)]
+        self.head: List[int] = []
+        self.capacity: List[float] = []
+        self.cost: List[float] = []
+
+    def add_edge(self, tail: int, head: int, capacity: float, cost: float) -> int:
+        """Add an edge and its residual twin; returns the forward edge id."""
+        edge = len(self.head)
+        for node_from, node_to, cap, weight in ((tail, head, capacity, cost), (head, tail, 0.0, -cost)):
+            self.adjacency[node_from].append(len(self.head))
+            self.head.append(node_to)
+            self.capacity.append(cap)
+            self.cost.append(weight)
+        return edge
+
+    def flow(self, edge: int) -> float:
+        # The residual twin starts empty and accumulates everything pushed forward.
+        return self.capacity[edge ^ 1]
+
+    def solve(self, source: int, sink: int) -> None:
+        nodes = len(self.adjacency)
+        potential = [0.0] * nodes
+        while True:
+            distance = [float("inf")] * nodes
+            via: List[int] = [-1] * nodes
+            distance[source] = 0.0
+            queue = [(0.0, source)]
+            while queue:
+                dist, node = heapq.heappop(queue)
+                if dist > distance[node]:
+                    continue
+                for edge in self.adjacency[node]:
+                    if self.capacity[edge] <= _FLOW_EPSILON:
+                        continue
+                    head = self.head[edge]
+                    candidate = dist + self.cost[edge] + potential[node] - potential[head]
+                    if candidate < distance[head] - _FLOW_EPSILON:
+                        distance[head] = candidate
+                        via[head] = edge
+                        heapq.heappush(queue, (candidate, head))
+            if via[sink] == -1:
+                return
+            for node in range(nodes):
+                if distance[node] < float("inf"):
+                    potential[node] += distance[node]
+
+            push = float("inf")
+            node = sink
+            while node != source:
+                edge = via[node]
+                push = min(push, self.capacity[edge])
+                node = self.head[edge ^ 1]
+            node = sink
+            while node != source:
+                edge = via[node]
+                self.capacity[edge] -= push
+                self.capacity[edge ^ 1] += push
+                node = self.head[edge ^ 1]
@@ -0,0 +1,287 @@
+"""Binary, memory-mappable snapshots of the finance context.
+
+Layout (little-endian, every section 8-byte aligned)::
+
+    b"SAIBSNP1"                      magic
+    <u32 header length> <header>     UTF-8 JSON describing the sections below
+    string table                     u32 offsets[count + 1] + UTF-8 blob
+    portfolio columns                u32 name ids, f64 exposure, f64 prob_default, f64 loss_given_default,
+                                     then u32 ids per attribute column (sector, region, ...)
+    liquidity columns                u32 account ids, f64 balance
+
+Exposure names, account codes and attribute values are interned: each
+distinct string is stored once and columns refer to it by id (``0xFFFFFFFF``
+marks a missing attribute). :func:`read_snapshot` maps the file and
+exposes the numeric columns as ``memoryview`` objects over the mapping, so a
+multi-million row portfolio is available without parsing or copying.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union, overload
+
+from .ingest import PortfolioSource
+from .portfolio import ATTRIBUTE_COLUMNS, ColumnarPortfolio
+
+MAGIC = b"SAIBSNP1"
+FORMAT_VERSION = 1
+_LENGTH = struct.Struct("<I")
+_PORTFOLIO_FLOATS = ("exposure", "prob_default", "loss_given_default")
+_NATIVE_LITTLE = sys.byteorder == "little"
+_MISSING = 0xFFFFFFFF
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def intern(self, value: str) -> int:
+        ident = self.ids.get(value)
+        if ident is None:
+            ident = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return ident
+
+    def encode(self) -> bytes:
+        blobs = [value.encode("utf-8") for value in self.strings]
+        offsets = array("I", [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return _little(offsets) + b"".join(blobs)
+
+
+def _little(values: array) -> bytes:
+    if not _NATIVE_LITTLE:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_snapshot(
+    path: Union[str, Path],
+    *,
+    credit_portfolio: Any = None,
+    liquidity_levels: Optional[Mapping[str, float]] = None,
+) -> Path:
+    """Write the portfolio and liquidity levels to ``path`` atomically."""
+    if isinstance(credit_portfolio, PortfolioSource):
+        portfolio = credit_portfolio.load()
+    else:
+        portfolio = ColumnarPortfolio.coerce(credit_portfolio)
+    liquidity = dict(liquidity_levels or {})
+
+    table = _StringTable()
+    name_ids = array("I", map(table.intern, portfolio.names))
+    account_ids = array("I", map(table.intern, liquidity))
+    attributes = [key for key in ATTRIBUTE_COLUMNS if key in portfolio.attributes]
+    attribute_ids = {
+        key: array("I", (_MISSING if value is None else table.intern(value) for value in portfolio.attributes[key]))
+        for key in attributes
+    }
+    sections: List[Tuple[str, bytes]] = [
+        ("name", _little(name_ids)),
+        *((column, _little(array("d", getattr(portfolio, column)))) for column in _PORTFOLIO_FLOATS),
+        *((f"attribute.{key}", _little(ids)) for key, ids in attribute_ids.items()),
+        ("account", _little(account_ids)),
+        ("balance", _little(array("d", map(float, liquidity.values())))),
+    ]
+    # Encoded last, once every string has been interned, but stored first.
+    sections.insert(0, ("strings", table.encode()))
+
+    # Offsets are relative to the start of the data area so the header can be sized first.
+    layout: Dict[str, List[int]] = {}
+    position = 0
+    for key, blob in sections:
+        layout[key] = [position, len(blob)]
+        position += len(blob) + _pad(len(blob))
+    header = json.dumps(
+        {
+            "version": FORMAT_VERSION,
+            "strings": len(table.strings),
+            "rows": len(portfolio),
+            "accounts": len(liquidity),
+            "attributes": attributes,
+            "sections": layout,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    prefix = MAGIC + _LENGTH.pack(len(header)) + header
+    prefix += b"\0" * _pad(len(prefix))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scratch = path.with_name(path.name + ".tmp")
+    with open(scratch, "wb") as handle:
+        handle.write(prefix)
+        for _, blob in sections:
+            handle.write(blob)
+            handle.write(b"\0" * _pad(len(blob)))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(scratch, path)
+    return path
+
+
+class InternedNames(Sequence[str]):
+    """Read-only sequence of strings resolved through a snapshot's string table.
+
+    Each distinct string is decoded once, on first access.
+    """
+
+    def __init__(self, ids: Sequence[int], offsets: Sequence[int], blob: memoryview) -> None:
+        self._ids = ids
+        self._offsets = offsets
+        self._blob = blob
+        self._decoded: Dict[int, str] = {}
+
+    def _resolve(self, ident: int) -> Optional[str]:
+        if ident == _MISSING:
+            return None
+        value = self._decoded.get(ident)
+        if value is None:
+            value = self._decoded[ident] = str(self._blob[self._offsets[ident] : self._offsets[ident + 1]], "utf-8")
+        return value
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._resolve(ident) for ident in self._ids[index]]
+        return self._resolve(self._ids[index])
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self._resolve, self._ids)
+
+    def __fingerprint__(self):
+        return (self._ids, self._offsets, self._blob)
+
+
+class MappedPortfolio(ColumnarPortfolio):
+    """Portfolio whose columns are views into a mapped snapshot file.
+
+    Columns are read-only. Pickling ships the file path together with the
+    file's ``(st_ino, st_size, st_mtime_ns)``, so process-pool workers map the
+    snapshot themselves instead of receiving a copy, and refuse to run on a
+    file that was replaced or rewritten in the meantime.
+    """
+
+    __slots__ = ("source", "identity")
+
+    def __reduce__(self):
+        return (_mapped_portfolio, (str(self.source), self.identity))
+
+
+def _mapped_portfolio(path: str, identity: Optional[Tuple[int, int, int]] = None) -> MappedPortfolio:
+    portfolio = read_snapshot(path)["credit_portfolio"]
+    if identity is not None and portfolio.identity != tuple(identity):
+        raise ValueError(f"Snapshot {path} changed since the portfolio was shared; reload it.")
+    return portfolio
+
+
+def _column(view: memoryview, section: Sequence[int], typecode: str) -> Sequence:
+    start, length = section
+    data = view[start : start + length]
+    if _NATIVE_LITTLE:
+        return data.cast(typecode)
+    swapped = array(typecode, data.tobytes())  # pragma: no cover - big-endian hosts copy once
+    swapped.byteswap()
+    return swapped
+
+
+def _check_layout(header: Dict[str, Any], size: int) -> None:
+    """Ensure every section lies inside the ``size`` bytes of data and fits its row count."""
+    rows, accounts, strings = header["rows"], header["accounts"], header["strings"]
+    expected = {
+        "name": rows * 4,
+        **{column: rows * 8 for column in _PORTFOLIO_FLOATS},
+        **{f"attribute.{key}": rows * 4 for key in header.get("attributes", ())},
+        "account": accounts * 4,
+        "balance": accounts * 8,
+    }
+    sections = header["sections"]
+    for key in ("strings", *expected):
+        start, length = sections[key]
+        if start < 0 or length < 0 or start + length > size:
+            raise ValueError(f"section {key!r} ends at byte {start + length} of {size}")
+        if key == "strings" and length < (strings + 1) * 4:
+            raise ValueError(f"string table holds {length} bytes, too few for {strings} strings")
+        if key != "strings" and length != expected[key]:
+            raise ValueError(f"section {key!r} holds {length} bytes, expected {expected[key]}")
+
+
+def read_snapshot(path: Union[str, Path]) -> Dict[str, Any]:
+    """Map ``path`` and return ``credit_portfolio`` and ``liquidity_levels`` context entries.
+
+    A file that is not a snapshot, or whose sections do not fit inside it
+    (e.g. a truncated copy), raises :class:`ValueError`.
+    """
+    path = Path(path)
+    with open(path, "rb") as handle:
+        stat = os.fstat(handle.fileno())
+        if stat.st_size == 0:
+            raise ValueError(f"{path} is not a bank snapshot.")
+        mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    header_start = len(MAGIC) + _LENGTH.size
+    if len(view) < header_start or bytes(view[: len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a bank snapshot.")
+    (header_length,) = _LENGTH.unpack_from(view, len(MAGIC))
+    corrupt = f"{path} is a corrupt or truncated bank snapshot"
+    try:
+        header = json.loads(bytes(view[header_start : header_start + header_length]))
+    except ValueError as exc:
+        raise ValueError(f"{corrupt}: unreadable header") from exc
+    if not isinstance(header, dict):
+        raise ValueError(f"{corrupt}: header is not an object")
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {header.get('version')!r}")
+    data_start = header_start + header_length
+    data_start += _pad(data_start)
+    data = view[data_start:]
+    try:
+        _check_layout(header, len(data))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"{corrupt}: {exc}") from exc
+    sections = header["sections"]
+
+    offsets_size = (header["strings"] + 1) * 4
+    strings_start, strings_length = sections["strings"]
+    offsets = _column(data, (strings_start, offsets_size), "I")
+    blob = data[strings_start + offsets_size : strings_start + strings_length]
+    if offsets[-1] > len(blob):
+        raise ValueError(f"{corrupt}: string table overruns its section")
+
+    portfolio = MappedPortfolio(
+        InternedNames(_column(data, sections["name"], "I"), offsets, blob),
+        *(_column(data, sections[column], "d") for column in _PORTFOLIO_FLOATS),
+        {
+            key: InternedNames(_column(data, sections[f"attribute.{key}"], "I"), offsets, blob)
+            for key in header.get("attributes", ())
+        },
+    )
+    portfolio.source = path
+    portfolio.identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    accounts = InternedNames(_column(data, sections["account"], "I"), offsets, blob)
+    liquidity = dict(zip(accounts, _column(data, sections["balance"], "d")))
+    return {"credit_portfolio": portfolio, "liquidity_levels": liquidity}
+
+
+__all__ = ["InternedNames", "MappedPortfolio", "read_snapshot", "write_snapshot"]
@@ -1,15 +1,34 @@
 """Stress testing agent that blends liquidity and credit perspectives."""
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional
 
 from ...core.base_agent import BaseAgent
+from .breakdown import GroupByAccumulator, Grouping
+from .ingest import PortfolioSource, portfolio_chunks
+from .portfolio import ColumnarPortfolio
+from .scenario_engine import simulate_loss_distribution
 
 
 class StressTester(BaseAgent):
     """Runs a lightweight adverse scenario across bank metrics."""
 
-    def __init__(self, *, probability_uplift: float = 0.5, liquidity_shock: float = 0.15) -> None:
+    workload = "cpu"
+    inputs = ("liquidity_levels", "credit_portfolio", "credit_risk")
+    outputs = ("stress_results",)
+
+    def __init__(
+        self,
+        *,
+        probability_uplift: float = 0.5,
+        liquidity_shock: float = 0.15,
+        scenario_count: int = 0,
+        scenario_seed: int = 0,
+        correlation: float = 0.2,
+        workers: Optional[int] = None,
+        max_flags: Optional[int] = None,
+        breakdowns: Iterable[Grouping] = (),
+    ) -> None:
         # Self-awareness: Calibrating the scenario knobs to stay adaptable for future instructions.
         super().__init__(
             name="StressTester",
@@ -18,11 +37,30 @@ class StressTester(BaseAgent):
         )
         self.probability_uplift = probability_uplift
         self.liquidity_shock = liquidity_shock
+        # Scenario-batch mode is off by default; a positive count adds a loss distribution.
+        self.scenario_count = scenario_count
+        self.scenario_seed = scenario_seed
+        self.correlation = correlation
+        self.workers = workers
+        # Caps the listed stressed high-risk rows for huge streamed portfolios; the count is always exact.
+        self.max_flags = max_flags
+        # Segments to break exposure and stressed loss down by, e.g. ("sector", ("region", "rating")).
+        self.breakdowns = tuple(breakdowns)
+
+    def run_scenarios(self, portfolio: Any, *, scenarios: Optional[int] = None) -> Dict[str, Any]:
+        """Simulate correlated adverse scenarios and return loss quantiles."""
+        return simulate_loss_distribution(
+            portfolio,
+            scenarios=scenarios or self.scenario_count,
+            seed=self.scenario_seed,
+            correlation=self.correlation,
+            workers=self.workers,
+        )
 
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         # Self-awareness: Observing shared context to synthesise a richer perspective.
         liquidity_levels: Dict[str, float] = context.get("liquidity_levels", {})
-        portfolio: List[Dict[str, Any]] = context.get("credit_portfolio", [])
+        source = context.get("credit_portfolio")
 
         stressed_liquidity: Dict[str, float] = {}
         liquidity_warnings: List[str] = []
@@ -35,23 +73,34 @@ class StressTester(BaseAgent):
 
         stressed_losses = 0.0
         stressed_flags: List[Dict[str, Any]] = []
-        for exposure in portfolio:
-            probability = float(exposure.get("prob_default", 0.0))
-            lgd = float(exposure.get("loss_given_default", 0.0))
-            value = float(exposure.get("exposure", 0.0))
-
-            stressed_probability = min(1.0, probability * (1 + self.probability_uplift))
-            stressed_loss = stressed_probability * min(1.0, lgd + 0.1) * value
-            stressed_losses += stressed_loss
+        flag_count = 0
+        rows = 0
+        groups = GroupByAccumulator(self.breakdowns, ("exposure", "stressed_loss")) if self.breakdowns else None
+        # Chunks keep memory bounded when the portfolio is streamed from a file.
+        for chunk in portfolio_chunks(source):
+            rows += len(chunk)
+            chunk_losses: List[float] = []
+            for name, value, probability, lgd in zip(
+                chunk.names, chunk.exposure, chunk.prob_default, chunk.loss_given_default
+            ):
+                stressed_probability = min(1.0, probability * (1 + self.probability_uplift))
+                stressed_loss = stressed_probability * min(1.0, lgd + 0.1) * value
+                stressed_losses += stressed_loss
+                chunk_losses.append(stressed_loss)
 
-            if stressed_probability >= 0.2:
-                stressed_flags.append(
-                    {
-                        "name": exposure.get("name", "Unknown"),
-                        "stressed_probability": round(stressed_probability, 3),
-                        "exposure": value,
-                    }
-                )
+                if stressed_probability < 0.2:
+                    continue
+                flag_count += 1
+                if self.max_flags is None or len(stressed_flags) < self.max_flags:
+                    stressed_flags.append(
+                        {
+                            "name": name,
+                            "stressed_probability": round(stressed_probability, 3),
+                            "exposure": value,
+                        }
+                    )
+            if groups is not None:
+                groups.add(chunk, {"exposure": chunk.exposure, "stressed_loss": chunk_losses})
 
         # Self-awareness: Persisting run-time narrative for the introspection engine.
         self.update_state(
@@ -61,14 +110,27 @@ class StressTester(BaseAgent):
             }
         )
 
-        return {
+        result = {
             "action": "stress_test",
             "stressed_liquidity": stressed_liquidity,
             "stressed_loss_estimate": round(stressed_losses, 2),
             "liquidity_alerts": liquidity_warnings,
             "stressed_high_risk": stressed_flags,
-            "confidence": 0.75 if portfolio else 0.4,
+            "stressed_high_risk_count": flag_count,
+            "confidence": 0.75 if rows else 0.4,
         }
+        if groups is not None:
+            result["breakdowns"] = groups.result(ndigits=2)
+        baseline = context.get("credit_risk")
+        if baseline and "expected_loss" in baseline:
+            # Reuse CreditRiskAnalyzer's published result instead of recomputing PD x LGD x EAD.
+            result["baseline_expected_loss"] = baseline["expected_loss"]
+            result["incremental_loss"] = round(result["stressed_loss_estimate"] - baseline["expected_loss"], 2)
+        if self.scenario_count > 0:
+            # Scenarios revisit every row per block, so a streamed source is loaded into columns once.
+            portfolio = source.load() if isinstance(source, PortfolioSource) else ColumnarPortfolio.coerce(source)
+            result["loss_distribution"] = self.run_scenarios(portfolio)
+        return result
 
 
 __all__ = ["StressTester"]
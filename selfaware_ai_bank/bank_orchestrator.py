@@ -1,130 +1,571 @@
 """High level orchestration for coordinating bank agents."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import asyncio
+import copy
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Protocol, Sequence, Tuple, Type
 
-from .core.base_agent import BaseAgent
+from .core.base_agent import AgentState, BaseAgent
+from .core.context import ContextSnapshot
+from .core.events import ContextEventBus
+from .core.history import RunHistory, RunRecord
 from .core.introspection_engine import IntrospectionEngine
-from .utils.markdown_loader import MarkdownAgentSpec, parse_role_markdown
+from .core.memo import ResultCache, Unfingerprintable, context_key
+from .core.scheduler import build_dependency_graph, critical_path, topological_levels
+from .utils.markdown_loader import MarkdownAgent, MarkdownAgentSpec, TriggerIndex, load_role_specs
 
 
-@dataclass
-class RunRecord:
-    """Keeps a log of every agent execution."""
+class RunSink(Protocol):
+    def append(self, record: RunRecord) -> None: ...
 
-    agent: str
-    timestamp: datetime
-    output: Dict[str, Any]
 
-    @property
-    def confidence(self) -> Optional[float]:
-        confidence = self.output.get("confidence")
-        return float(confidence) if confidence is not None else None
+# Result-cache key: the agent, its ``cache_config()`` and ``context_key`` of its inputs.
+CacheKey = Tuple[BaseAgent, Hashable, Tuple[Hashable, ...]]
+
+
+def _timed_execute(agent: BaseAgent, context: ContextSnapshot) -> Tuple[Dict[str, Any], float]:
+    start = time.perf_counter()
+    output = agent.execute(context)
+    return output, time.perf_counter() - start
+
+
+def _execute_detached(agent: BaseAgent, context: ContextSnapshot) -> Tuple[Dict[str, Any], float, Dict[str, Any]]:
+    """Pool entry point: run a copy of ``agent`` with a private state and return its notes.
+
+    The caller merges the notes back only if the result arrives in time, so an
+    agent that overran its timeout cannot touch the recorded state later.
+    """
+    worker = _detached(agent)
+    output, duration = _timed_execute(worker, context)
+    return output, duration, dict(worker.state.notes)
+
+
+async def _execute_async_detached(agent: BaseAgent, context: ContextSnapshot) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    worker = _detached(agent)
+    output = await worker.execute_async(context)
+    return output, dict(worker.state.notes)
+
+
+class _TimedOut(dict):
+    """Output recorded for an agent that missed its deadline; never published or memoized."""
+
+
+def _detached(agent: BaseAgent) -> BaseAgent:
+    # ``BaseAgent.__getstate__`` drops observers, so the copy reports to nobody.
+    worker = copy.copy(agent)
+    worker.state = AgentState()
+    return worker
 
 
 class SelfAwareAIBank:
-    """Coordinates a collection of autonomous banking agents."""
+    """Coordinates a collection of autonomous banking agents.
+
+    :attr:`context` is an immutable :class:`ContextSnapshot`. Every run hands
+    all of its agents the snapshot current when the run started, and
+    :meth:`update_context` swaps in a new version without copying values.
+
+    Parallel runs reuse one thread pool and one process pool across calls;
+    call :meth:`close` (or use the bank as a context manager) to release them.
 
-    def __init__(self, *, context: Optional[Dict[str, Any]] = None) -> None:
+    Registration, runs and reports hold one re-entrant lock, so agents
+    registered from another thread (e.g. ``MarkdownRoleWatcher``) join
+    between runs rather than part way through one.
+    """
+
+    def __init__(
+        self,
+        *,
+        context: Optional[Dict[str, Any]] = None,
+        history_capacity: Optional[int] = None,
+        run_sink: Optional[RunSink] = None,
+        skip_unmatched_markdown: bool = True,
+        result_cache: Optional[ResultCache] = None,
+    ) -> None:
         self.agents: List[BaseAgent] = []
-        self.context: Dict[str, Any] = context or {}
-        self.history: List[Dict[str, Any]] = []
+        self._context = ContextSnapshot(context)
+        self._context_lock = threading.Lock()
+        self.history = RunHistory(capacity=history_capacity)
+        # Optional persistence hook, e.g. ``RunLogWriter``; receives every RunRecord.
+        self.run_sink = run_sink
+        # Opt-in memoization of outputs keyed by (agent, its config, versions of its input keys).
+        self.result_cache = result_cache
         self.introspection = IntrospectionEngine(self)
+        # Marks agents pending when ``update_context`` touches a key in their ``inputs``.
+        self.events = ContextEventBus()
+        # Capability -> markdown agents; lets a run match every markdown agent in one pass over the triggers.
+        self.trigger_index = TriggerIndex()
+        self.skip_unmatched_markdown = skip_unmatched_markdown
+        self._durations: Dict[BaseAgent, float] = {}
+        self._graph_inputs: Dict[BaseAgent, Tuple[int, ...]] = {}
+        self._graph_outputs: Dict[BaseAgent, Dict[str, Any]] = {}
+        # "thread"/"process" -> (max_workers, executor), created on first parallel run.
+        self._pools: Dict[str, Tuple[Optional[int], Executor]] = {}
+        self._pools_lock = threading.Lock()
+        # Guards ``agents`` and the indexes derived from it; held for a whole run.
+        self._agents_lock = threading.RLock()
+
+    def __enter__(self) -> "SelfAwareAIBank":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker pools kept for parallel runs."""
+        with self._pools_lock:
+            pools, self._pools = self._pools, {}
+        for _, pool in pools.values():
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _pool(self, kind: str, max_workers: Optional[int]) -> Executor:
+        with self._pools_lock:
+            current = self._pools.get(kind)
+            if current is not None and current[0] == max_workers:
+                return current[1]
+            if current is not None:
+                current[1].shutdown(wait=False, cancel_futures=True)
+            factory = ProcessPoolExecutor if kind == "process" else ThreadPoolExecutor
+            pool = factory(max_workers=max_workers)
+            self._pools[kind] = (max_workers, pool)
+            return pool
+
+    def _discard_pool(self, kind: str) -> None:
+        # A worker stuck on an overrun agent would otherwise hold a slot for every later run.
+        with self._pools_lock:
+            current = self._pools.pop(kind, None)
+        if current is not None:
+            current[1].shutdown(wait=False, cancel_futures=True)
 
     # ------------------------------------------------------------------
     # Registration helpers
     # ------------------------------------------------------------------
     def register_agent(self, agent: BaseAgent) -> None:
-        self.agents.append(agent)
+        with self._agents_lock:
+            self.agents.append(agent)
+            self.introspection.track(agent)
+            self.events.subscribe(agent, agent.inputs)
+            if isinstance(agent, MarkdownAgent):
+                self.trigger_index.add(agent)
+
+    def unregister_agent(self, agent: BaseAgent) -> None:
+        with self._agents_lock:
+            self.agents.remove(agent)
+            self.introspection.untrack(agent)
+            self._forget(agent)
+
+    def replace_agent(self, old: BaseAgent, new: BaseAgent) -> None:
+        """Swap ``old`` for ``new`` in place, keeping its position in run order."""
+        with self._agents_lock:
+            self.agents[self.agents.index(old)] = new
+            self.introspection.untrack(old)
+            self.introspection.track(new)
+            self.events.subscribe(new, new.inputs)
+            if isinstance(new, MarkdownAgent):
+                self.trigger_index.add(new)
+            self._forget(old)
+
+    def _forget(self, agent: BaseAgent) -> None:
+        self.events.unsubscribe(agent)
+        if self.result_cache is not None:
+            self.result_cache.discard_owner(agent)
+        if isinstance(agent, MarkdownAgent):
+            self.trigger_index.discard(agent)
+        self._durations.pop(agent, None)
+        self._graph_inputs.pop(agent, None)
+        self._graph_outputs.pop(agent, None)
 
     def register_agents(self, agents: Iterable[BaseAgent]) -> None:
-        for agent in agents:
-            self.register_agent(agent)
+        with self._agents_lock:
+            for agent in agents:
+                self.register_agent(agent)
 
     def load_agents_from_specs(self, specs: Sequence[MarkdownAgentSpec]) -> None:
         for spec in specs:
             self.register_agent(spec.to_agent())
 
-    def load_markdown_roles(self, *paths: Path) -> List[MarkdownAgentSpec]:
-        specs = []
-        for path in paths:
-            spec = parse_role_markdown(path.read_text())
-            specs.append(spec)
-        return specs
+    def load_markdown_roles(
+        self, *paths: Path, cache_path: Optional[Path] = None, max_workers: Optional[int] = None
+    ) -> List[MarkdownAgentSpec]:
+        return load_role_specs(paths, cache_path=cache_path, max_workers=max_workers)
 
     # ------------------------------------------------------------------
     # Execution
     # ------------------------------------------------------------------
-    def run_agent(self, agent: BaseAgent) -> Dict[str, Any]:
-        output = agent.execute(self.context)
-        agent.update_state(notes={"last_output": output})
-        record = RunRecord(agent=agent.name, timestamp=datetime.now(timezone.utc), output=output)
-        log_entry = {
-            "agent": record.agent,
-            "timestamp": record.timestamp.isoformat(),
-            "output": record.output,
-        }
+    @property
+    def context(self) -> ContextSnapshot:
+        """The current context version."""
+        return self._context
+
+    def _match_markdown(self, agents: List[BaseAgent], snapshot: ContextSnapshot) -> List[BaseAgent]:
+        """Prime markdown agents with their matched capabilities and drop unmatched ones.
+
+        Matching is a single pass over the context triggers through
+        :attr:`trigger_index`; unmatched markdown agents are kept (with an empty
+        match) only when ``skip_unmatched_markdown`` is off.
+        """
+        if not any(isinstance(agent, MarkdownAgent) for agent in agents):
+            return agents
+        triggers = snapshot.get("triggers", ())
+        matches = self.trigger_index.match(triggers)
+        selected: List[BaseAgent] = []
+        for agent in agents:
+            if isinstance(agent, MarkdownAgent):
+                matched = matches.get(agent)
+                if matched is None and self.skip_unmatched_markdown:
+                    continue
+                agent.prime(matched or [], triggers)
+            selected.append(agent)
+        return selected
+
+    def _cache_key(self, agent: BaseAgent, snapshot: ContextSnapshot) -> Optional[CacheKey]:
+        if self.result_cache is None or not agent.cacheable or not agent.inputs:
+            return None
+        try:
+            key = (agent, agent.cache_config(), context_key(snapshot, agent.inputs))
+            hash(key)
+        except (TypeError, Unfingerprintable):
+            return None
+        return key
+
+    def _cached_output(
+        self, agent: BaseAgent, snapshot: ContextSnapshot
+    ) -> Tuple[Optional[CacheKey], Optional[Dict[str, Any]]]:
+        """Return the cache key for ``agent`` and its memoized output, if any."""
+        key = self._cache_key(agent, snapshot)
+        if key is None:
+            return None, None
+        return key, self.result_cache.get(key)
+
+    def _store_output(self, key: Optional[CacheKey], output: Dict[str, Any]) -> None:
+        if key is not None:
+            self.result_cache.put(key, output)
+
+    def run_agent(self, agent: BaseAgent, snapshot: Optional[ContextSnapshot] = None) -> Dict[str, Any]:
+        with self._agents_lock:
+            snapshot = self._context if snapshot is None else snapshot
+            key, cached = self._cached_output(agent, snapshot)
+            if cached is not None:
+                return self._record_run(agent, cached, snapshot)
+            output, duration = _timed_execute(agent, snapshot)
+            self._store_output(key, output)
+            return self._record_run(agent, output, snapshot, duration)
+
+    def _record_run(
+        self, agent: BaseAgent, output: Dict[str, Any], snapshot: ContextSnapshot, duration: Optional[float] = None
+    ) -> Dict[str, Any]:
+        if duration is not None:
+            self._durations[agent] = duration
+        record = RunRecord(agent.name, time.time_ns(), output, context_version=snapshot.version)
+        if not isinstance(output, _TimedOut):
+            # A completed run sees the current context, which settles pending change events;
+            # a timed-out agent stays pending so the next dispatch retries it.
+            self.events.discard(agent)
+        agent.state.last_run = record
+        agent.update_state()
         if record.confidence is not None:
-            log_entry["confidence"] = record.confidence
-        self.history.append(log_entry)
+            self.introspection.record_run(agent.name, record.confidence)
+        self.history.append(record)
+        if self.run_sink is not None:
+            self.run_sink.append(record)
         return output
 
-    def run_all(self) -> List[Tuple[str, Dict[str, Any]]]:
+    def _record_timeout(self, agent: BaseAgent, snapshot: ContextSnapshot, timeout: Optional[float]) -> Dict[str, Any]:
+        # Inactive agents are picked up and restarted by ``IntrospectionEngine.evolve``.
+        agent.update_state(active=False, notes={"timed_out_after": timeout})
+        return self._record_run(agent, _TimedOut(status="timeout", timeout=timeout), snapshot)
+
+    def run_all(
+        self,
+        *,
+        mode: str = "sequential",
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Run every registered agent against the shared context.
+
+        ``mode="parallel"`` runs agents concurrently: ``workload == "io"`` agents
+        in a thread pool and ``workload == "cpu"`` agents in a process pool.
+        In parallel mode ``timeout`` is one deadline, in seconds, shared by the
+        whole batch from submission. Results and history entries always follow registration order.
+        Markdown agents none of whose capabilities appear in
+        ``context["triggers"]`` are skipped unless ``skip_unmatched_markdown``
+        was disabled.
+        """
+        with self._agents_lock:
+            snapshot = self._context
+            agents = self._match_markdown(list(self.agents), snapshot)
+            return self._run_agents(agents, snapshot, mode, max_workers, timeout)
+
+    def _run_agents(
+        self,
+        agents: List[BaseAgent],
+        snapshot: ContextSnapshot,
+        mode: str,
+        max_workers: Optional[int],
+        timeout: Optional[float],
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        if mode == "sequential":
+            return [(agent.name, self.run_agent(agent, snapshot)) for agent in agents]
+        if mode == "parallel":
+            return self._run_parallel(agents, snapshot, max_workers=max_workers, timeout=timeout)
+        raise ValueError(f"Unknown execution mode: {mode!r}")
+
+    def _run_parallel(
+        self,
+        agents: List[BaseAgent],
+        snapshot: ContextSnapshot,
+        *,
+        max_workers: Optional[int],
+        timeout: Optional[float],
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        kinds: List[Optional[str]] = []
+        futures: List[Optional[Future]] = []
+        keys: List[Optional[CacheKey]] = []
+        cached: Dict[BaseAgent, Dict[str, Any]] = {}
+        for agent in agents:
+            key, output = self._cached_output(agent, snapshot)
+            keys.append(key)
+            if output is not None:
+                cached[agent] = output
+                kinds.append(None)
+                futures.append(None)
+                continue
+            kind = "process" if agent.workload == "cpu" else "thread"
+            kinds.append(kind)
+            futures.append(self._pool(kind, max_workers).submit(_execute_detached, agent, snapshot))
+
+        # One deadline for the whole batch, not one timeout per result in turn.
+        _, overdue = wait([future for future in futures if future is not None], timeout=timeout)
+
         results: List[Tuple[str, Dict[str, Any]]] = []
-        for agent in self.agents:
-            output = self.run_agent(agent)
-            results.append((agent.name, output))
+        for agent, key, kind, future in zip(agents, keys, kinds, futures):
+            if future is None:
+                results.append((agent.name, self._record_run(agent, cached[agent], snapshot)))
+                continue
+            if future in overdue:
+                future.cancel()
+                self._discard_pool(kind)
+                results.append((agent.name, self._record_timeout(agent, snapshot, timeout)))
+                continue
+            output, duration, notes = future.result()
+            agent.update_state(notes=notes)
+            self._store_output(key, output)
+            results.append((agent.name, self._record_run(agent, output, snapshot, duration)))
         return results
 
+    async def run_all_async(self, *, timeout: Optional[float] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """Await :meth:`BaseAgent.execute_async` for every agent concurrently.
+
+        The bank lock is held while the agents are picked and while results are
+        recorded, not across the awaits.
+        """
+        with self._agents_lock:
+            snapshot = self._context
+            agents = self._match_markdown(list(self.agents), snapshot)
+            lookups = [self._cached_output(agent, snapshot) for agent in agents]
+        pending = [agent for agent, (_, output) in zip(agents, lookups) if output is None]
+        executed = await asyncio.gather(
+            *(asyncio.wait_for(_execute_async_detached(agent, snapshot), timeout) for agent in pending),
+            return_exceptions=True,
+        )
+        fresh = dict(zip(pending, executed))
+        results: List[Tuple[str, Dict[str, Any]]] = []
+        with self._agents_lock:
+            for agent, (key, cached) in zip(agents, lookups):
+                if cached is not None:
+                    results.append((agent.name, self._record_run(agent, cached, snapshot)))
+                    continue
+                outcome = fresh[agent]
+                if isinstance(outcome, asyncio.TimeoutError):
+                    results.append((agent.name, self._record_timeout(agent, snapshot, timeout)))
+                elif isinstance(outcome, BaseException):
+                    raise outcome
+                else:
+                    output, notes = outcome
+                    agent.update_state(notes=notes)
+                    self._store_output(key, output)
+                    results.append((agent.name, self._record_run(agent, output, snapshot)))
+        return results
+
+    def dispatch(
+        self,
+        *,
+        mode: str = "sequential",
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Run only the agents with pending context change events.
+
+        :meth:`update_context` marks every agent whose ``inputs`` contain an
+        updated key as pending; any number of updates before a dispatch
+        results in one run per agent. Pending agents run in dependency order
+        and their ``outputs`` are published, so downstream agents fed by them
+        run in the same dispatch. Unmatched markdown agents are dropped from
+        the pending set as in :meth:`run_all`.
+        """
+        with self._agents_lock:
+            agents = list(self.agents)
+            graph = build_dependency_graph(agents)
+            results: List[Tuple[str, Dict[str, Any]]] = []
+            for level in topological_levels(agents, graph):
+                due = [agent for agent in level if agent in self.events]
+                if not due:
+                    continue
+                snapshot = self._context
+                selected = self._match_markdown(due, snapshot)
+                for agent in due:
+                    if agent not in selected:
+                        self.events.discard(agent)
+                outcomes = self._run_agents(selected, snapshot, mode, max_workers, timeout)
+                self._publish(
+                    {
+                        key: output
+                        for agent, (_, output) in zip(selected, outcomes)
+                        if not isinstance(output, _TimedOut)
+                        for key in agent.outputs
+                    }
+                )
+                results.extend(outcomes)
+            return results
+
+    def dependency_graph(self) -> Dict[str, List[str]]:
+        """Name-level view of which agents feed each agent's declared inputs."""
+        with self._agents_lock:
+            agents = list(self.agents)
+        graph = build_dependency_graph(agents)
+        return {agent.name: [upstream.name for upstream in graph[agent]] for agent in agents}
+
+    def run_graph(
+        self,
+        *,
+        parallel: bool = True,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        skip_unchanged: bool = True,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Run agents in dependency order, publishing outputs into the context.
+
+        Agents whose ``inputs`` match another agent's ``outputs`` run after it;
+        each level of independent agents runs concurrently when ``parallel``.
+        An agent is skipped, and its previous output reused, when none of its
+        declared input keys changed since its last graph run. Changes are
+        tracked through :meth:`update_context`, so in-place mutation of the
+        context is not detected. Agents without declared inputs always run.
+        In parallel mode ``timeout`` bounds every level, however many agents
+        it holds. An agent that times out publishes nothing and is retried on
+        the next call; its dependants keep seeing its previous output.
+        """
+        with self._agents_lock:
+            agents = list(self.agents)
+            graph = build_dependency_graph(agents)
+            results: List[Tuple[str, Dict[str, Any]]] = []
+            for level in topological_levels(agents, graph):
+                snapshot = self._context
+                due: Dict[BaseAgent, Tuple[int, ...]] = {}
+                for agent in level:
+                    signature = tuple(snapshot.key_version(key) for key in agent.inputs)
+                    if skip_unchanged and agent.inputs and self._graph_inputs.get(agent) == signature:
+                        continue
+                    due[agent] = signature
+                runnable = set(self._match_markdown(list(due), snapshot))
+                for agent in [agent for agent in due if agent not in runnable]:
+                    # Unmatched markdown agent: nothing to report until the triggers change.
+                    self._graph_inputs[agent] = due.pop(agent)
+                    self._graph_outputs.pop(agent, None)
+
+                # With a timeout even a lone agent goes through the pool, so it cannot overrun.
+                if parallel and (len(due) > 1 or (due and timeout is not None)):
+                    outcomes = self._run_parallel(list(due), snapshot, max_workers=max_workers, timeout=timeout)
+                    outputs = [output for _, output in outcomes]
+                else:
+                    outputs = [self.run_agent(agent, snapshot) for agent in due]
+
+                published: Dict[str, Any] = {}
+                timed_out: Dict[BaseAgent, Dict[str, Any]] = {}
+                for agent, output in zip(due, outputs):
+                    if isinstance(output, _TimedOut):
+                        timed_out[agent] = output
+                        continue
+                    self._graph_inputs[agent] = due[agent]
+                    self._graph_outputs[agent] = output
+                    published.update((key, output) for key in agent.outputs)
+                self._publish(published)
+                for agent in level:
+                    if agent in timed_out:
+                        results.append((agent.name, timed_out[agent]))
+                    elif agent in self._graph_outputs:
+                        results.append((agent.name, self._graph_outputs[agent]))
+            return results
+
+    def critical_path(self) -> Dict[str, Any]:
+        """Longest chain of dependent agents, weighted by their last run time."""
+        with self._agents_lock:
+            agents = list(self.agents)
+            graph = build_dependency_graph(agents)
+            path = critical_path(topological_levels(agents, graph), graph, self._durations)
+            return {
+                "agents": [agent.name for agent in path],
+                "duration": sum(self._durations.get(agent, 0.0) for agent in path),
+            }
+
     # ------------------------------------------------------------------
     # Reporting utilities
     # ------------------------------------------------------------------
     def agent_statuses(self) -> List[Dict[str, Any]]:
-        return [agent.report_status() for agent in self.agents]
+        with self._agents_lock:
+            return [agent.report_status() for agent in self.agents]
 
     def summary(self) -> Dict[str, Any]:
-        summary = {
-            "agents": self.agent_statuses(),
-            "history": list(self.history),
-            "introspection": self.introspection.analyze_performance(),
-        }
-        summary["interventions"] = self.introspection.evolve()
-        return summary
+        with self._agents_lock:
+            summary = {
+                "agents": self.agent_statuses(),
+                "history": [record.as_log_entry() for record in self.history],
+                "introspection": self.introspection.analyze_performance(),
+            }
+            if self.result_cache is not None:
+                summary["result_cache"] = self.result_cache.stats()
+            summary["interventions"] = self.introspection.evolve()
+            return summary
 
     # ------------------------------------------------------------------
     # Utilities
     # ------------------------------------------------------------------
-    def update_context(self, **kwargs: Any) -> None:
-        self.context.update(kwargs)
+    def update_context(self, **kwargs: Any) -> ContextSnapshot:
+        """Install a new context version with ``kwargs`` merged in.
+
+        Runs already in flight keep the snapshot they started with. Emits a
+        change event for each key and returns the new snapshot.
+        """
+        with self._agents_lock:
+            return self._publish(kwargs)
 
+    def _publish(self, changes: Dict[str, Any]) -> ContextSnapshot:
+        if not changes:
+            return self._context
+        with self._context_lock:
+            self._context = self._context.evolve(changes)
+            snapshot = self._context
+        self.events.emit(changes)
+        return snapshot
 
     def get_agent(self, name: str) -> Optional[BaseAgent]:
         """Return the first registered agent matching ``name``."""
-        for agent in self.agents:
-            if agent.name == name:
-                return agent
-        return None
+        with self._agents_lock:
+            agents = list(self.agents)
+        return next((agent for agent in agents if agent.name == name), None)
 
     def recent_history(self, *, limit: int = 10, agent: Optional[str] = None) -> List[Dict[str, Any]]:
         """Return recent run history, optionally filtered to one agent."""
-        entries = self.history
-        if agent is not None:
-            entries = [entry for entry in entries if entry.get("agent") == agent]
-        if limit <= 0:
-            return []
-        return entries[-limit:]
+        return [record.as_log_entry() for record in self.history.recent(limit, agent=agent)]
 
     def confidence_trend(self) -> Dict[str, Optional[float]]:
         """Compute first/latest confidence values and their delta."""
-        values = [entry["confidence"] for entry in self.history if "confidence" in entry]
-        if not values:
-            return {"first": None, "latest": None, "delta": None}
-        first = float(values[0])
-        latest = float(values[-1])
-        return {"first": first, "latest": latest, "delta": latest - first}
+        return self.history.confidence_trend()
 
     def has_agent(self, agent_type: Type[BaseAgent]) -> bool:
-        return any(isinstance(agent, agent_type) for agent in self.agents)
+        with self._agents_lock:
+            return any(isinstance(agent, agent_type) for agent in self.agents)
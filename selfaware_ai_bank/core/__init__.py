@@ -1,5 +1,7 @@
 """Core modules for SelfAware AI Bank."""
 from .base_agent import BaseAgent, AgentState
+from .context import ContextSnapshot
+from .history import RunHistory
 from .introspection_engine import IntrospectionEngine
 
-__all__ = ["BaseAgent", "AgentState", "IntrospectionEngine"]
+__all__ = ["BaseAgent", "AgentState", "ContextSnapshot", "IntrospectionEngine", "RunHistory"]
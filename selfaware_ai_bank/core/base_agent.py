@@ -1,49 +1,162 @@
 """Core primitives for the Self Aware AI Bank agents."""
 from __future__ import annotations
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .history import RunRecord
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 
-@dataclass
 class AgentState:
-    """Lightweight state container shared by every agent."""
+    """Lightweight state container shared by every agent.
+
+    ``last_update_ns`` holds integer nanoseconds since the epoch; ``last_update``
+    converts it on access and still accepts a ``datetime`` (naive values are
+    taken as UTC). ``last_run`` references the agent's latest ``RunRecord`` so
+    its output is not stored a second time in ``notes``.
+    """
+
+    __slots__ = ("active", "last_update_ns", "notes", "last_run")
+
+    def __init__(
+        self,
+        active: bool = True,
+        last_update: Optional[datetime] = None,
+        notes: Optional[Dict[str, Any]] = None,
+        last_run: Optional["RunRecord"] = None,
+        *,
+        last_update_ns: Optional[int] = None,
+    ) -> None:
+        self.active = active
+        self.last_update_ns = last_update_ns
+        if last_update is not None:
+            self.last_update = last_update
+        self.notes: Dict[str, Any] = notes if notes is not None else {}
+        self.last_run = last_run
+
+    @property
+    def last_update(self) -> Optional[datetime]:
+        if self.last_update_ns is None:
+            return None
+        return _EPOCH + timedelta(microseconds=self.last_update_ns // 1_000)
+
+    @last_update.setter
+    def last_update(self, value: Optional[datetime]) -> None:
+        if value is None:
+            self.last_update_ns = None
+            return
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        delta = value - _EPOCH
+        self.last_update_ns = ((delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds) * 1_000
+
+    def __repr__(self) -> str:
+        return f"AgentState(active={self.active!r}, last_update={self.last_update!r}, notes={self.notes!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AgentState):
+            return NotImplemented
+        return (self.active, self.last_update_ns, self.notes, self.last_run) == (
+            other.active,
+            other.last_update_ns,
+            other.notes,
+            other.last_run,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
 
-    active: bool = True
-    last_update: Optional[datetime] = None
-    notes: Dict[str, Any] = field(default_factory=dict)
+
+# Called after every ``update_state`` with the agent, its previous ``active``
+# flag and the notes delta that was applied.
+StateObserver = Callable[["BaseAgent", bool, Dict[str, Any]], None]
 
 
 class BaseAgent(ABC):
     """Base class that all specialised agents inherit from."""
 
+    #: Execution hint for parallel runs: ``"io"`` agents share a thread pool,
+    #: ``"cpu"`` agents are sent to a process pool and must be picklable.
+    workload: str = "io"
+    #: Context keys the agent reads and the keys its output is published under
+    #: when scheduled with ``SelfAwareAIBank.run_graph``.
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    #: Whether a bank with a ``ResultCache`` may reuse this agent's output while
+    #: its ``inputs`` and :meth:`cache_config` are unchanged. Agents without
+    #: declared inputs, or whose output depends on anything besides them, should opt out.
+    cacheable: bool = True
+
     def __init__(self, name: str, category: str, purpose: str) -> None:
         self.name = name
         self.category = category
         self.purpose = purpose
         self.state = AgentState()
+        self._observers: List[StateObserver] = []
 
     @abstractmethod
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Run the agent against the shared bank context."""
 
+    async def execute_async(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Awaitable variant of :meth:`execute`.
+
+        The default runs :meth:`execute` in a worker thread; agents that wait on
+        network or disk should override it with native ``await`` calls.
+        """
+        return await asyncio.to_thread(self.execute, context)
+
     def update_state(self, *, active: Optional[bool] = None, notes: Optional[Dict[str, Any]] = None) -> None:
         """Persist runtime information for introspection."""
+        was_active = self.state.active
         if active is not None:
             self.state.active = active
         if notes:
             self.state.notes.update(notes)
-        self.state.last_update = datetime.now(timezone.utc)
+        self.state.last_update_ns = time.time_ns()
+        for observer in self._observers:
+            observer(self, was_active, notes or {})
+
+    def add_observer(self, observer: StateObserver) -> None:
+        """Subscribe to state deltas pushed by :meth:`update_state`."""
+        if observer not in self._observers:
+            self._observers.append(observer)
+
+    def remove_observer(self, observer: StateObserver) -> None:
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def cache_config(self) -> Hashable:
+        """Settings that shape the output, folded into result-cache keys.
+
+        Defaults to every public instance attribute except ``state``; an agent
+        with unhashable settings should override it, and a cache lookup is
+        skipped when the value cannot be hashed.
+        """
+        return tuple(sorted((name, value) for name, value in vars(self).items() if name[0] != "_" and name != "state"))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Observers point back at the orchestrator; never ship them to worker processes.
+        state = self.__dict__.copy()
+        state["_observers"] = []
+        return state
 
     def report_status(self) -> Dict[str, Any]:
         """Return a structured view that the introspection engine can consume."""
+        last_update = self.state.last_update
+        notes = dict(self.state.notes)
+        if self.state.last_run is not None:
+            notes["last_output"] = self.state.last_run.output
         return {
             "agent": self.name,
             "category": self.category,
             "purpose": self.purpose,
             "active": self.state.active,
-            "last_update": self.state.last_update.isoformat() if self.state.last_update else None,
-            "notes": dict(self.state.notes),
+            "last_update": last_update.isoformat() if last_update else None,
+            "notes": notes,
         }
@@ -0,0 +1,80 @@
+"""Immutable, versioned snapshots of the shared bank context."""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+
+class ContextSnapshot(Mapping[str, Any]):
+    """Read-only view of the context at one version.
+
+    :meth:`evolve` returns a new snapshot holding a new top-level mapping
+    whose untouched values are shared with the previous version, so an update
+    costs O(number of keys) and never copies the values themselves. Handing
+    a snapshot to an agent is free and it cannot observe later updates.
+    Values are shared, not frozen: agents must not mutate them in place.
+
+    ``version`` counts updates to the whole context; :meth:`key_version`
+    counts updates to one key. Versions only compare within one ``lineage``:
+    a snapshot and everything evolved from it share that token.
+    """
+
+    __slots__ = ("_data", "_key_versions", "version", "lineage")
+
+    def __init__(
+        self,
+        data: Optional[Mapping[str, Any]] = None,
+        *,
+        version: int = 0,
+        key_versions: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        self._data: Dict[str, Any] = dict(data) if data else {}
+        self._key_versions: Dict[str, int] = dict(key_versions) if key_versions else {}
+        self.version = version
+        self.lineage = object()
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def __repr__(self) -> str:
+        return f"ContextSnapshot(version={self.version}, keys={list(self._data)!r})"
+
+    def __reduce__(self):
+        return (_restore, (self._data, self.version, self._key_versions))
+
+    def key_version(self, key: str) -> int:
+        return self._key_versions.get(key, 0)
+
+    def evolve(self, changes: Mapping[str, Any]) -> "ContextSnapshot":
+        """Return the next version with ``changes`` applied."""
+        if not changes:
+            return self
+        data = dict(self._data)
+        data.update(changes)
+        key_versions = dict(self._key_versions)
+        for key in changes:
+            key_versions[key] = key_versions.get(key, 0) + 1
+        snapshot = ContextSnapshot.__new__(ContextSnapshot)
+        snapshot._data = data
+        snapshot._key_versions = key_versions
+        snapshot.version = self.version + 1
+        snapshot.lineage = self.lineage
+        return snapshot
+
+
+def _restore(data: Dict[str, Any], version: int, key_versions: Dict[str, int]) -> ContextSnapshot:
+    return ContextSnapshot(data, version=version, key_versions=key_versions)
+
+
+__all__ = ["ContextSnapshot"]
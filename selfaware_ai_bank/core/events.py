@@ -0,0 +1,66 @@
+"""Context change events and the per-agent pending set they feed."""
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from .base_agent import BaseAgent
+
+# Called with the changed keys every time ``ContextEventBus.emit`` fires.
+ContextListener = Callable[[Tuple[str, ...]], None]
+
+
+class ContextEventBus:
+    """Routes context key changes to the agents subscribed to those keys.
+
+    Agents are subscribed to the keys in their ``inputs``. :meth:`emit` only
+    marks subscribers as pending, so a burst of updates touching the same
+    agent coalesces into a single entry until the agent runs and is
+    :meth:`discard`-ed.
+    Plain callables registered with :meth:`listen` see every emitted change.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, List[BaseAgent]] = {}
+        self._pending: Dict[BaseAgent, Set[str]] = {}
+        self._listeners: List[ContextListener] = []
+
+    def subscribe(self, agent: BaseAgent, keys: Iterable[str]) -> None:
+        for key in keys:
+            subscribers = self._subscribers.setdefault(key, [])
+            if agent not in subscribers:
+                subscribers.append(agent)
+
+    def unsubscribe(self, agent: BaseAgent) -> None:
+        for key in [key for key, subscribers in self._subscribers.items() if agent in subscribers]:
+            self._subscribers[key].remove(agent)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+        self._pending.pop(agent, None)
+
+    def subscriptions(self) -> Dict[str, List[BaseAgent]]:
+        return {key: list(subscribers) for key, subscribers in self._subscribers.items()}
+
+    def listen(self, listener: ContextListener) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def emit(self, keys: Iterable[str]) -> None:
+        keys = tuple(keys)
+        for key in keys:
+            for agent in self._subscribers.get(key, ()):
+                self._pending.setdefault(agent, set()).add(key)
+        for listener in self._listeners:
+            listener(keys)
+
+    def pending(self) -> Dict[BaseAgent, Set[str]]:
+        """Agents waiting to run, with the keys that changed since their last dispatch."""
+        return {agent: set(keys) for agent, keys in self._pending.items()}
+
+    def discard(self, agent: BaseAgent) -> None:
+        self._pending.pop(agent, None)
+
+    def __contains__(self, agent: object) -> bool:
+        return agent in self._pending
+
+
+__all__ = ["ContextEventBus", "ContextListener"]
@@ -0,0 +1,198 @@
+"""Run records and a bounded history with a per-agent index and confidence aggregates."""
+from __future__ import annotations
+
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, KeysView, List, Optional, Union
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class RunRecord:
+    """Immutable record of one agent execution.
+
+    Timestamps are integer nanoseconds since the epoch and only turned into
+    ``datetime`` or ISO strings on access. ``output`` is the very dict the agent
+    returned; the history, the agent's state and any sinks share this one
+    reference rather than holding copies. ``context_version`` is the version
+    of the context snapshot the agent ran against, when known.
+
+    Records also answer ``record["agent"]``/``record.get("output")`` with the
+    values of :meth:`as_log_entry`, so code written against the log-entry dicts
+    ``bank.history`` used to hold keeps working.
+    """
+
+    __slots__ = ("agent", "timestamp_ns", "output", "confidence", "context_version")
+
+    def __init__(
+        self,
+        agent: str,
+        timestamp_ns: int,
+        output: Dict[str, Any],
+        confidence: Optional[float] = None,
+        context_version: Optional[int] = None,
+    ) -> None:
+        if confidence is None:
+            confidence = output.get("confidence")
+        set_field = object.__setattr__
+        set_field(self, "agent", agent)
+        set_field(self, "timestamp_ns", timestamp_ns)
+        set_field(self, "output", output)
+        set_field(self, "confidence", float(confidence) if confidence is not None else None)
+        set_field(self, "context_version", context_version)
+
+    @classmethod
+    def from_log_entry(cls, entry: Dict[str, Any]) -> "RunRecord":
+        """Adopt a legacy log-entry dict (``agent``/``timestamp``/``output``/``confidence``)."""
+        timestamp = entry.get("timestamp")
+        if isinstance(timestamp, str):
+            parsed = datetime.fromisoformat(timestamp)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            delta = parsed - _EPOCH
+            timestamp_ns = ((delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds) * 1_000
+        else:
+            timestamp_ns = time.time_ns()
+        return cls(
+            entry.get("agent", "Unknown"),
+            timestamp_ns,
+            entry.get("output", {}),
+            entry.get("confidence"),
+            entry.get("context_version"),
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("RunRecord is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("RunRecord is immutable")
+
+    def __reduce__(self):
+        return (RunRecord, (self.agent, self.timestamp_ns, self.output, self.confidence, self.context_version))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RunRecord):
+            return NotImplemented
+        return (self.agent, self.timestamp_ns, self.output, self.confidence, self.context_version) == (
+            other.agent,
+            other.timestamp_ns,
+            other.output,
+            other.confidence,
+            other.context_version,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"RunRecord(agent={self.agent!r}, timestamp={self.isoformat()!r}, confidence={self.confidence!r})"
+
+    @property
+    def timestamp(self) -> datetime:
+        return _EPOCH + timedelta(microseconds=self.timestamp_ns // 1_000)
+
+    def isoformat(self) -> str:
+        return self.timestamp.isoformat()
+
+    def as_log_entry(self) -> Dict[str, Any]:
+        """Expand into the dict layout used by summaries and ``recent_history``."""
+        entry = {"agent": self.agent, "timestamp": self.isoformat(), "output": self.output}
+        if self.confidence is not None:
+            entry["confidence"] = self.confidence
+        if self.context_version is not None:
+            entry["context_version"] = self.context_version
+        return entry
+
+    def __getitem__(self, key: str) -> Any:
+        return self.as_log_entry()[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.as_log_entry().get(key, default)
+
+    def keys(self) -> KeysView[str]:
+        return self.as_log_entry().keys()
+
+
+class RunHistory:
+    """Ring buffer of :class:`RunRecord` entries.
+
+    ``capacity`` bounds how many entries are retained (``None`` keeps
+    everything). Legacy log-entry dicts passed to :meth:`append` are adopted
+    as records. Entries are indexed by agent name so per-agent
+    lookups cost O(k) in the number of entries returned. Confidence aggregates
+    (count, sum, first and latest value) are maintained on append and cover
+    every entry ever recorded, including entries evicted from the buffer.
+    """
+
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        if capacity is not None and capacity <= 0:
+            raise ValueError("History capacity must be positive.")
+        self.capacity = capacity
+        self._entries: Deque[RunRecord] = deque(maxlen=capacity)
+        self._by_agent: Dict[str, Deque[RunRecord]] = {}
+        self.confidence_count = 0
+        self.confidence_sum = 0.0
+        self.first_confidence: Optional[float] = None
+        self.latest_confidence: Optional[float] = None
+
+    def append(self, entry: Union[RunRecord, Dict[str, Any]]) -> None:
+        if not isinstance(entry, RunRecord):
+            entry = RunRecord.from_log_entry(entry)
+        if self.capacity is not None and len(self._entries) == self.capacity:
+            evicted = self._entries[0]
+            bucket = self._by_agent[evicted.agent]
+            bucket.popleft()
+            if not bucket:
+                del self._by_agent[evicted.agent]
+        self._entries.append(entry)
+        self._by_agent.setdefault(entry.agent, deque()).append(entry)
+
+        confidence = entry.confidence
+        if confidence is not None:
+            if self.first_confidence is None:
+                self.first_confidence = confidence
+            self.latest_confidence = confidence
+            self.confidence_count += 1
+            self.confidence_sum += confidence
+
+    def recent(self, limit: int = 10, agent: Optional[str] = None) -> List[RunRecord]:
+        """Return up to ``limit`` most recent entries, oldest first."""
+        if limit <= 0:
+            return []
+        entries = self._entries if agent is None else self._by_agent.get(agent, ())
+        newest_first = list(islice(reversed(entries), limit))
+        newest_first.reverse()
+        return newest_first
+
+    def average_confidence(self) -> Optional[float]:
+        if not self.confidence_count:
+            return None
+        return self.confidence_sum / self.confidence_count
+
+    def confidence_trend(self) -> Dict[str, Optional[float]]:
+        if self.first_confidence is None or self.latest_confidence is None:
+            return {"first": None, "latest": None, "delta": None}
+        return {
+            "first": self.first_confidence,
+            "latest": self.latest_confidence,
+            "delta": self.latest_confidence - self.first_confidence,
+        }
+
+    def agent_names(self) -> List[str]:
+        return list(self._by_agent)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[RunRecord]:
+        return iter(self._entries)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[RunRecord, List[RunRecord]]:
+        if isinstance(index, slice):
+            return list(self._entries)[index]
+        return self._entries[index]
+
+
+__all__ = ["RunHistory", "RunRecord"]
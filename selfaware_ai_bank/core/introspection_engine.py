@@ -2,38 +2,115 @@
 from __future__ import annotations
 
 from collections import Counter
-from statistics import mean
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, List, Optional
+
+from .base_agent import BaseAgent
+from .streaming_stats import ConfidenceStats
 
 
 class IntrospectionEngine:
-    """Aggregates signals from agents to surface trends and insights."""
+    """Aggregates signals from agents to surface trends and insights.
+
+    The engine is event-driven: it observes every tracked agent's
+    ``update_state`` calls and keeps category counts and the inactive set up to
+    date, so :meth:`analyze_performance` does not walk the agent list. Agents
+    registered on the bank after the engine was created are tracked through
+    :meth:`track`, which ``SelfAwareAIBank.register_agent`` calls for the bank's
+    own engine.
+
+    Per-agent confidence is tracked with streaming accumulators (EWMA, rolling
+    window over the last ``window_size`` runs, a ``window_seconds`` time window
+    and P-square quantiles). An agent is reported as degrading once it has at
+    least ``min_runs`` runs and its EWMA falls more than
+    ``degradation_threshold`` below its lifetime mean.
+    """
 
-    def __init__(self, bank: "SelfAwareAIBank") -> None:  # noqa: F821 (forward ref)
+    def __init__(
+        self,
+        bank: "SelfAwareAIBank",  # noqa: F821 (forward ref)
+        *,
+        window_size: int = 50,
+        window_seconds: float = 900.0,
+        ewma_alpha: float = 0.2,
+        degradation_threshold: float = 0.1,
+        min_runs: int = 5,
+    ) -> None:
         self.bank = bank
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.ewma_alpha = ewma_alpha
+        self.degradation_threshold = degradation_threshold
+        self.min_runs = min_runs
+        self._confidence: Dict[str, ConfidenceStats] = {}
+        self._degrading: Dict[str, None] = {}
+        self._tracked = 0
+        self._categories: Counter = Counter()
+        # Insertion-ordered set of agents currently reporting ``active=False``.
+        self._inactive: Dict[BaseAgent, None] = {}
+        for agent in bank.agents:
+            self.track(agent)
 
-    def analyze_performance(self) -> Dict[str, Any]:
-        """Summarise agent outputs and highlight inactive components."""
-        statuses = [agent.report_status() for agent in self.bank.agents]
-        category_counts = Counter(status["category"] for status in statuses)
-        inactive = [status for status in statuses if not status["active"]]
+    def track(self, agent: BaseAgent) -> None:
+        self._tracked += 1
+        self._categories[agent.category] += 1
+        agent.add_observer(self._on_state_change)
+        if not agent.state.active:
+            self._inactive[agent] = None
+
+    def untrack(self, agent: BaseAgent) -> None:
+        self._tracked -= 1
+        self._categories[agent.category] -= 1
+        if self._categories[agent.category] <= 0:
+            del self._categories[agent.category]
+        agent.remove_observer(self._on_state_change)
+        self._inactive.pop(agent, None)
 
-        run_metrics: Iterable[float] = [entry["confidence"] for entry in self.bank.history if "confidence" in entry]
-        avg_confidence = mean(run_metrics) if run_metrics else None
+    def _on_state_change(self, agent: BaseAgent, was_active: bool, notes: Dict[str, Any]) -> None:
+        if agent.state.active == was_active:
+            return
+        if agent.state.active:
+            self._inactive.pop(agent, None)
+        else:
+            self._inactive[agent] = None
 
+    def record_run(self, agent_name: str, confidence: float, now: Optional[float] = None) -> None:
+        """Fold one run's confidence into the agent's streaming statistics."""
+        stats = self._confidence.get(agent_name)
+        if stats is None:
+            stats = ConfidenceStats(
+                window_size=self.window_size, window_seconds=self.window_seconds, ewma_alpha=self.ewma_alpha
+            )
+            self._confidence[agent_name] = stats
+        stats.update(confidence, now)
+
+        lifetime = stats.lifetime
+        if lifetime.count >= self.min_runs and stats.ewma.value < lifetime.mean - self.degradation_threshold:
+            self._degrading[agent_name] = None
+        else:
+            self._degrading.pop(agent_name, None)
+
+    def agent_metrics(self, agent_name: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Rolling confidence metrics for one agent, or ``None`` if it never reported."""
+        stats = self._confidence.get(agent_name)
+        return stats.snapshot(now) if stats is not None else None
+
+    def degrading_agents(self) -> List[str]:
+        return list(self._degrading)
+
+    def analyze_performance(self) -> Dict[str, Any]:
+        """Summarise agent outputs and highlight inactive components."""
         return {
-            "agents_tracked": len(statuses),
-            "categories": dict(category_counts),
-            "inactive_agents": inactive,
-            "average_confidence": avg_confidence,
+            "agents_tracked": self._tracked,
+            "categories": dict(self._categories),
+            "inactive_agents": [agent.report_status() for agent in self._inactive],
+            "average_confidence": self.bank.history.average_confidence(),
+            "degrading_agents": list(self._degrading),
         }
 
     def evolve(self) -> List[Dict[str, Any]]:
         """Placeholder evolution routine that toggles dormant agents back online."""
         interventions = []
-        for agent in self.bank.agents:
-            status = agent.report_status()
-            if not status["active"]:
-                agent.update_state(active=True, notes={"restarted_by": "introspection"})
-                interventions.append({"agent": agent.name, "action": "restarted"})
+        for agent in list(self._inactive):
+            agent.update_state(active=True, notes={"restarted_by": "introspection"})
+            interventions.append({"agent": agent.name, "action": "restarted"})
         return interventions
@@ -0,0 +1,156 @@
+"""Memoization of agent outputs keyed by the versions of the context keys they read."""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+class Unfingerprintable(TypeError):
+    """Raised for context values whose content cannot be fingerprinted."""
+
+
+def _order(value: Any) -> Tuple[str, str]:
+    return type(value).__name__, repr(value)
+
+
+def _feed(digest: Any, value: Any) -> None:
+    if isinstance(value, _SCALARS):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, Mapping):
+        # Key order does not matter for equality, so feed entries in a canonical key order.
+        digest.update(b"{%d" % len(value))
+        for key in sorted(value, key=_order):
+            _feed(digest, key)
+            _feed(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[%d" % len(value))
+        for item in value:
+            _feed(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, (set, frozenset)):
+        digest.update(b"<%d" % len(value))
+        for item in sorted(value, key=_order):
+            _feed(digest, item)
+        digest.update(b">")
+    elif isinstance(value, array):
+        digest.update(b"a" + value.typecode.encode())
+        digest.update(value.tobytes())
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        digest.update(b"b%d:" % len(value))
+        digest.update(bytes(value))
+    elif hasattr(value, "__fingerprint__"):
+        _feed(digest, value.__fingerprint__())
+    else:
+        raise Unfingerprintable(f"Cannot fingerprint {type(value).__qualname__} values.")
+
+
+def fingerprint(value: Any) -> bytes:
+    """128-bit digest of the structure and content of ``value``.
+
+    Dicts, lists, tuples, sets, arrays and scalars are walked recursively;
+    other objects may provide ``__fingerprint__()`` returning any of those.
+    Everything else raises :class:`Unfingerprintable`.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _feed(digest, value)
+    return digest.digest()
+
+
+def context_key(context: Mapping[str, Any], keys: Sequence[str]) -> Tuple[Hashable, ...]:
+    """Cheap identity of the ``keys`` slice of a :class:`ContextSnapshot`.
+
+    Each key contributes its :meth:`~ContextSnapshot.key_version` within the
+    snapshot's lineage, so unchanged inputs match without reading their
+    values. Values providing ``__fingerprint__()`` are keyed by that content
+    digest instead, letting a reloaded but identical source hit the cache.
+    """
+    parts: List[Hashable] = [context.lineage]
+    for key in keys:
+        value = context.get(key)
+        if hasattr(value, "__fingerprint__"):
+            parts.append(fingerprint(value))
+        else:
+            parts.append(context.key_version(key) if key in context else None)
+    return tuple(parts)
+
+
+class ResultCache:
+    """Thread-safe LRU of outputs with optional time-to-live.
+
+    At most ``maxsize`` entries are kept; entries older than ``ttl`` seconds
+    are treated as misses and dropped on access.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and now - entry[0] >= self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, output: Dict[str, Any], now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._entries[key] = (now, output)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard_owner(self, owner: Any) -> None:
+        """Drop entries whose key is a tuple starting with ``owner``."""
+        with self._lock:
+            for key in [key for key in self._entries if isinstance(key, tuple) and key and key[0] is owner]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+__all__ = ["ResultCache", "Unfingerprintable", "context_key", "fingerprint"]
@@ -0,0 +1,159 @@
+"""Append-only, segmented on-disk log of agent runs.
+
+Each segment file holds length-prefixed records::
+
+    <u32 payload length> <u32 crc32(payload)> <i64 timestamp, microseconds since epoch> <payload>
+
+where the payload is the UTF-8 JSON encoding of ``{"agent": ..., "output": ...}``,
+plus ``"context_version"`` when the record carries one.
+A writer always opens a fresh segment, so a record torn by a crash can only sit
+at the tail of a segment; readers stop at the first short or corrupt record.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+
+from .history import RunRecord
+
+_HEADER = struct.Struct("<IIq")
+SEGMENT_SUFFIX = ".runlog"
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_micros(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    delta = timestamp - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+class RunLogWriter:
+    """Sink that appends :class:`RunRecord` entries to rotating segment files.
+
+    Segments rotate once they would exceed ``segment_bytes``. Data is flushed
+    to the OS after every record and ``fsync``-ed every ``fsync_every``
+    records, on rotation and on :meth:`close`.
+    """
+
+    def __init__(
+        self, directory: Union[str, Path], *, segment_bytes: int = 64 * 1024 * 1024, fsync_every: int = 64
+    ) -> None:
+        if segment_bytes <= _HEADER.size:
+            raise ValueError("segment_bytes is too small to hold a record.")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.fsync_every = max(1, fsync_every)
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+        self._segment_size = 0
+        self._unsynced = 0
+        existing = _segment_paths(self.directory)
+        self._next_segment = int(existing[-1].stem) + 1 if existing else 0
+
+    def append(self, record: RunRecord) -> None:
+        body: Dict[str, Any] = {"agent": record.agent, "output": record.output}
+        if record.context_version is not None:
+            body["context_version"] = record.context_version
+        payload = json.dumps(body, separators=(",", ":"), default=str).encode("utf-8")
+        frame = _HEADER.pack(len(payload), zlib.crc32(payload), record.timestamp_ns // 1_000) + payload
+        with self._lock:
+            if self._file is None or (self._segment_size and self._segment_size + len(frame) > self.segment_bytes):
+                self._rotate()
+            assert self._file is not None
+            self._file.write(frame)
+            self._file.flush()
+            self._segment_size += len(frame)
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                self._sync()
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+        path = self.directory / f"{self._next_segment:08d}{SEGMENT_SUFFIX}"
+        self._next_segment += 1
+        self._file = open(path, "ab")
+        self._segment_size = 0
+
+    def _sync(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "RunLogWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class RunLogReader:
+    """Replays segments through ``mmap`` without loading whole files into memory."""
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory)
+
+    def segments(self) -> List[Path]:
+        return _segment_paths(self.directory)
+
+    def replay(self) -> Iterator[RunRecord]:
+        return self.query()
+
+    def query(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[RunRecord]:
+        """Yield records with ``start <= timestamp < end``.
+
+        Headers are scanned in place; only payloads inside the range are decoded.
+        """
+        start_us = _to_micros(start) if start is not None else None
+        end_us = _to_micros(end) if end is not None else None
+        for path in self.segments():
+            if path.stat().st_size == 0:
+                continue
+            with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                offset = 0
+                size = len(view)
+                while offset + _HEADER.size <= size:
+                    length, checksum, micros = _HEADER.unpack_from(view, offset)
+                    body_start = offset + _HEADER.size
+                    body_end = body_start + length
+                    if body_end > size:
+                        break  # torn tail from an interrupted write
+                    offset = body_end
+                    if start_us is not None and micros < start_us:
+                        continue
+                    if end_us is not None and micros >= end_us:
+                        continue
+                    payload = view[body_start:body_end]
+                    if zlib.crc32(payload) != checksum:
+                        break
+                    data = json.loads(payload)
+                    yield RunRecord(
+                        data["agent"], micros * 1_000, data["output"], context_version=data.get("context_version")
+                    )
+
+
+def _segment_paths(directory: Path) -> List[Path]:
+    if not directory.exists():
+        return []
+    return sorted(path for path in directory.iterdir() if path.suffix == SEGMENT_SUFFIX and path.stem.isdigit())
+
+
+__all__ = ["RunLogReader", "RunLogWriter", "SEGMENT_SUFFIX"]
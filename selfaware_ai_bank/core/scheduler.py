@@ -0,0 +1,86 @@
+"""Dependency graph helpers for scheduling agents by the context keys they share."""
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence, Set
+
+from .base_agent import BaseAgent
+
+DependencyGraph = Dict[BaseAgent, List[BaseAgent]]
+
+
+def build_dependency_graph(agents: Sequence[BaseAgent]) -> DependencyGraph:
+    """Map each agent to the agents producing any of the context keys it reads."""
+    producers: Dict[str, List[BaseAgent]] = {}
+    for agent in agents:
+        for key in agent.outputs:
+            producers.setdefault(key, []).append(agent)
+
+    graph: DependencyGraph = {}
+    for agent in agents:
+        upstream: List[BaseAgent] = []
+        seen: Set[int] = set()
+        for key in agent.inputs:
+            for producer in producers.get(key, ()):
+                if producer is not agent and id(producer) not in seen:
+                    seen.add(id(producer))
+                    upstream.append(producer)
+        graph[agent] = upstream
+    return graph
+
+
+def topological_levels(agents: Sequence[BaseAgent], graph: DependencyGraph) -> List[List[BaseAgent]]:
+    """Group agents into levels whose members only depend on earlier levels.
+
+    Agents keep their registration order within a level. Raises ``ValueError``
+    when the declared inputs and outputs form a cycle.
+    """
+    remaining = {agent: len(graph[agent]) for agent in agents}
+    dependents: Dict[BaseAgent, List[BaseAgent]] = {agent: [] for agent in agents}
+    for agent in agents:
+        for upstream in graph[agent]:
+            dependents[upstream].append(agent)
+
+    levels: List[List[BaseAgent]] = []
+    ready = [agent for agent in agents if remaining[agent] == 0]
+    order = {agent: idx for idx, agent in enumerate(agents)}
+    placed = 0
+    while ready:
+        levels.append(ready)
+        placed += len(ready)
+        unlocked: List[BaseAgent] = []
+        for agent in ready:
+            for dependent in dependents[agent]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    unlocked.append(dependent)
+        ready = sorted(unlocked, key=order.__getitem__)
+    if placed != len(agents):
+        cyclic = sorted(agent.name for agent, count in remaining.items() if count > 0)
+        raise ValueError(f"Agent dependencies form a cycle: {', '.join(cyclic)}")
+    return levels
+
+
+def critical_path(
+    levels: Sequence[Sequence[BaseAgent]], graph: DependencyGraph, durations: Mapping[BaseAgent, float]
+) -> List[BaseAgent]:
+    """Return the chain of dependent agents with the largest total duration."""
+    finish: Dict[BaseAgent, float] = {}
+    via: Dict[BaseAgent, Optional[BaseAgent]] = {}
+    for level in levels:
+        for agent in level:
+            best: Optional[BaseAgent] = max(graph[agent], key=finish.__getitem__, default=None)
+            finish[agent] = (finish[best] if best is not None else 0.0) + durations.get(agent, 0.0)
+            via[agent] = best
+    if not finish:
+        return []
+
+    node: Optional[BaseAgent] = max(finish, key=finish.__getitem__)
+    path: List[BaseAgent] = []
+    while node is not None:
+        path.append(node)
+        node = via[node]
+    path.reverse()
+    return path
+
+
+__all__ = ["DependencyGraph", "build_dependency_graph", "critical_path", "topological_levels"]
@@ -0,0 +1,296 @@
+"""Constant-memory streaming statistics for agent confidence signals.
+
+Every accumulator updates in O(1) and never needs the full run history:
+
+* :class:`Welford` - lifetime count, mean and standard deviation.
+* :class:`EWMA` - exponentially weighted moving average.
+* :class:`RollingWindow` - mean/stddev/percentiles over the last ``size`` values.
+* :class:`TimeWindow` - mean/stddev over values seen in the last ``seconds``.
+* :class:`P2Quantile` - the P-square quantile estimator (Jain & Chlamtac, 1985),
+  five markers per tracked quantile.
+"""
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class _Moments:
+    """Welford mean and sum of squared deviations supporting removal.
+
+    Removal still loses a little precision each time, so callers
+    :meth:`rebuild` from their retained values once as many values have been
+    removed as remain - amortised O(1) per update.
+    """
+
+    __slots__ = ("count", "mean", "m2", "removed")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.removed = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value: float) -> None:
+        self.count -= 1
+        self.removed += 1
+        if not self.count:
+            self.mean = self.m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+
+    @property
+    def stale(self) -> bool:
+        return self.removed >= max(self.count, 1)
+
+    def rebuild(self, values: Iterable[float]) -> None:
+        self.count = 0
+        self.mean = self.m2 = 0.0
+        self.removed = 0
+        for value in values:
+            self.add(value)
+
+    @property
+    def stddev(self) -> Optional[float]:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Linearly interpolated percentile of already sorted values."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class Welford:
+    """Numerically stable running mean and variance."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> Optional[float]:
+        return self._m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def stddev(self) -> Optional[float]:
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+
+class EWMA:
+    """Exponentially weighted moving average seeded with the first value."""
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha: float = 0.2) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1].")
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> None:
+        self.value = value if self.value is None else self.value + self.alpha * (value - self.value)
+
+
+class RollingWindow:
+    """Last ``size`` values with Welford add/remove for O(1) mean and stddev."""
+
+    __slots__ = ("size", "_values", "_moments")
+
+    def __init__(self, size: int = 50) -> None:
+        if size <= 0:
+            raise ValueError("size must be positive.")
+        self.size = size
+        self._values: Deque[float] = deque()
+        self._moments = _Moments()
+
+    def update(self, value: float) -> None:
+        if len(self._values) == self.size:
+            self._moments.remove(self._values.popleft())
+        self._values.append(value)
+        self._moments.add(value)
+        if self._moments.stale:
+            self._moments.rebuild(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._moments.mean if self._values else None
+
+    @property
+    def stddev(self) -> Optional[float]:
+        return self._moments.stddev
+
+    def percentiles(self, quantiles: Sequence[float]) -> Dict[float, Optional[float]]:
+        """Exact percentiles over the window (sorts at most ``size`` values)."""
+        ordered = sorted(self._values)
+        return {q: percentile(ordered, q) for q in quantiles}
+
+
+class TimeWindow:
+    """Values observed during the last ``seconds``, evicted lazily."""
+
+    __slots__ = ("seconds", "_values", "_moments")
+
+    def __init__(self, seconds: float = 900.0) -> None:
+        if seconds <= 0:
+            raise ValueError("seconds must be positive.")
+        self.seconds = seconds
+        self._values: Deque[Tuple[float, float]] = deque()
+        self._moments = _Moments()
+
+    def _evict(self, now: float) -> None:
+        horizon = now - self.seconds
+        while self._values and self._values[0][0] <= horizon:
+            self._moments.remove(self._values.popleft()[1])
+        if self._moments.stale:
+            self._moments.rebuild(value for _, value in self._values)
+
+    def update(self, value: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._evict(now)
+        self._values.append((now, value))
+        self._moments.add(value)
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        self._evict(time.monotonic() if now is None else now)
+        count = len(self._values)
+        return {
+            "count": count,
+            "mean": self._moments.mean if count else None,
+            "stddev": self._moments.stddev,
+        }
+
+
+class P2Quantile:
+    """Streaming estimate of one quantile using five markers."""
+
+    __slots__ = ("q", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, q: float) -> None:
+        if not 0.0 < q < 1.0:
+            raise ValueError("q must be in (0, 1).")
+        self.q = q
+        self._heights: List[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5.0]
+        self._increments = [0.0, q / 2, q, (1 + q) / 2, 1.0]
+
+    def update(self, value: float) -> None:
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(idx for idx in range(4) if heights[idx] <= value < heights[idx + 1])
+
+        positions = self._positions
+        for idx in range(cell + 1, 5):
+            positions[idx] += 1
+        for idx in range(5):
+            self._desired[idx] += self._increments[idx]
+
+        for idx in (1, 2, 3):
+            offset = self._desired[idx] - positions[idx]
+            if (offset >= 1 and positions[idx + 1] - positions[idx] > 1) or (
+                offset <= -1 and positions[idx - 1] - positions[idx] < -1
+            ):
+                step = 1 if offset > 0 else -1
+                candidate = self._parabolic(idx, step)
+                if not heights[idx - 1] < candidate < heights[idx + 1]:
+                    candidate = heights[idx] + step * (heights[idx + step] - heights[idx]) / (
+                        positions[idx + step] - positions[idx]
+                    )
+                heights[idx] = candidate
+                positions[idx] += step
+
+    def _parabolic(self, idx: int, step: int) -> float:
+        h = self._heights
+        n = self._positions
+        return h[idx] + step / (n[idx + 1] - n[idx - 1]) * (
+            (n[idx] - n[idx - 1] + step) * (h[idx + 1] - h[idx]) / (n[idx + 1] - n[idx])
+            + (n[idx + 1] - n[idx] - step) * (h[idx] - h[idx - 1]) / (n[idx] - n[idx - 1])
+        )
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self._heights) < 5:
+            return percentile(self._heights, self.q)
+        return self._heights[2]
+
+
+class ConfidenceStats:
+    """Bundle of streaming accumulators describing one agent's confidence."""
+
+    QUANTILES: Tuple[float, ...] = (0.5, 0.9)
+
+    def __init__(self, *, window_size: int = 50, window_seconds: float = 900.0, ewma_alpha: float = 0.2) -> None:
+        self.lifetime = Welford()
+        self.ewma = EWMA(ewma_alpha)
+        self.recent = RollingWindow(window_size)
+        self.timed = TimeWindow(window_seconds)
+        self.quantiles = {q: P2Quantile(q) for q in self.QUANTILES}
+        self.latest: Optional[float] = None
+
+    def update(self, value: float, now: Optional[float] = None) -> None:
+        self.latest = value
+        self.lifetime.update(value)
+        self.ewma.update(value)
+        self.recent.update(value)
+        self.timed.update(value, now)
+        for estimator in self.quantiles.values():
+            estimator.update(value)
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "count": self.lifetime.count,
+            "latest": self.latest,
+            "mean": self.lifetime.mean if self.lifetime.count else None,
+            "stddev": self.lifetime.stddev,
+            "ewma": self.ewma.value,
+            "quantiles": {f"p{q * 100:g}": estimator.value for q, estimator in self.quantiles.items()},
+            "rolling": {
+                "count": len(self.recent),
+                "mean": self.recent.mean,
+                "stddev": self.recent.stddev,
+                "percentiles": {f"p{q * 100:g}": value for q, value in self.recent.percentiles(self.QUANTILES).items()},
+            },
+            "window": self.timed.stats(now),
+        }
+
+
+__all__ = ["ConfidenceStats", "EWMA", "P2Quantile", "RollingWindow", "TimeWindow", "Welford", "percentile"]
@@ -1,14 +1,26 @@
 """CYBER-OS v5.0 inspired game loop with Active Trace and SPA Web-Matrix."""
 from __future__ import annotations
 
+import asyncio
+import gzip
+import hashlib
+import heapq
 import json
 import threading
 from dataclasses import dataclass, field
+from email.utils import formatdate
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Any, Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple, Union
 from urllib.parse import parse_qs, urlparse
 
+from .core.memo import ResultCache
+
+try:  # Optional: adds a brotli copy of the SPA when installed.
+    import brotli as _brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    _brotli = None
+
 
 SYNONYM_GROUPS: Dict[str, List[str]] = {
     "sentient_ai": [
@@ -24,6 +36,161 @@ SYNONYM_GROUPS: Dict[str, List[str]] = {
 }
 
 
+def _normalize(value: str) -> str:
+    return value.strip().lower()
+
+
+def bounded_edit_distance(source: str, target: str, max_distance: int) -> int:
+    """Damerau-Levenshtein distance (optimal string alignment), capped at ``max_distance + 1``.
+
+    Only the diagonal band of width ``2 * max_distance + 1`` is filled, and the
+    scan stops as soon as a whole row exceeds the cap.
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+    if not source or not target:
+        return max(len(source), len(target))
+    over = max_distance + 1
+    width = len(target)
+    before = [over] * (width + 1)
+    previous = [min(col, over) for col in range(width + 1)]
+    for row in range(1, len(source) + 1):
+        char = source[row - 1]
+        low = max(1, row - max_distance)
+        high = min(width, row + max_distance)
+        current = [over] * (width + 1)
+        if low == 1:
+            current[0] = min(row, over)
+        best = current[0] if low == 1 else over
+        for col in range(low, high + 1):
+            cost = 0 if char == target[col - 1] else 1
+            value = min(previous[col] + 1, current[col - 1] + 1, previous[col - 1] + cost)
+            if row > 1 and col > 1 and char == target[col - 2] and source[row - 2] == target[col - 1]:
+                value = min(value, before[col - 2] + 1)
+            current[col] = value if value < over else over
+            if value < best:
+                best = value
+        if best > max_distance:
+            return over
+        before, previous = previous, current
+    return previous[width]
+
+
+def _similarity(distance: int, longest: int) -> float:
+    return 1.0 - distance / max(longest, 1)
+
+
+def _cutoff(score: float, longest: int) -> int:
+    # Largest distance whose similarity can still reach ``score``.
+    return max(int((1.0 - score) * max(longest, 1) + 1e-9), 0)
+
+
+class LexiconIndex:
+    """Search structures built once over a synonym lexicon.
+
+    Terms are normalised at build time. Exact synonym checks use a frozenset
+    per group, substring search intersects trigram postings before verifying
+    candidates, and fuzzy search visits terms bucketed by length in order of
+    their best possible score, stopping once no bucket can enter the top
+    ``limit``. Within a bucket each edit distance is computed with a cutoff
+    that tightens as the top ``limit`` fills up.
+    """
+
+    GRAM = 3
+
+    def __init__(self, groups: Mapping[str, Sequence[str]]) -> None:
+        self.source = groups
+        self.groups: List[str] = []
+        self.terms: List[str] = []
+        self.normalized: List[str] = []
+        self.synonyms: Dict[str, FrozenSet[str]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._by_length: Dict[int, List[int]] = {}
+        for group, terms in groups.items():
+            self.synonyms[group] = frozenset(map(_normalize, terms))
+            for term in terms:
+                self._add(group, term)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _add(self, group: str, term: str) -> None:
+        ident = len(self.terms)
+        normalized = _normalize(term)
+        self.groups.append(group)
+        self.terms.append(term)
+        self.normalized.append(normalized)
+        self._by_length.setdefault(len(normalized), []).append(ident)
+        for gram in {normalized[idx : idx + self.GRAM] for idx in range(len(normalized) - self.GRAM + 1)}:
+            self._postings.setdefault(gram, []).append(ident)
+
+    def _entry(self, ident: int, score: float) -> Tuple[str, str, float]:
+        return (self.groups[ident], self.terms[ident], score)
+
+    def is_synonym(self, value: str, group: str) -> bool:
+        return _normalize(value) in self.synonyms.get(group, ())
+
+    def substring(self, query: str) -> List[Tuple[str, str, float]]:
+        q = _normalize(query)
+        normalized = self.normalized
+        if len(q) < self.GRAM:
+            # Too short to index; such queries match a large share of the lexicon anyway.
+            return [self._entry(ident, 1.0) for ident, term in enumerate(normalized) if q in term]
+
+        postings = []
+        for gram in {q[idx : idx + self.GRAM] for idx in range(len(q) - self.GRAM + 1)}:
+            ids = self._postings.get(gram)
+            if ids is None:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                return []
+        return [self._entry(ident, 1.0) for ident in sorted(candidates) if q in normalized[ident]]
+
+    def fuzzy(self, query: str, *, limit: int = 10, min_score: float = 0.3) -> List[Tuple[str, str, float]]:
+        """Top ``limit`` terms by edit-distance similarity, ties in lexicon order.
+
+        Similarity is ``1 - distance / longer length`` using Damerau-Levenshtein
+        distance, so a single inserted, dropped or swapped letter costs one edit.
+        """
+        if limit <= 0:
+            return []
+        q = _normalize(query)
+        # A length gap of ``d`` needs at least ``d`` edits, which bounds a whole bucket.
+        buckets = sorted(
+            (
+                (_similarity(abs(len(q) - length), max(len(q), length)), length, ids)
+                for length, ids in self._by_length.items()
+            ),
+            key=lambda bucket: bucket[0],
+            reverse=True,
+        )
+        # Min-heap of (rounded score, -id): the root is the weakest of the current top ``limit``.
+        best: List[Tuple[float, int]] = []
+        normalized = self.normalized
+        for bound, length, ids in buckets:
+            if bound < min_score or (len(best) == limit and round(bound, 2) < best[0][0]):
+                break
+            longest = max(len(q), length)
+            for ident in ids:
+                # Anything rounding below the current weakest entry cannot displace it.
+                floor = min_score if len(best) < limit else max(min_score, best[0][0] - 0.005)
+                distance = bounded_edit_distance(q, normalized[ident], _cutoff(floor, longest))
+                score = _similarity(distance, longest)
+                if score < min_score:
+                    continue
+                item = (round(score, 2), -ident)
+                if len(best) < limit:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+        return [self._entry(-negated, score) for score, negated in sorted(best, reverse=True)]
+
+
 @dataclass
 class Account:
     account_id: str
@@ -33,6 +200,18 @@ class Account:
 
 @dataclass
 class SecureBankSystem:
+    """Game bank whose withdrawals are safe to call from many threads.
+
+    Balances are guarded by ``lock_stripes`` locks picked by account id, so
+    withdrawals on different accounts rarely contend; the trace level and
+    lockout flag change together under one small lock.
+
+    Each instance gets its own copy of :data:`SYNONYM_GROUPS` as ``lexicon``.
+    Assigning a new ``lexicon`` rebuilds the search index on next use; edits
+    made in place are not detected (checking would cost a lexicon scan per
+    query), so call :meth:`refresh_lexicon` after them.
+    """
+
     trace_level: int = 0
     locked: bool = False
     accounts: Dict[str, Account] = field(
@@ -44,38 +223,73 @@ class SecureBankSystem:
             )
         }
     )
+    lexicon: Dict[str, List[str]] = field(
+        default_factory=lambda: {group: list(terms) for group, terms in SYNONYM_GROUPS.items()}
+    )
+    lexicon_version: int = field(default=0, init=False, compare=False)
+    lock_stripes: int = field(default=64, repr=False, compare=False)
+    _index: Optional[LexiconIndex] = field(default=None, init=False, repr=False, compare=False)
+    _index_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _trace_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _account_locks: Tuple[threading.Lock, ...] = field(default=(), init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.lock_stripes <= 0:
+            raise ValueError("lock_stripes must be positive.")
+        self._account_locks = tuple(threading.Lock() for _ in range(self.lock_stripes))
+
+    def _account_lock(self, account_id: str) -> threading.Lock:
+        return self._account_locks[hash(account_id) % len(self._account_locks)]
+
+    def _adjust_trace(self, delta: int) -> int:
+        """Atomically add ``delta`` to the trace level, deploying BLACK ICE at 100."""
+        with self._trace_lock:
+            self.trace_level = max(0, min(100, self.trace_level + delta))
+            if self.trace_level >= 100:
+                self.locked = True
+            return self.trace_level
+
+    @property
+    def index(self) -> LexiconIndex:
+        """Search index over ``lexicon``, rebuilt when a different lexicon is assigned.
+
+        Only reassignment is noticed; after editing ``lexicon`` in place the
+        index stays stale until :meth:`refresh_lexicon` is called.
+        """
+        index = self._index
+        if index is None or index.source is not self.lexicon:
+            with self._index_lock:
+                index = self._index
+                if index is None or index.source is not self.lexicon:
+                    index = self._rebuild_index()
+        return index
+
+    def refresh_lexicon(self) -> LexiconIndex:
+        """Rebuild the index; call after editing ``lexicon`` in place."""
+        with self._index_lock:
+            return self._rebuild_index()
+
+    def _rebuild_index(self) -> LexiconIndex:
+        self._index = LexiconIndex(self.lexicon)
+        self.lexicon_version += 1
+        return self._index
 
     def _normalize(self, value: str) -> str:
-        return value.strip().lower()
+        return _normalize(value)
 
     def _score(self, query: str, term: str) -> float:
-        q = self._normalize(query)
-        t = self._normalize(term)
-        shared = sum(1 for idx in range(min(len(q), len(t))) if q[idx] == t[idx])
-        return shared / max(len(q), len(t), 1)
+        q, t = _normalize(query), _normalize(term)
+        longest = max(len(q), len(t))
+        return _similarity(bounded_edit_distance(q, t, longest), longest)
 
     def search_substring(self, query: str) -> List[Tuple[str, str, float]]:
-        q = self._normalize(query)
-        matches: List[Tuple[str, str, float]] = []
-        for group, terms in SYNONYM_GROUPS.items():
-            for term in terms:
-                if q in self._normalize(term):
-                    matches.append((group, term, 1.0))
-        return matches
+        return self.index.substring(query)
 
     def search_fuzzy(self, query: str, *, limit: int = 10, min_score: float = 0.3) -> List[Tuple[str, str, float]]:
-        matches: List[Tuple[str, str, float]] = []
-        for group, terms in SYNONYM_GROUPS.items():
-            for term in terms:
-                score = self._score(query, term)
-                if score >= min_score:
-                    matches.append((group, term, round(score, 2)))
-        matches.sort(key=lambda item: item[2], reverse=True)
-        return matches[:limit]
+        return self.index.fuzzy(query, limit=limit, min_score=min_score)
 
     def is_synonym(self, value: str, group: str) -> bool:
-        terms = SYNONYM_GROUPS.get(group, [])
-        return self._normalize(value) in {self._normalize(term) for term in terms}
+        return self.index.is_synonym(value, group)
 
     def request_withdrawal(
         self,
@@ -103,89 +317,448 @@ class SecureBankSystem:
             reason = "Invalid Cryptographic Signature."
         elif not self.is_synonym(passphrase, required_concept):
             reason = f"Semantic check failed for: {required_concept}"
-        elif account.balance < amount:
-            reason = "Insufficient network liquidity."
+
+        remaining = 0
+        if not reason:
+            # Check and debit under the account's stripe so concurrent withdrawals cannot overdraw.
+            with self._account_lock(account_id):
+                if self.locked:
+                    return "FATAL: BLACK ICE already deployed. Access permanently revoked."
+                if account.balance < amount:
+                    reason = "Insufficient network liquidity."
+                else:
+                    account.balance -= amount
+                    remaining = account.balance
 
         if reason:
-            self.trace_level += 35
-            if self.trace_level >= 100:
-                self.trace_level = 100
-                self.locked = True
+            trace_level = self._adjust_trace(35)
+            if trace_level >= 100:
                 return f"ACCESS DENIED: {reason} | CRITICAL: TRACE 100%. BLACK ICE DEPLOYED."
-            return f"ACCESS DENIED: {reason} | Trace level {self.trace_level}%"
+            return f"ACCESS DENIED: {reason} | Trace level {trace_level}%"
 
-        account.balance -= amount
-        self.trace_level = max(0, self.trace_level - 20)
-        return f"TRANSACTION APPROVED. FUNDS DISBURSED. Remaining balance: ${account.balance:,}."
+        self._adjust_trace(-20)
+        return f"TRANSACTION APPROVED. FUNDS DISBURSED. Remaining balance: ${remaining:,}."
 
 
-class _CyberRequestHandler(BaseHTTPRequestHandler):
-    bank: SecureBankSystem
+class _Reply(NamedTuple):
+    status: HTTPStatus
+    content_type: str
+    body: bytes
+    headers: Tuple[Tuple[str, str], ...] = ()
 
-    def _write(self, payload: str, status: HTTPStatus = HTTPStatus.OK, content_type: str = "text/html") -> None:
-        body = payload.encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
 
-    def log_message(self, format: str, *args) -> None:  # noqa: A003
-        return
+class _Miss(NamedTuple):
+    """An API request whose response is not cached yet."""
 
-    def do_GET(self) -> None:  # noqa: N802
-        parsed = urlparse(self.path)
+    path: str
+    query: str
+    version: int
+    headers: Mapping[str, str]
+
+
+def _etag(body: bytes, suffix: str = "") -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}{suffix}"'
+
+
+def _accepted_encodings(header: str) -> Set[str]:
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        quality = params.strip()
+        if quality.startswith("q=") and quality[2:].strip() in {"0", "0.0", "0.00", "0.000"}:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+class _StaticAsset:
+    """A page encoded once, with precompressed variants keyed by content coding."""
+
+    def __init__(self, text: str, content_type: str) -> None:
+        self.content_type = content_type
+        identity = text.encode("utf-8")
+        self.variants: Dict[str, Tuple[bytes, str]] = {"identity": (identity, _etag(identity))}
+        if _brotli is not None:
+            self.variants["br"] = (_brotli.compress(identity), _etag(identity, "-br"))
+        self.variants["gzip"] = (gzip.compress(identity, compresslevel=9, mtime=0), _etag(identity, "-gzip"))
+
+    def select(self, accept_encoding: str) -> Tuple[str, bytes, str]:
+        accepted = _accepted_encodings(accept_encoding)
+        for coding in ("br", "gzip"):
+            if coding in self.variants and (coding in accepted or "*" in accepted):
+                return (coding, *self.variants[coding])
+        return ("identity", *self.variants["identity"])
+
+
+class _MatrixApp:
+    """Routes shared by every MatrixServer backend.
+
+    The SPA is encoded and compressed once. Serialised API responses are kept
+    in an LRU keyed by endpoint and normalised query, cleared whenever the
+    bank's lexicon is rebuilt. Every 200 carries an ETag and a matching
+    ``If-None-Match`` gets a bodyless 304.
+    """
+
+    def __init__(self, bank: SecureBankSystem, *, cache_size: int = 1_024) -> None:
+        self.bank = bank
+        self.spa = _StaticAsset(_spa_html(), "text/html")
+        self.responses = ResultCache(maxsize=cache_size)
+        self._lexicon_version = bank.lexicon_version
+
+    def respond(self, target: str, headers: Optional[Mapping[str, str]] = None) -> _Reply:
+        """Build the reply to a GET of ``target``; ``headers`` are the lower-cased request headers."""
+        reply = self.lookup(target, headers)
+        return self.complete(reply) if isinstance(reply, _Miss) else reply
+
+    def lookup(self, target: str, headers: Optional[Mapping[str, str]] = None) -> Union[_Reply, _Miss]:
+        """Answer ``target`` from static routes and the response cache without searching.
+
+        Returns the :class:`_Miss` to hand to :meth:`complete` when the API
+        response still has to be computed.
+        """
+        headers = headers or {}
+        parsed = urlparse(target)
         if parsed.path == "/":
-            self._write(_spa_html(), content_type="text/html")
-            return
+            coding, body, etag = self.spa.select(headers.get("accept-encoding", ""))
+            extra = (("ETag", etag), ("Vary", "Accept-Encoding"), ("Cache-Control", "no-cache"))
+            if coding != "identity":
+                extra += (("Content-Encoding", coding),)
+            return self._conditional(_Reply(HTTPStatus.OK, self.spa.content_type, body, extra), headers)
 
         if parsed.path not in {"/api/search", "/api/fuzzy"}:
-            self._write("Not found", status=HTTPStatus.NOT_FOUND, content_type="text/plain")
-            return
+            return _Reply(HTTPStatus.NOT_FOUND, "text/plain", b"Not found")
 
         params = parse_qs(parsed.query)
-        query = (params.get("q", [""])[0]).strip()
-        if parsed.path == "/api/search":
-            data = self.bank.search_substring(query)
+        query = _normalize(params.get("q", [""])[0])
+        version = self._version()
+        entry = self.responses.get((parsed.path, query, version))
+        if entry is None:
+            return _Miss(parsed.path, query, version, headers)
+        return self._api_reply(entry, headers)
+
+    def complete(self, miss: _Miss) -> _Reply:
+        """Run the search for ``miss``, cache the serialised result and build the reply."""
+        if miss.path == "/api/search":
+            data = self.bank.search_substring(miss.query)
         else:
-            data = self.bank.search_fuzzy(query)
-
+            data = self.bank.search_fuzzy(miss.query)
         payload = [
             {"group": group, "term": term, "score": score}
             for group, term, score in data
         ]
-        self._write(json.dumps(payload), content_type="application/json")
+        body = json.dumps(payload).encode("utf-8")
+        entry = {"body": body, "etag": _etag(body)}
+        self.responses.put((miss.path, miss.query, miss.version), entry)
+        return self._api_reply(entry, miss.headers)
+
+    def _version(self) -> int:
+        # ``index`` rebuilds a replaced lexicon, bumping the version this cache is keyed on.
+        self.bank.index
+        version = self.bank.lexicon_version
+        if version != self._lexicon_version:
+            self.responses.clear()
+            self._lexicon_version = version
+        return version
+
+    def _api_reply(self, entry: Dict[str, Any], headers: Mapping[str, str]) -> _Reply:
+        extra = (("ETag", entry["etag"]), ("Cache-Control", "no-cache"))
+        return self._conditional(_Reply(HTTPStatus.OK, "application/json", entry["body"], extra), headers)
+
+    @staticmethod
+    def _conditional(reply: _Reply, headers: Mapping[str, str]) -> _Reply:
+        etag = dict(reply.headers).get("ETag")
+        if etag and _matches(headers.get("if-none-match", ""), etag):
+            kept = tuple((name, value) for name, value in reply.headers if name != "Content-Encoding")
+            return _Reply(HTTPStatus.NOT_MODIFIED, reply.content_type, b"", kept)
+        return reply
+
+
+class _CyberRequestHandler(BaseHTTPRequestHandler):
+    app: _MatrixApp
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A003
+        return
+
+    def _reply(self, *, head: bool) -> None:
+        headers = {name.lower(): value for name, value in self.headers.items()}
+        reply = self.app.respond(self.path, headers)
+        self.send_response(reply.status)
+        self.send_header("Content-Type", f"{reply.content_type}; charset=utf-8")
+        if reply.status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Length", str(len(reply.body)))
+        for name, value in reply.headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if not head:
+            self.wfile.write(reply.body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._reply(head=False)
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        self._reply(head=True)
+
+
+class _AsyncMatrixServer:
+    """HTTP/1.1 server on an asyncio loop running in a background thread.
+
+    Connections are kept alive and pipelined requests are answered in order.
+    At most ``max_connections`` connections are served at once; a client
+    connecting beyond that gets ``503 Service Unavailable`` with
+    ``Retry-After`` and is disconnected. Request bodies over ``max_body``
+    bytes get ``413``. Cached and static replies are built on the loop, while
+    searches for uncached queries run in the loop's default executor.
+    Replies go out through ``drain()``, so a slow reader stalls only its own
+    connection, and a connection idle for ``keepalive_timeout`` seconds is
+    closed.
+    """
+
+    max_request_line = 8_192
+    max_headers = 100
+    max_body = 64 * 1_024
+    # How long a refused client gets to finish sending its request before the 503.
+    refuse_timeout = 1.0
+
+    def __init__(
+        self,
+        app: _MatrixApp,
+        host: str,
+        port: int,
+        *,
+        max_connections: int,
+        keepalive_timeout: float,
+    ) -> None:
+        self.app = app
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.loop = asyncio.new_event_loop()
+        self._tasks: Set[asyncio.Task] = set()
+        self._active = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self._listen(host, port), self.loop).result()
+        except BaseException:
+            self._close_loop()
+            raise
+
+    @property
+    def server_address(self) -> Tuple[str, int]:
+        assert self._server is not None
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def _listen(self, host: str, port: int) -> None:
+        self._server = await asyncio.start_server(
+            self._serve, host, port, limit=self.max_request_line, backlog=self.max_connections
+        )
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            if self._active >= self.max_connections:
+                await self._refuse(reader, writer)
+                return
+            self._active += 1
+            try:
+                while await self._exchange(reader, writer):
+                    pass
+            finally:
+                self._active -= 1
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        except asyncio.CancelledError:
+            # Cancelled by ``shutdown``; finishing normally keeps the stream callback quiet.
+            pass
+        finally:
+            self._tasks.discard(task)
+            writer.close()
+
+    async def _refuse(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Read the request first: closing with unread input would reset the connection
+        # and could discard the 503 before the client sees it.
+        try:
+            await asyncio.wait_for(self._read_head(reader), self.refuse_timeout)
+        except (ValueError, UnicodeDecodeError, asyncio.TimeoutError):
+            pass
+        busy = _Reply(HTTPStatus.SERVICE_UNAVAILABLE, "text/plain", b"Server busy", (("Retry-After", "1"),))
+        await self._send(writer, busy, keep_alive=False)
+
+    async def _read_head(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+        """Read a request line and headers; ``None`` at end of stream."""
+        line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+        if not line:
+            return None
+        method, target, version = line.decode("latin-1").split()
+        headers: Dict[str, str] = {}
+        while True:
+            header = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+            if header in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= self.max_headers:
+                raise ValueError("too many headers")
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return method, target, version, headers
+
+    async def _exchange(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Answer one request; return whether the connection stays open."""
+        try:
+            head = await self._read_head(reader)
+            if head is None:
+                return False
+            method, target, version, headers = head
+            length = int(headers.get("content-length", 0))
+            if length < 0:
+                raise ValueError("negative content-length")
+        except (ValueError, UnicodeDecodeError):
+            # Covers malformed lines, lines over the reader limit and bad lengths.
+            await self._send(writer, _Reply(HTTPStatus.BAD_REQUEST, "text/plain", b"Bad request"), keep_alive=False)
+            return False
+        if length > self.max_body:
+            too_large = _Reply(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "text/plain", b"Request body too large")
+            await self._send(writer, too_large, keep_alive=False)
+            return False
+        if length:
+            await asyncio.wait_for(reader.readexactly(length), self.keepalive_timeout)
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        if method in ("GET", "HEAD"):
+            reply = self.app.lookup(target, headers)
+            if isinstance(reply, _Miss):
+                # Searching is CPU work; keep it off the loop so other connections stay responsive.
+                reply = await self.loop.run_in_executor(None, self.app.complete, reply)
+        else:
+            reply = _Reply(HTTPStatus.NOT_IMPLEMENTED, "text/plain", b"Unsupported method")
+        await self._send(writer, reply, keep_alive=keep_alive, head=method == "HEAD")
+        return keep_alive
+
+    @staticmethod
+    async def _send(
+        writer: asyncio.StreamWriter,
+        reply: _Reply,
+        *,
+        keep_alive: bool,
+        head: bool = False,
+    ) -> None:
+        lines = [
+            f"HTTP/1.1 {reply.status.value} {reply.status.phrase}",
+            f"Date: {formatdate(usegmt=True)}",
+            f"Content-Type: {reply.content_type}; charset=utf-8",
+        ]
+        if reply.status != HTTPStatus.NOT_MODIFIED:
+            lines.append(f"Content-Length: {len(reply.body)}")
+        lines.extend(f"{name}: {value}" for name, value in reply.headers)
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        response = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        writer.write(response if head else response + reply.body)
+        await writer.drain()
+
+    async def _shutdown(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        await self.loop.shutdown_default_executor()
+
+    def _close_loop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def shutdown(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        self._close_loop()
 
 
 class MatrixServer:
-    def __init__(self, bank: SecureBankSystem, host: str = "0.0.0.0", port: int = 8080) -> None:
+    """Serves the Web-Matrix SPA and lexicon API.
+
+    ``start()`` picks the backend: ``"threading"`` (one thread per
+    connection, the default) or ``"asyncio"`` (a single event loop with
+    keep-alive, pipelining and at most ``max_connections`` open connections;
+    clients beyond that are answered ``503`` and disconnected).
+    """
+
+    BACKENDS = ("threading", "asyncio")
+
+    def __init__(
+        self,
+        bank: SecureBankSystem,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        *,
+        max_connections: int = 1_024,
+        keepalive_timeout: float = 15.0,
+        response_cache_size: int = 1_024,
+    ) -> None:
         self.bank = bank
         self.host = host
         self.port = port
-        self._server: Optional[ThreadingHTTPServer] = None
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.response_cache_size = response_cache_size
+        self.backend: Optional[str] = None
+        self._app: Optional[_MatrixApp] = None
+        self._server: Optional[Union[ThreadingHTTPServer, _AsyncMatrixServer]] = None
         self._thread: Optional[threading.Thread] = None
 
     @property
     def running(self) -> bool:
         return self._server is not None
 
-    def start(self) -> None:
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Hit/miss counters of the API response cache while the server runs."""
+        return self._app.responses.stats() if self._app is not None else None
+
+    def start(self, backend: str = "threading") -> None:
         if self.running:
             return
-
-        handler = type("CyberRequestHandler", (_CyberRequestHandler,), {})
-        handler.bank = self.bank
-        self._server = ThreadingHTTPServer((self.host, self.port), handler)
-        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
-        self._thread.start()
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown MatrixServer backend {backend!r}; expected one of {self.BACKENDS}.")
+
+        app = self._app = _MatrixApp(self.bank, cache_size=self.response_cache_size)
+        if backend == "asyncio":
+            self._server = _AsyncMatrixServer(
+                app,
+                self.host,
+                self.port,
+                max_connections=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+        else:
+            handler = type("CyberRequestHandler", (_CyberRequestHandler,), {})
+            handler.app = app
+            self._server = ThreadingHTTPServer((self.host, self.port), handler)
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        # Reflect the bound port, which the OS picks when ``port`` is 0.
+        self.port = self._server.server_address[1]
+        self.backend = backend
 
     def stop(self) -> None:
         if not self._server:
             return
         self._server.shutdown()
-        self._server.server_close()
+        if isinstance(self._server, ThreadingHTTPServer):
+            self._server.server_close()
         self._server = None
         self._thread = None
+        self._app = None
+        self.backend = None
 
 
 def scan_network() -> List[str]:
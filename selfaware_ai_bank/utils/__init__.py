@@ -1,4 +1,20 @@
 """Utility helpers."""
-from .markdown_loader import MarkdownAgentSpec, parse_role_markdown
+from .markdown_loader import (
+    MarkdownAgent,
+    MarkdownAgentSpec,
+    MarkdownSpecCache,
+    TriggerIndex,
+    load_role_specs,
+    parse_role_markdown,
+)
+from .markdown_watcher import MarkdownRoleWatcher
 
-__all__ = ["MarkdownAgentSpec", "parse_role_markdown"]
+__all__ = [
+    "MarkdownAgent",
+    "MarkdownAgentSpec",
+    "MarkdownRoleWatcher",
+    "MarkdownSpecCache",
+    "TriggerIndex",
+    "load_role_specs",
+    "parse_role_markdown",
+]
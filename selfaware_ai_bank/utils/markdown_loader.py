@@ -1,9 +1,14 @@
 """Utilities that transform markdown role descriptions into runnable agents."""
 from __future__ import annotations
 
+import json
+import os
 import re
-from dataclasses import dataclass
-from typing import Any, Dict, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from ..core.base_agent import BaseAgent
 
@@ -14,28 +19,83 @@ class MarkdownAgentSpec:
     purpose: str
     capabilities: List[str]
 
-    def to_agent(self) -> BaseAgent:
-        spec = self
+    def to_agent(self) -> "MarkdownAgent":
+        return MarkdownAgent(self)
 
-        class MarkdownAgent(BaseAgent):
-            def __init__(self) -> None:
-                super().__init__(
-                    name=spec.name,
-                    category="Markdown",  # default grouping
-                    purpose=spec.purpose,
-                )
 
-            def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
-                matched = [cap for cap in spec.capabilities if cap in context.get("triggers", [])]
-                confidence = 0.2 + 0.8 * (len(matched) / max(len(spec.capabilities), 1))
-                self.update_state(notes={"matched_capabilities": matched})
-                return {
-                    "message": f"Processed markdown-defined role '{spec.name}'.",
-                    "matched_capabilities": matched,
-                    "confidence": round(confidence, 2),
-                }
+class MarkdownAgent(BaseAgent):
+    """Agent backed by a :class:`MarkdownAgentSpec`; one shared class for every role file."""
 
-        return MarkdownAgent()
+    category = "Markdown"  # default grouping
+    inputs = ("triggers",)
+    cacheable = False  # matching is primed per trigger set by the bank
+
+    def __init__(self, spec: MarkdownAgentSpec) -> None:
+        super().__init__(name=spec.name, category=self.category, purpose=spec.purpose)
+        self.capabilities: Tuple[str, ...] = tuple(spec.capabilities)
+        self._primed: Optional[Tuple[Any, List[str]]] = None
+
+    def match(self, triggers: Iterable[str]) -> List[str]:
+        trigger_set = triggers if isinstance(triggers, (set, frozenset)) else set(triggers)
+        return [cap for cap in self.capabilities if cap in trigger_set]
+
+    def prime(self, matched: List[str], triggers: Any) -> None:
+        """Hand in capabilities matched ahead of time, e.g. by :class:`TriggerIndex`.
+
+        The match is tied to the ``triggers`` object it was computed from and
+        used by every run whose context carries that same object, so a skipped
+        or timed-out run cannot leave a match behind for a later context.
+        """
+        self._primed = (triggers, matched)
+
+    def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        triggers = context.get("triggers", ())
+        primed = self._primed
+        matched = primed[1] if primed is not None and primed[0] is triggers else self.match(triggers)
+        confidence = 0.2 + 0.8 * (len(matched) / max(len(self.capabilities), 1))
+        self.update_state(notes={"matched_capabilities": matched})
+        return {
+            "message": f"Processed markdown-defined role '{self.name}'.",
+            "matched_capabilities": matched,
+            "confidence": round(confidence, 2),
+        }
+
+
+class TriggerIndex:
+    """Inverted index from capability to the markdown agents declaring it.
+
+    :meth:`match` walks the distinct triggers once and returns the matched
+    capabilities of every agent with at least one hit, in the agent's own
+    capability order. Agents without a hit are absent from the result.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, List[Tuple[MarkdownAgent, int]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._postings)
+
+    def add(self, agent: MarkdownAgent) -> None:
+        for position, cap in enumerate(agent.capabilities):
+            self._postings.setdefault(cap, []).append((agent, position))
+
+    def discard(self, agent: MarkdownAgent) -> None:
+        for cap in set(agent.capabilities):
+            postings = [entry for entry in self._postings.get(cap, ()) if entry[0] is not agent]
+            if postings:
+                self._postings[cap] = postings
+            else:
+                self._postings.pop(cap, None)
+
+    def match(self, triggers: Iterable[str]) -> Dict[MarkdownAgent, List[str]]:
+        hits: Dict[MarkdownAgent, List[int]] = {}
+        for trigger in set(triggers):
+            for agent, position in self._postings.get(trigger, ()):
+                hits.setdefault(agent, []).append(position)
+        return {
+            agent: [agent.capabilities[position] for position in sorted(positions)]
+            for agent, positions in hits.items()
+        }
 
 
 def parse_role_markdown(content: str) -> MarkdownAgentSpec:
@@ -49,3 +109,118 @@ def parse_role_markdown(content: str) -> MarkdownAgentSpec:
     capabilities = [line[2:].strip() for line in lines if line.strip().startswith("- ")]
 
     return MarkdownAgentSpec(name=name, purpose=purpose, capabilities=capabilities)
+
+
+class MarkdownSpecCache:
+    """On-disk cache of parsed specs keyed by path, modification time and size.
+
+    Entries are stored as one JSON document. A file is reparsed only when its
+    ``st_mtime_ns`` or ``st_size`` differ from the cached values. A cache file
+    that is unreadable or not in the expected layout is treated as empty.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != self.FORMAT_VERSION:
+            return
+        entries = data.get("entries")
+        if isinstance(entries, dict):
+            self._entries = {key: entry for key, entry in entries.items() if isinstance(entry, dict)}
+
+    def get(self, path: Path, stat: os.stat_result) -> Optional[MarkdownAgentSpec]:
+        entry = self._entries.get(str(path))
+        if entry is None or entry.get("mtime_ns") != stat.st_mtime_ns or entry.get("size") != stat.st_size:
+            return None
+        try:
+            return MarkdownAgentSpec(**entry["spec"])
+        except (KeyError, TypeError):
+            return None
+
+    def put(self, path: Path, stat: os.stat_result, spec: MarkdownAgentSpec) -> None:
+        with self._lock:
+            self._entries[str(path)] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "spec": asdict(spec)}
+            self._dirty = True
+
+    def discard(self, path: Path) -> None:
+        with self._lock:
+            if self._entries.pop(str(path), None) is not None:
+                self._dirty = True
+
+    def prune(self, paths: Iterable[Path]) -> None:
+        """Drop entries for deleted or renamed files in the directories of ``paths``.
+
+        ``paths`` are the files just loaded and are kept without a check; other
+        entries in their directories are dropped only if the file is gone, and
+        entries in any other directory are left alone.
+        """
+        keep = {str(path) for path in paths}
+        directories = {str(Path(key).parent) for key in keep}
+        with self._lock:
+            stale = [
+                key
+                for key in self._entries
+                if key not in keep and str(Path(key).parent) in directories and not os.path.exists(key)
+            ]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Atomically rewrite the cache file if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            scratch = self.path.with_name(self.path.name + ".tmp")
+            scratch.write_text(json.dumps({"version": self.FORMAT_VERSION, "entries": self._entries}))
+            os.replace(scratch, self.path)
+            self._dirty = False
+
+
+def load_role_spec(path: Path, cache: Optional[MarkdownSpecCache] = None) -> Tuple[MarkdownAgentSpec, bool]:
+    """Load one role file, returning the spec and whether it had to be parsed."""
+    stat = path.stat()
+    if cache is not None:
+        cached = cache.get(path, stat)
+        if cached is not None:
+            return cached, False
+    spec = parse_role_markdown(path.read_text())
+    if cache is not None:
+        cache.put(path, stat, spec)
+    return spec, True
+
+
+def load_role_specs(
+    paths: Iterable[Path],
+    *,
+    cache_path: Optional[Union[str, Path]] = None,
+    max_workers: Optional[int] = None,
+) -> List[MarkdownAgentSpec]:
+    """Read and parse role files concurrently, in the order given.
+
+    With ``cache_path`` the parsed specs are persisted, so warm starts only
+    stat each file and reparse the ones whose mtime or size changed. Entries
+    for files deleted from the directories of ``paths`` are pruned before the
+    cache is saved, so one cache file can serve several role directories.
+    """
+    paths = [Path(path) for path in paths]
+    cache = MarkdownSpecCache(cache_path) if cache_path is not None else None
+    if len(paths) <= 1 or max_workers == 1:
+        specs = [load_role_spec(path, cache)[0] for path in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            specs = [spec for spec, _ in executor.map(lambda path: load_role_spec(path, cache), paths)]
+    if cache is not None:
+        cache.prune(paths)
+        cache.save()
+    return specs
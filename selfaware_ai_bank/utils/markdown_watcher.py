@@ -0,0 +1,228 @@
+"""Hot-reload markdown-defined agents when their role files change."""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from ..core.base_agent import BaseAgent
+from .markdown_loader import MarkdownSpecCache, load_role_spec
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+logger = logging.getLogger(__name__)
+
+# Sentinel returned by ``_Inotify.wait`` when only a full rescan is safe.
+RESCAN = None
+
+
+class _Inotify:
+    """Minimal ctypes binding to Linux inotify, watching a directory tree."""
+
+    def __init__(self, root: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        self.watch_tree(root)
+
+    def watch_tree(self, root: Path) -> None:
+        for directory in [root, *(path for path in root.rglob("*") if path.is_dir())]:
+            wd = self._add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+            if wd >= 0:
+                self._dirs[wd] = directory
+
+    def wait(self, timeout: float) -> Optional[Set[Path]]:
+        """Block up to ``timeout`` seconds; return touched paths or ``RESCAN``."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        touched: Set[Path] = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & (_IN_Q_OVERFLOW | _IN_ISDIR | _IN_DELETE_SELF):
+                return RESCAN
+            directory = self._dirs.get(wd)
+            if directory is not None and name:
+                touched.add(directory / os.fsdecode(name))
+        return touched
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class MarkdownRoleWatcher:
+    """Keeps ``bank.agents`` in sync with the role files under ``root``.
+
+    :meth:`load` registers an agent per file. :meth:`poll` compares file
+    ``(mtime_ns, size)`` signatures with the last seen ones and only reparses
+    added or changed files: changed agents are swapped in place, removed ones
+    unregistered. A file that cannot be read is logged and reported under
+    ``"failed"``; its previous agent, if any, stays registered until a later
+    version loads. :meth:`start` runs this in a background thread, woken by
+    inotify on Linux and by a stat-polling ``interval`` elsewhere.
+    """
+
+    def __init__(
+        self,
+        bank: "SelfAwareAIBank",  # noqa: F821 (forward ref)
+        root: Union[str, Path],
+        *,
+        pattern: str = "*.md",
+        interval: float = 1.0,
+        use_inotify: bool = True,
+        cache: Optional[MarkdownSpecCache] = None,
+    ) -> None:
+        self.bank = bank
+        self.root = Path(root)
+        self.pattern = pattern
+        self.interval = interval
+        self.use_inotify = use_inotify
+        self.cache = cache
+        self._known: Dict[Path, Tuple[Tuple[int, int], BaseAgent]] = {}
+        self._failed: Dict[Path, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify: Optional[_Inotify] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def load(self) -> List[BaseAgent]:
+        """Register agents for every role file not yet known to the watcher."""
+        changes = self.poll()
+        return [self._known[path][1] for path in changes["added"]]
+
+    def poll(self, paths: Optional[Iterable[Path]] = None) -> Dict[str, List[Path]]:
+        """Apply file changes to the bank; ``paths`` limits the check to those files."""
+        with self._lock:
+            if paths is None:
+                candidates = set(self.root.rglob(self.pattern)) | set(self._known)
+            else:
+                candidates = {path for path in paths if path.match(self.pattern)}
+            changes: Dict[str, List[Path]] = {"added": [], "changed": [], "removed": [], "failed": []}
+            for path in sorted(candidates):
+                try:
+                    self._apply(path, changes)
+                except Exception:
+                    logger.exception("Could not load markdown role %s; keeping the previous agent", path)
+                    changes["failed"].append(path)
+            if self.cache is not None:
+                self.cache.save()
+            return changes
+
+    def _apply(self, path: Path, changes: Dict[str, List[Path]]) -> None:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            stat = None
+        known = self._known.get(path)
+        if stat is None:
+            self._failed.pop(path, None)
+            if known is not None:
+                self.bank.unregister_agent(known[1])
+                del self._known[path]
+                changes["removed"].append(path)
+            return
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if (known is not None and known[0] == signature) or self._failed.get(path) == signature:
+            return
+        try:
+            spec, _ = load_role_spec(path, self.cache)
+        except Exception:
+            # Remember the broken version so it is reported once, not on every poll.
+            self._failed[path] = signature
+            raise
+        agent = spec.to_agent()
+        if known is None:
+            self.bank.register_agent(agent)
+            changes["added"].append(path)
+        else:
+            self.bank.replace_agent(known[1], agent)
+            changes["changed"].append(path)
+        self._known[path] = (signature, agent)
+        self._failed.pop(path, None)
+
+    def start(self) -> None:
+        """Sync the bank with the role files, then keep it in sync in the background.
+
+        The initial :meth:`poll` registers every existing file, so ``start()``
+        replaces the startup :meth:`load` (or ``bank.load_markdown_roles``);
+        loading the same files through the bank first registers them twice.
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        if self.use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(self.root)
+            except (OSError, AttributeError):
+                self._inotify = None
+        # Watches are in place before the scan, so no edit falls between the two.
+        self.poll()
+        self._thread = threading.Thread(target=self._run, name="markdown-role-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._step()
+            except Exception:
+                logger.exception("Markdown role watcher iteration failed; retrying")
+                self._stop.wait(self.interval)
+
+    def _step(self) -> None:
+        if self._inotify is None:
+            if not self._stop.wait(self.interval):
+                self.poll()
+            return
+        touched = self._inotify.wait(self.interval)
+        if touched is RESCAN:
+            self._inotify.watch_tree(self.root)
+            self.poll()
+        elif touched:
+            self.poll(touched)
+
+
+__all__ = ["MarkdownRoleWatcher"]
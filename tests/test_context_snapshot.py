@@ -0,0 +1,98 @@
+import pickle
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from selfaware_ai_bank.agents import CreditRiskAnalyzer, LiquidityOptimizer, StressTester
+from selfaware_ai_bank.agents.finance.snapshot import MappedPortfolio, read_snapshot, write_snapshot
+from selfaware_ai_bank.core.memo import fingerprint
+
+
+def make_context(size, seed=3):
+    rng = random.Random(seed)
+    sectors = ["Retail", "Corporate", "SME", "Sovereign"]
+    return {
+        "credit_portfolio": [
+            {
+                "name": f"{sectors[idx % 4]} Loan {idx // 4} – ünïcode",
+                "exposure": rng.uniform(10_000, 5_000_000),
+                "prob_default": rng.uniform(0.0, 0.3),
+                "loss_given_default": rng.uniform(0.1, 0.9),
+            }
+            for idx in range(size)
+        ],
+        "liquidity_levels": {"USD": 800_000.0, "EUR": 2_500_000.0, "JPY": 900_000.0, "GBP": 1_500_000.0},
+    }
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "context.snap"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_matches_dict_form(self):
+        context = make_context(257)
+        # Repeated names are stored once in the string table.
+        context["credit_portfolio"][5]["name"] = context["credit_portfolio"][0]["name"]
+        write_snapshot(self.path, **context)
+
+        loaded = read_snapshot(self.path)
+        portfolio = loaded["credit_portfolio"]
+        self.assertIsInstance(portfolio, MappedPortfolio)
+        self.assertIsInstance(portfolio.exposure, memoryview)
+        self.assertEqual(portfolio.to_records(), context["credit_portfolio"])
+        self.assertEqual(loaded["liquidity_levels"], context["liquidity_levels"])
+        self.assertEqual(portfolio.names[-2:], [record["name"] for record in context["credit_portfolio"][-2:]])
+
+        for agent in (CreditRiskAnalyzer(), StressTester(), LiquidityOptimizer()):
+            self.assertEqual(agent.execute(loaded), agent.execute(context))
+
+    def test_attribute_columns_round_trip(self):
+        context = make_context(20)
+        for idx, record in enumerate(context["credit_portfolio"]):
+            if idx % 3:
+                record["sector"] = ["Retail", "Corporate"][idx % 2]
+            record["currency"] = "EUR"
+        write_snapshot(self.path, **context)
+        loaded = read_snapshot(self.path)
+        self.assertEqual(sorted(loaded["credit_portfolio"].attributes), ["currency", "sector"])
+        self.assertEqual(loaded["credit_portfolio"].to_records(), context["credit_portfolio"])
+        analyzer = CreditRiskAnalyzer(breakdowns=("sector",))
+        self.assertEqual(analyzer.execute(loaded), analyzer.execute(context))
+
+    def test_pickles_by_path_and_fingerprints(self):
+        write_snapshot(self.path, **make_context(10))
+        portfolio = read_snapshot(self.path)["credit_portfolio"]
+        payload = pickle.dumps(portfolio)
+        self.assertLess(len(payload), 200)
+        self.assertEqual(pickle.loads(payload).to_records(), portfolio.to_records())
+        self.assertEqual(fingerprint(portfolio), fingerprint(read_snapshot(self.path)["credit_portfolio"]))
+
+        # A worker must not silently map a snapshot rewritten after the pickle was taken.
+        write_snapshot(self.path, **make_context(12))
+        with self.assertRaisesRegex(ValueError, "changed since"):
+            pickle.loads(payload)
+
+    def test_empty_context_and_bad_files(self):
+        write_snapshot(self.path)
+        loaded = read_snapshot(self.path)
+        self.assertEqual((len(loaded["credit_portfolio"]), loaded["liquidity_levels"]), (0, {}))
+
+        self.path.write_bytes(b"not a snapshot")
+        with self.assertRaises(ValueError):
+            read_snapshot(self.path)
+
+        write_snapshot(self.path, **make_context(50))
+        content = self.path.read_bytes()
+        for size in (len(content) - 8, len(content) // 2, 14):
+            self.path.write_bytes(content[:size])
+            with self.assertRaisesRegex(ValueError, "not a bank snapshot|corrupt or truncated"):
+                read_snapshot(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,18 @@
+import asyncio
+import os
+import pickle
+import threading
+import time
 import unittest
-from datetime import datetime
-from selfaware_ai_bank.core.base_agent import BaseAgent
+from datetime import datetime, timezone
+from selfaware_ai_bank.core.base_agent import AgentState, BaseAgent
+from selfaware_ai_bank.core.context import ContextSnapshot
+from selfaware_ai_bank.core.history import RunHistory
 from selfaware_ai_bank.core.introspection_engine import IntrospectionEngine
+from selfaware_ai_bank.core.memo import ResultCache, Unfingerprintable, fingerprint
 from selfaware_ai_bank.bank_orchestrator import SelfAwareAIBank
+from selfaware_ai_bank.agents import CreditRiskAnalyzer, LiquidityOptimizer, StressTester
+from main import build_demo_context
 
 class MockAgent(BaseAgent):
     def __init__(self, name="MockAgent"):
@@ -11,6 +21,46 @@ class MockAgent(BaseAgent):
     def execute(self, context):
         return {"status": "success", "value": 42, "confidence": 0.75}
 
+class CpuMockAgent(MockAgent):
+    workload = "cpu"
+
+    def execute(self, context):
+        self.update_state(notes={"seen_keys": sorted(context)})
+        return {"status": "success", "value": sum(range(1000)), "confidence": 0.5}
+
+
+class SlowAgent(MockAgent):
+    def execute(self, context):
+        time.sleep(0.5)
+        return super().execute(context)
+
+
+class LateNotesAgent(MockAgent):
+    def execute(self, context):
+        time.sleep(0.3)
+        self.update_state(notes={"late": True})
+        return super().execute(context)
+
+
+class PidAgent(MockAgent):
+    workload = "cpu"
+
+    def execute(self, context):
+        return {"pid": os.getpid(), "confidence": 0.5}
+
+
+class KeyedAgent(MockAgent):
+    def __init__(self, name, inputs=(), outputs=(), delay=0.0):
+        super().__init__(name=name)
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.delay = delay
+
+    def execute(self, context):
+        time.sleep(self.delay)
+        return {"seen": sorted(key for key in self.inputs if key in context), "confidence": 0.5}
+
+
 class TestBaseAgent(unittest.TestCase):
     def test_initialization(self):
         agent = MockAgent()
@@ -30,6 +80,18 @@ class TestBaseAgent(unittest.TestCase):
         self.assertEqual(agent.state.notes["foo"], "bar")
         self.assertIsInstance(agent.state.last_update, datetime)
 
+    def test_state_accepts_last_update_datetimes(self):
+        stamp = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+        state = AgentState(last_update=stamp)
+        self.assertEqual(state.last_update, stamp)
+        self.assertEqual(state.last_update_ns, 1_714_566_600 * 10**9)
+
+        state.last_update = datetime(2024, 5, 2)
+        self.assertEqual(state.last_update, datetime(2024, 5, 2, tzinfo=timezone.utc))
+        state.last_update = None
+        self.assertIsNone(state.last_update_ns)
+        self.assertEqual(AgentState(True, None, {"a": 1}), AgentState(notes={"a": 1}))
+
 class TestIntrospectionEngine(unittest.TestCase):
     def test_analyze_performance(self):
         bank = SelfAwareAIBank()
@@ -45,6 +107,36 @@ class TestIntrospectionEngine(unittest.TestCase):
         self.assertEqual(analysis["agents_tracked"], 1)
         self.assertEqual(analysis["categories"]["Test"], 1)
 
+    def test_state_deltas_maintain_inactive_set(self):
+        bank = SelfAwareAIBank()
+        agents = [MockAgent(name=f"Agent{idx}") for idx in range(3)]
+        bank.register_agents(agents)
+
+        calls = []
+        original = agents[0].report_status
+        agents[0].report_status = lambda: calls.append(1) or original()
+
+        agents[1].update_state(active=False)
+        analysis = bank.introspection.analyze_performance()
+        self.assertEqual(analysis["agents_tracked"], 3)
+        self.assertEqual([status["agent"] for status in analysis["inactive_agents"]], ["Agent1"])
+        # Active agents are not asked for a full status report.
+        self.assertEqual(calls, [])
+
+        self.assertEqual(bank.introspection.evolve(), [{"agent": "Agent1", "action": "restarted"}])
+        self.assertEqual(bank.introspection.analyze_performance()["inactive_agents"], [])
+        self.assertEqual(bank.introspection.evolve(), [])
+
+    def test_untrack_updates_categories(self):
+        bank = SelfAwareAIBank()
+        agent = MockAgent()
+        bank.register_agent(agent)
+        bank.introspection.untrack(agent)
+        agent.update_state(active=False)
+        analysis = bank.introspection.analyze_performance()
+        self.assertEqual(analysis["categories"], {})
+        self.assertEqual(analysis["inactive_agents"], [])
+
 class TestBankOrchestrator(unittest.TestCase):
     def test_register_agent(self):
         bank = SelfAwareAIBank()
@@ -91,6 +183,59 @@ class TestBankOrchestrator(unittest.TestCase):
         bank.history.append({"agent": "Manual", "confidence": 0.55})
         self.assertEqual(bank.confidence_trend(), {"first": 0.75, "latest": 0.55, "delta": -0.19999999999999996})
 
+    def test_run_all_parallel_keeps_registration_order(self):
+        bank = SelfAwareAIBank(context={"triggers": []})
+        agents = [MockAgent(name="Io1"), CpuMockAgent(name="Cpu"), MockAgent(name="Io2")]
+        bank.register_agents(agents)
+
+        results = bank.run_all(mode="parallel", max_workers=2)
+        self.assertEqual([name for name, _ in results], ["Io1", "Cpu", "Io2"])
+        self.assertEqual([record.agent for record in bank.history], ["Io1", "Cpu", "Io2"])
+        self.assertEqual(results[1][1]["value"], 499500)
+        # Notes written inside the worker process are merged back.
+        self.assertEqual(agents[1].state.notes["seen_keys"], ["triggers"])
+
+    def test_run_all_parallel_timeout_marks_agent_inactive(self):
+        bank = SelfAwareAIBank()
+        bank.register_agents([SlowAgent(name="Slow"), MockAgent(name="Fast")])
+
+        results = bank.run_all(mode="parallel", timeout=0.05)
+        self.assertEqual(results[0][1], {"status": "timeout", "timeout": 0.05})
+        self.assertEqual(results[1][1]["confidence"], 0.75)
+        self.assertFalse(bank.get_agent("Slow").state.active)
+        with self.assertRaises(ValueError):
+            bank.run_all(mode="bogus")
+
+    def test_parallel_timeout_is_one_deadline_and_discards_late_state(self):
+        bank = SelfAwareAIBank()
+        bank.register_agents([LateNotesAgent(name=f"Slow{idx}") for idx in range(3)])
+        started = time.perf_counter()
+        results = bank.run_all(mode="parallel", max_workers=3, timeout=0.1)
+        self.assertLess(time.perf_counter() - started, 0.3)
+        self.assertEqual([output["status"] for _, output in results], ["timeout"] * 3)
+        time.sleep(0.5)
+        for agent in bank.agents:
+            self.assertNotIn("late", agent.state.notes)
+        bank.close()
+
+    def test_parallel_pools_are_reused_until_close(self):
+        with SelfAwareAIBank() as bank:
+            bank.register_agent(PidAgent(name="Pid"))
+            first = bank.run_all(mode="parallel", max_workers=1)[0][1]["pid"]
+            second = bank.run_all(mode="parallel", max_workers=1)[0][1]["pid"]
+            self.assertEqual(first, second)
+            self.assertNotEqual(first, os.getpid())
+        self.assertEqual(bank._pools, {})
+
+    def test_run_all_async(self):
+        bank = SelfAwareAIBank()
+        bank.register_agents([MockAgent(name="Agent1"), SlowAgent(name="Slow")])
+
+        results = asyncio.run(bank.run_all_async(timeout=0.05))
+        self.assertEqual([name for name, _ in results], ["Agent1", "Slow"])
+        self.assertEqual(results[0][1]["value"], 42)
+        self.assertEqual(results[1][1]["status"], "timeout")
+
     def test_summary(self):
         bank = SelfAwareAIBank()
         agent = MockAgent()
@@ -102,5 +247,299 @@ class TestBankOrchestrator(unittest.TestCase):
         self.assertIn("history", summary)
         self.assertIn("introspection", summary)
 
+class TestContextSnapshot(unittest.TestCase):
+    def test_evolve_shares_values_and_versions_keys(self):
+        portfolio = [{"name": "Loan"}]
+        first = ContextSnapshot({"credit_portfolio": portfolio, "triggers": []})
+        second = first.evolve({"triggers": ["Fraud"]})
+        self.assertEqual((first.version, second.version), (0, 1))
+        self.assertEqual(first["triggers"], [])
+        self.assertIs(second["credit_portfolio"], portfolio)
+        self.assertEqual((second.key_version("triggers"), second.key_version("credit_portfolio")), (1, 0))
+        with self.assertRaises(TypeError):
+            second["triggers"] = []
+        restored = pickle.loads(pickle.dumps(second))
+        self.assertEqual((dict(restored), restored.version), (dict(second), 1))
+
+    def test_agents_see_the_snapshot_their_run_started_with(self):
+        bank = SelfAwareAIBank(context={"step": 0})
+
+        class Bumper(MockAgent):
+            def execute(self, context):
+                bank.update_context(step=context["step"] + 1)
+                return {"step": context["step"], "confidence": 0.5}
+
+        bank.register_agents([Bumper("A"), Bumper("B")])
+        results = dict(bank.run_all())
+        self.assertEqual(results, {"A": {"step": 0, "confidence": 0.5}, "B": {"step": 0, "confidence": 0.5}})
+        self.assertEqual(bank.context.version, 2)
+        self.assertEqual([record.context_version for record in bank.history], [0, 0])
+        self.assertEqual(bank.recent_history(limit=1)[0]["context_version"], 0)
+
+
+class TestRunHistory(unittest.TestCase):
+    def test_ring_buffer_evicts_oldest_and_updates_index(self):
+        history = RunHistory(capacity=3)
+        for idx, agent in enumerate(["A", "B", "A", "B", "B"]):
+            history.append({"agent": agent, "confidence": idx / 10})
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual([record.agent for record in history], ["A", "B", "B"])
+        self.assertEqual([record.confidence for record in history.recent(10, agent="A")], [0.2])
+        self.assertEqual([record.confidence for record in history.recent(2, agent="B")], [0.3, 0.4])
+        self.assertEqual(history.recent(0), [])
+
+        # Aggregates cover every recorded run, including evicted ones.
+        self.assertEqual(history.confidence_count, 5)
+        self.assertAlmostEqual(history.average_confidence(), 0.2)
+        self.assertEqual(history.confidence_trend(), {"first": 0.0, "latest": 0.4, "delta": 0.4})
+
+    def test_run_record_is_immutable_and_shares_output(self):
+        bank = SelfAwareAIBank()
+        agent = MockAgent()
+        bank.register_agent(agent)
+        output = bank.run_agent(agent)
+
+        record = bank.history[-1]
+        self.assertIs(record.output, output)
+        self.assertIs(agent.state.last_run, record)
+        self.assertNotIn("last_output", agent.state.notes)
+        self.assertIs(agent.report_status()["notes"]["last_output"], output)
+        self.assertIsInstance(record.timestamp_ns, int)
+        self.assertEqual(record.as_log_entry()["timestamp"], record.timestamp.isoformat())
+        with self.assertRaises(AttributeError):
+            record.agent = "Other"
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertFalse(hasattr(agent.state, "__dict__"))
+
+    def test_history_entries_keep_log_entry_access(self):
+        bank = SelfAwareAIBank()
+        agent = MockAgent()
+        bank.register_agent(agent)
+        output = bank.run_agent(agent)
+
+        entry = next(iter(bank.history))
+        self.assertEqual(entry["agent"], agent.name)
+        self.assertIs(entry["output"], output)
+        self.assertEqual(entry["timestamp"], entry.isoformat())
+        self.assertEqual(entry.get("context_version"), entry.context_version)
+        self.assertIsNone(entry.get("missing"))
+        self.assertEqual(dict(entry), entry.as_log_entry())
+
+    def test_bank_history_capacity(self):
+        bank = SelfAwareAIBank(history_capacity=2)
+        agent = MockAgent()
+        bank.register_agent(agent)
+        for _ in range(5):
+            bank.run_agent(agent)
+        self.assertEqual(len(bank.summary()["history"]), 2)
+        self.assertEqual(bank.introspection.analyze_performance()["average_confidence"], 0.75)
+        with self.assertRaises(ValueError):
+            RunHistory(capacity=0)
+
+
+class TestAgentGraph(unittest.TestCase):
+    def make_bank(self):
+        bank = SelfAwareAIBank(context=build_demo_context())
+        bank.register_agents([StressTester(), CreditRiskAnalyzer(), LiquidityOptimizer()])
+        return bank
+
+    def test_dependency_graph_and_ordering(self):
+        bank = self.make_bank()
+        self.assertEqual(bank.dependency_graph()["StressTester"], ["CreditRiskAnalyzer"])
+
+        results = bank.run_graph(parallel=False)
+        self.assertEqual(
+            [name for name, _ in results], ["CreditRiskAnalyzer", "LiquidityOptimizer", "StressTester"]
+        )
+        stress = results[2][1]
+        self.assertEqual(stress["baseline_expected_loss"], results[0][1]["expected_loss"])
+        self.assertEqual(bank.context["credit_risk"], results[0][1])
+
+    def test_unchanged_inputs_are_skipped(self):
+        bank = self.make_bank()
+        bank.run_graph()
+        self.assertEqual(len(bank.history), 3)
+
+        bank.run_graph()
+        self.assertEqual(len(bank.history), 3)
+
+        bank.update_context(credit_portfolio=build_demo_context()["credit_portfolio"][:1])
+        results = dict(bank.run_graph())
+        self.assertEqual([record.agent for record in bank.history[3:]], ["CreditRiskAnalyzer", "StressTester"])
+        self.assertEqual(results["CreditRiskAnalyzer"]["high_risk_exposures"], [])
+
+    def test_timed_out_agent_is_retried_and_not_published(self):
+        bank = SelfAwareAIBank(context={"seed": 1})
+        slow = KeyedAgent("Slow", inputs=["seed"], outputs=["raw"], delay=0.5)
+        bank.register_agents([slow, KeyedAgent("Peer", inputs=["seed"]), KeyedAgent("Sink", inputs=["raw"])])
+
+        results = dict(bank.run_graph(timeout=0.1))
+        self.assertEqual(results["Slow"]["status"], "timeout")
+        self.assertNotIn("raw", bank.context)
+        self.assertEqual(results["Sink"]["seen"], [])
+
+        slow.delay = 0.0
+        results = dict(bank.run_graph(timeout=5))
+        self.assertEqual(results["Slow"]["seen"], ["seed"])
+        self.assertEqual(bank.context["raw"], results["Slow"])
+        self.assertEqual(results["Sink"]["seen"], ["raw"])
+        self.assertNotIn("Peer", [record.agent for record in bank.history[3:]])
+        bank.close()
+
+    def test_timeout_applies_to_single_agent_levels(self):
+        bank = SelfAwareAIBank(context={"seed": 1})
+        bank.register_agents([KeyedAgent("Slow", inputs=["seed"], outputs=["raw"], delay=1.0), KeyedAgent("Sink", inputs=["raw"])])
+        start = time.perf_counter()
+        results = dict(bank.run_graph(parallel=True, timeout=0.1))
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(results["Slow"]["status"], "timeout")
+        self.assertNotIn("raw", bank.context)
+        bank.close()
+
+    def test_cycle_is_rejected(self):
+        bank = SelfAwareAIBank()
+        bank.register_agents([KeyedAgent("A", inputs=["b"], outputs=["a"]), KeyedAgent("B", inputs=["a"], outputs=["b"])])
+        with self.assertRaises(ValueError):
+            bank.run_graph()
+
+    def test_critical_path(self):
+        bank = SelfAwareAIBank()
+        bank.register_agents(
+            [
+                KeyedAgent("Source", outputs=["raw"], delay=0.02),
+                KeyedAgent("Quick"),
+                KeyedAgent("Sink", inputs=["raw"], delay=0.02),
+            ]
+        )
+        results = dict(bank.run_graph())
+        self.assertEqual(results["Sink"]["seen"], ["raw"])
+        path = bank.critical_path()
+        self.assertEqual(path["agents"], ["Source", "Sink"])
+        self.assertGreaterEqual(path["duration"], 0.04)
+
+    def test_registration_from_another_thread_waits_for_the_run(self):
+        bank = SelfAwareAIBank(context={"seed": 0})
+        late = KeyedAgent("Late", inputs=["raw"])
+        registrar = threading.Thread(target=bank.register_agent, args=(late,))
+
+        class Registering(KeyedAgent):
+            # Registers ``late`` the way ``MarkdownRoleWatcher`` does, from its own thread.
+            def execute(self, context):
+                registrar.start()
+                registrar.join(timeout=0.2)
+                self.update_state(notes={"joined_mid_run": not registrar.is_alive()})
+                return super().execute(context)
+
+        source = Registering("Source", inputs=["seed"], outputs=["raw"])
+        bank.register_agents([source, KeyedAgent("Sink", inputs=["raw"])])
+        results = bank.run_graph(parallel=False)
+        registrar.join()
+
+        self.assertFalse(source.state.notes["joined_mid_run"])
+        self.assertEqual([name for name, _ in results], ["Source", "Sink"])
+        self.assertEqual(bank.dependency_graph()["Late"], ["Source"])
+        self.assertEqual([name for name, _ in bank.run_graph(parallel=False)], ["Source", "Sink", "Late"])
+
+class TestEventDispatch(unittest.TestCase):
+    def test_updates_coalesce_into_one_run_per_subscriber(self):
+        bank = SelfAwareAIBank(context=build_demo_context())
+        bank.register_agents([StressTester(), CreditRiskAnalyzer(), LiquidityOptimizer(), MockAgent()])
+        self.assertEqual(bank.dispatch(), [])
+
+        portfolio = build_demo_context()["credit_portfolio"]
+        for size in (3, 2, 1):
+            bank.update_context(credit_portfolio=portfolio[:size])
+        self.assertEqual(
+            {agent.name: keys for agent, keys in bank.events.pending().items()},
+            {"StressTester": {"credit_portfolio"}, "CreditRiskAnalyzer": {"credit_portfolio"}},
+        )
+
+        results = bank.dispatch()
+        # The analyzer's published credit_risk feeds the stress tester within the same dispatch.
+        self.assertEqual([name for name, _ in results], ["CreditRiskAnalyzer", "StressTester"])
+        self.assertEqual(results[1][1]["baseline_expected_loss"], results[0][1]["expected_loss"])
+        self.assertEqual(bank.events.pending(), {})
+        self.assertEqual(bank.dispatch(), [])
+
+    def test_listeners_and_unsubscribe(self):
+        bank = SelfAwareAIBank()
+        agent = KeyedAgent("Watcher", inputs=["triggers"])
+        bank.register_agent(agent)
+        seen = []
+        bank.events.listen(seen.append)
+
+        bank.update_context(triggers=["Fraud"], unrelated=1)
+        self.assertEqual(seen, [("triggers", "unrelated")])
+        self.assertIn(agent, bank.events)
+        bank.run_all()
+        self.assertNotIn(agent, bank.events)
+
+        bank.unregister_agent(agent)
+        bank.update_context(triggers=[])
+        self.assertEqual(bank.events.pending(), {})
+
+
+class TestResultCache(unittest.TestCase):
+    def test_fingerprint_is_structural(self):
+        self.assertEqual(fingerprint({"a": [1, 2.0], "b": None}), fingerprint({"b": None, "a": [1, 2.0]}))
+        self.assertNotEqual(fingerprint([1, 2]), fingerprint([2, 1]))
+        self.assertNotEqual(fingerprint({"a": 1}), fingerprint({"a": 1.0}))
+        with self.assertRaises(Unfingerprintable):
+            fingerprint(object())
+
+    def test_lru_and_ttl_eviction(self):
+        cache = ResultCache(maxsize=2, ttl=10.0)
+        cache.put("a", {"v": 1}, now=0.0)
+        cache.put("b", {"v": 2}, now=0.0)
+        self.assertEqual(cache.get("a", now=1.0), {"v": 1})
+        cache.put("c", {"v": 3}, now=1.0)  # evicts "b", the least recently used
+        self.assertIsNone(cache.get("b", now=1.0))
+        self.assertIsNone(cache.get("a", now=10.0))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertEqual((cache.evictions, cache.expirations, len(cache)), (1, 1, 1))
+
+    def test_bank_reuses_outputs_for_unchanged_inputs(self):
+        bank = SelfAwareAIBank(context=build_demo_context(), result_cache=ResultCache())
+        uncached = KeyedAgent("Volatile", inputs=["triggers"])
+        uncached.cacheable = False
+        bank.register_agents([CreditRiskAnalyzer(), LiquidityOptimizer(), uncached, MockAgent()])
+
+        first = dict(bank.run_all())
+        second = dict(bank.run_all(mode="parallel"))
+        self.assertIs(second["CreditRiskAnalyzer"], first["CreditRiskAnalyzer"])
+        self.assertIsNot(second["Volatile"], first["Volatile"])
+        self.assertEqual(bank.result_cache.hits, 2)
+
+        bank.update_context(credit_portfolio=build_demo_context()["credit_portfolio"][:1])
+        third = dict(bank.run_all())
+        self.assertIsNot(third["CreditRiskAnalyzer"], first["CreditRiskAnalyzer"])
+        self.assertIs(third["LiquidityOptimizer"], first["LiquidityOptimizer"])
+        stats = bank.summary()["result_cache"]
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 3))
+        self.assertEqual(len(bank.history), 12)
+
+    def test_cache_key_uses_versions_and_agent_config(self):
+        bank = SelfAwareAIBank(context={"rows": [object()] * 1000}, result_cache=ResultCache())
+        agent = KeyedAgent("Rows", inputs=["rows", "missing"])
+        bank.register_agent(agent)
+
+        first = bank.run_agent(agent)
+        # Values without ``__fingerprint__`` are never walked, only versioned.
+        self.assertIs(bank.run_agent(agent), first)
+        agent.delay = 0.001
+        self.assertIsNot(bank.run_agent(agent), first)
+
+        bank.update_context(unrelated=1)
+        cached = bank.run_agent(agent)
+        bank.update_context(rows=[])
+        self.assertIsNot(bank.run_agent(agent), cached)
+        # Equal versions from an unrelated context never alias this lineage.
+        self.assertIsNot(bank.run_agent(agent, ContextSnapshot({"rows": [1]})), cached)
+        self.assertEqual(bank.result_cache.hits, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
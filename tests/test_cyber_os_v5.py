@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import gzip
 import json
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
 from urllib.request import urlopen
 
-from selfaware_ai_bank.cyber_os_v5 import MatrixServer, SecureBankSystem, scan_network
+import pytest
+
+from selfaware_ai_bank.cyber_os_v5 import Account, MatrixServer, SYNONYM_GROUPS, SecureBankSystem, scan_network
 
 
 def test_scan_network_lists_expected_nodes() -> None:
@@ -12,6 +21,64 @@ def test_scan_network_lists_expected_nodes() -> None:
     assert any("FED_RESERVE_MAINFRAME" in node for node in nodes)
 
 
+def test_index_matches_linear_substring_scan_and_tracks_lexicon() -> None:
+    rng = random.Random(4)
+    lexicon = {
+        f"group_{idx}": ["".join(rng.choice("abcd -") for _ in range(rng.randint(1, 10))) for _ in range(25)]
+        for idx in range(20)
+    }
+    lexicon.update(SYNONYM_GROUPS)
+    bank = SecureBankSystem(lexicon=lexicon)
+    for query in ["", "a", " Ab ", "abc", "cov", "neural lace", "zzz"]:
+        expected = [
+            (group, term, 1.0)
+            for group, terms in lexicon.items()
+            for term in terms
+            if query.strip().lower() in term.strip().lower()
+        ]
+        assert bank.search_substring(query) == expected
+
+    assert bank.is_synonym("  COVERT ", "stealth")
+    assert not bank.is_synonym("covert", "missing_group")
+    version = bank.lexicon_version
+    bank.lexicon = {"stealth": ["Shadow"]}
+    assert bank.search_substring("cov") == []
+    assert bank.search_fuzzy("shadw") == [("stealth", "Shadow", 0.83)]
+    assert bank.lexicon_version == version + 1
+
+
+def test_default_lexicon_is_private_and_refreshed_explicitly() -> None:
+    original = {group: list(terms) for group, terms in SYNONYM_GROUPS.items()}
+    bank, other = SecureBankSystem(), SecureBankSystem()
+    assert bank.lexicon == SYNONYM_GROUPS and bank.lexicon is not SYNONYM_GROUPS
+    assert bank.lexicon["stealth"] is not other.lexicon["stealth"]
+
+    assert bank.search_substring("shadow") == []
+    bank.lexicon["stealth"].append("Shadow")
+    assert SYNONYM_GROUPS == original and other.lexicon == original
+    # In-place edits are only picked up by an explicit refresh.
+    assert bank.search_substring("shadow") == []
+    bank.refresh_lexicon()
+    assert bank.search_substring("shadow") == [("stealth", "Shadow", 1.0)]
+    assert other.search_substring("shadow") == []
+
+
+def test_fuzzy_ranks_by_edit_distance() -> None:
+    bank = SecureBankSystem()
+    # One dropped, swapped or inserted letter costs a single edit.
+    assert bank.search_fuzzy("cvert")[0] == ("stealth", "Covert", 0.83)
+    assert bank.search_fuzzy("neurla lace", limit=1) == [("cybernetics", "Neural lace", 0.91)]
+    assert bank.search_fuzzy("xcovert", min_score=0.8) == [("stealth", "Covert", 0.86)]
+    assert bank.search_fuzzy("covert", limit=0) == []
+
+    matches = bank.search_fuzzy("mind", limit=3, min_score=0.0)
+    scores = [score for _, _, score in matches]
+    assert len(matches) == 3 and scores == sorted(scores, reverse=True)
+    everything = bank.search_fuzzy("mind", limit=1000, min_score=0.0)
+    assert matches == everything[:3]
+    assert len(everything) == sum(len(terms) for terms in SYNONYM_GROUPS.values())
+
+
 def test_trace_level_and_lockout_progression() -> None:
     bank = SecureBankSystem()
 
@@ -77,3 +144,213 @@ def test_api_endpoints() -> None:
         assert "TERMINAL OUTPUT STREAM" in page
     finally:
         server.stop()
+
+
+def test_asyncio_backend_keeps_connections_alive_and_pipelines() -> None:
+    server = MatrixServer(SecureBankSystem(), host="127.0.0.1", port=0, max_connections=2)
+    server.start(backend="asyncio")
+    try:
+        assert server.backend == "asyncio" and server.port
+        connection = HTTPConnection("127.0.0.1", server.port, timeout=5)
+        connection.request("GET", "/api/search?q=covert")
+        first = connection.getresponse()
+        assert json.loads(first.read())[0]["group"] == "stealth"
+        sock = connection.sock
+        connection.request("GET", "/api/fuzzy?q=cvert")
+        assert json.loads(connection.getresponse().read())[0]["term"] == "Covert"
+        assert connection.sock is sock
+        connection.request("GET", "/missing")
+        missing = connection.getresponse()
+        assert missing.status == 404 and missing.read() == b"Not found"
+        connection.close()
+
+        with socket.create_connection(("127.0.0.1", server.port), timeout=5) as raw:
+            raw.sendall(
+                b"GET /api/search?q=mind HTTP/1.1\r\nHost: x\r\n\r\n"
+                b"GET / HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n"
+            )
+            received = b""
+            while chunk := raw.recv(65536):
+                received += chunk
+        assert received.count(b"HTTP/1.1 200 OK") == 2
+        assert received.index(b"Digital mind") < received.index(b"TERMINAL OUTPUT STREAM")
+    finally:
+        server.stop()
+    assert not server.running
+
+    with pytest.raises(ValueError):
+        server.start(backend="fork")
+
+
+def test_asyncio_backend_refuses_overload_and_large_bodies() -> None:
+    server = MatrixServer(SecureBankSystem(), host="127.0.0.1", port=0, max_connections=1)
+    server.start(backend="asyncio")
+    try:
+        held = HTTPConnection("127.0.0.1", server.port, timeout=5)
+        held.request("GET", "/api/search?q=covert")
+        assert held.getresponse().read()
+
+        refused = HTTPConnection("127.0.0.1", server.port, timeout=5)
+        refused.request("GET", "/api/search?q=covert")
+        busy = refused.getresponse()
+        assert busy.status == 503 and busy.getheader("Retry-After") == "1"
+        assert busy.read() == b"Server busy"
+        refused.close()
+
+        held.request("POST", "/api/search", body=b"x" * 10, headers={"Content-Length": str(10**6)})
+        too_large = held.getresponse()
+        assert too_large.status == 413 and too_large.getheader("Connection") == "close"
+        too_large.read()
+        held.close()
+
+        # The slot frees up once the held connection is gone.
+        deadline = time.monotonic() + 5
+        while True:
+            again = HTTPConnection("127.0.0.1", server.port, timeout=5)
+            again.request("GET", "/")
+            reply = again.getresponse()
+            reply.read()
+            again.close()
+            if reply.status == 200 or time.monotonic() > deadline:
+                break
+            time.sleep(0.02)
+        assert reply.status == 200
+    finally:
+        server.stop()
+
+
+class SlowSearchBank(SecureBankSystem):
+    def search_fuzzy(self, query, **kwargs):
+        time.sleep(0.5)
+        return super().search_fuzzy(query, **kwargs)
+
+
+def test_asyncio_backend_searches_off_the_event_loop() -> None:
+    server = MatrixServer(SlowSearchBank(), host="127.0.0.1", port=0, max_connections=4)
+    server.start(backend="asyncio")
+    try:
+        def fetch(target):
+            connection = HTTPConnection("127.0.0.1", server.port, timeout=5)
+            connection.request("GET", target)
+            response = connection.getresponse()
+            body = response.read()
+            connection.close()
+            return response.status, body, time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            slow = pool.submit(fetch, "/api/fuzzy?q=cvert")
+            time.sleep(0.1)
+            status, _, page_done = fetch("/")
+            assert status == 200
+            slow_status, body, slow_done = slow.result()
+        assert slow_status == 200 and json.loads(body)[0]["term"] == "Covert"
+        assert page_done < slow_done
+    finally:
+        server.stop()
+
+
+@pytest.mark.parametrize("backend", MatrixServer.BACKENDS)
+def test_responses_are_cached_compressed_and_conditional(backend: str) -> None:
+    bank = SecureBankSystem()
+    server = MatrixServer(bank, host="127.0.0.1", port=0)
+    server.start(backend=backend)
+    try:
+        connection = HTTPConnection("127.0.0.1", server.port, timeout=5)
+        connection.request("GET", "/", headers={"Accept-Encoding": "gzip, deflate"})
+        page = connection.getresponse()
+        body = page.read()
+        assert page.getheader("Content-Encoding") == "gzip"
+        assert b"TERMINAL OUTPUT STREAM" in gzip.decompress(body)
+        etag = page.getheader("ETag")
+
+        connection.request("GET", "/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        unchanged = connection.getresponse()
+        assert unchanged.status == 304 and unchanged.read() == b""
+        connection.request("GET", "/", headers={"If-None-Match": etag})
+        identity = connection.getresponse()
+        assert identity.status == 200 and identity.getheader("Content-Encoding") is None
+        assert gzip.decompress(body) == identity.read()
+
+        for query in ("Covert", "  covert "):
+            connection.request("GET", f"/api/search?q={query.replace(' ', '+')}")
+            response = connection.getresponse()
+            assert json.loads(response.read())[0]["term"] == "Covert"
+        assert server.cache_stats()["hits"] == 1
+        connection.request("GET", "/api/search?q=covert", headers={"If-None-Match": response.getheader("ETag")})
+        cached = connection.getresponse()
+        assert cached.status == 304
+        cached.read()
+
+        bank.lexicon = {"stealth": ["Shadow"]}
+        connection.request("GET", "/api/search?q=covert")
+        assert json.loads(connection.getresponse().read()) == []
+        assert server.cache_stats()["size"] == 1
+        connection.close()
+    finally:
+        server.stop()
+    assert server.cache_stats() is None
+
+
+class YieldingAccount(Account):
+    """Yields the GIL on every balance write to widen read-modify-write races."""
+
+    def __setattr__(self, name: str, value) -> None:
+        if name == "balance":
+            time.sleep(0)
+        super().__setattr__(name, value)
+
+
+def test_concurrent_withdrawals_lose_no_updates() -> None:
+    accounts = {
+        f"acct_{idx}": YieldingAccount(account_id=f"acct_{idx}", balance=10_000, authorized_users=("admin_secure",))
+        for idx in range(4)
+    }
+    bank = SecureBankSystem(accounts=accounts, lock_stripes=2)
+
+    def withdraw(attempt: int) -> str:
+        return bank.request_withdrawal(
+            user="admin_secure",
+            account_id=f"acct_{attempt % 4}",
+            amount=7,
+            signature="valid_sig",
+            passphrase="covert",
+            required_concept="stealth",
+        )
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(withdraw, range(4_000)))
+
+    assert all("APPROVED" in result for result in results)
+    assert all(account.balance == 10_000 - 1_000 * 7 for account in accounts.values())
+    assert bank.trace_level == 0 and not bank.locked
+
+
+class YieldingBank(SecureBankSystem):
+    def __setattr__(self, name: str, value) -> None:
+        if name == "trace_level":
+            time.sleep(0)
+        super().__setattr__(name, value)
+
+
+def test_trace_counter_is_atomic() -> None:
+    for _ in range(50):
+        bank = YieldingBank()
+        barrier = threading.Barrier(2)
+
+        def fail() -> None:
+            barrier.wait()
+            bank.request_withdrawal(
+                user="intruder",
+                account_id="fed_reserve_001",
+                amount=1,
+                signature="bad_sig",
+                passphrase="x",
+                required_concept="stealth",
+            )
+
+        threads = [threading.Thread(target=fail) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert bank.trace_level == 70
@@ -0,0 +1,322 @@
+import pickle
+import random
+import tempfile
+import threading
+import time
+import unittest
+from math import fsum
+from statistics import mean
+
+from selfaware_ai_bank.agents import ColumnarPortfolio, CreditRiskAnalyzer, LiquidityOptimizer, StressTester
+from selfaware_ai_bank.agents.finance import CreditBook, GroupByAccumulator
+from selfaware_ai_bank.agents.finance.breakdown import rating_bucket
+from selfaware_ai_bank.agents.finance.scenario_engine import simulate_loss_distribution
+from selfaware_ai_bank.agents.finance.snapshot import read_snapshot, write_snapshot
+
+
+def make_portfolio(size, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Exposure-{idx}",
+            "exposure": rng.uniform(10_000, 5_000_000),
+            "prob_default": rng.uniform(0.0, 0.3),
+            "loss_given_default": rng.uniform(0.1, 0.9),
+        }
+        for idx in range(size)
+    ]
+
+
+def reference_credit_risk(portfolio, threshold):
+    """The original per-dict expected loss loop, kept as an oracle."""
+    losses = []
+    flags = []
+    for exposure in portfolio:
+        probability = float(exposure.get("prob_default", 0.0))
+        lgd = float(exposure.get("loss_given_default", 0.0))
+        value = float(exposure.get("exposure", 0.0))
+        losses.append(probability * lgd * value)
+        if probability >= threshold:
+            flags.append({"name": exposure.get("name", "Unknown"), "prob_default": probability, "exposure": value})
+    average = round(mean([e.get("prob_default", 0.0) for e in portfolio]), 4) if portfolio else 0.0
+    return round(sum(losses), 2), flags, average
+
+
+class TestCreditRiskAnalyzer(unittest.TestCase):
+    def test_columnar_matches_dict_path(self):
+        records = make_portfolio(500)
+        expected_loss, flags, average = reference_credit_risk(records, 0.05)
+
+        for portfolio in (records, ColumnarPortfolio.from_records(records)):
+            result = CreditRiskAnalyzer().execute({"credit_portfolio": portfolio})
+            self.assertEqual(result["expected_loss"], expected_loss)
+            self.assertEqual(result["high_risk_exposures"], flags)
+            self.assertEqual(result["average_probability"], average)
+            self.assertEqual(result["confidence"], 0.85)
+
+    def test_empty_portfolio(self):
+        result = CreditRiskAnalyzer().execute({})
+        self.assertEqual(result["expected_loss"], 0.0)
+        self.assertEqual(result["average_probability"], 0.0)
+        self.assertEqual(result["confidence"], 0.3)
+
+    def test_round_trip_records(self):
+        records = make_portfolio(3)
+        self.assertEqual(ColumnarPortfolio.from_records(records).to_records(), records)
+        with self.assertRaises(ValueError):
+            ColumnarPortfolio(names=["A"])
+
+
+class TestCreditBook(unittest.TestCase):
+    def test_deltas_match_full_recomputation(self):
+        records = make_portfolio(200)
+        book = CreditBook.from_portfolio(records, recompute_every=1_000_000)
+        rng = random.Random(5)
+        for step in range(300):
+            name = records[rng.randrange(len(records))]["name"]
+            if step % 3 == 0 and name in book:
+                book.update(name, prob_default=rng.uniform(0.0, 0.3))
+            elif step % 3 == 1 and name in book:
+                book.remove(name)
+            else:
+                book.add(f"New-{step}", rng.uniform(10_000, 5_000_000), rng.uniform(0.0, 0.3), 0.4)
+
+        expected = book.to_portfolio().risk_summary(0.05)
+        actual = book.risk_summary(0.05)
+        self.assertAlmostEqual(actual["expected_loss"], expected["expected_loss"], delta=1e-6)
+        self.assertAlmostEqual(actual["average_probability"], expected["average_probability"], places=12)
+        self.assertEqual(actual["high_risk_exposures"], expected["high_risk_exposures"])
+        self.assertEqual(book.high_risk_count(0.2), len(book.high_risk_exposures(0.2)))
+
+        book.recompute()
+        rows = book.to_portfolio().to_records()
+        self.assertEqual(book.expected_loss, fsum(r["prob_default"] * r["loss_given_default"] * r["exposure"] for r in rows))
+
+    def test_analyzer_uses_book_and_rejects_duplicates(self):
+        records = make_portfolio(50)
+        book = CreditBook.from_portfolio(records)
+        expected_loss, flags, average = reference_credit_risk(records, 0.05)
+        result = CreditRiskAnalyzer().execute({"credit_portfolio": book})
+        self.assertEqual(
+            (result["expected_loss"], result["high_risk_exposures"], result["average_probability"]),
+            (expected_loss, flags, average),
+        )
+        self.assertEqual(StressTester().execute({"credit_portfolio": book}), StressTester().execute({"credit_portfolio": records}))
+
+        with self.assertRaises(ValueError):
+            book.add(records[0]["name"], 1.0, 0.1, 0.5)
+        with self.assertRaises(KeyError):
+            book.remove("missing")
+        with self.assertRaises(ValueError):
+            CreditBook.from_portfolio(records + records[:1])
+
+    def test_book_feeds_scenarios_and_snapshots(self):
+        records = make_portfolio(30)
+        book = CreditBook.from_portfolio(records)
+        tester = StressTester(scenario_count=100, scenario_seed=2)
+        self.assertEqual(tester.execute({"credit_portfolio": book}), tester.execute({"credit_portfolio": records}))
+        self.assertEqual(
+            simulate_loss_distribution(book, scenarios=100, seed=4),
+            simulate_loss_distribution(records, scenarios=100, seed=4),
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/book.snap"
+            write_snapshot(path, credit_portfolio=book)
+            self.assertEqual(read_snapshot(path)["credit_portfolio"].to_records(), records)
+
+    def test_book_keeps_attributes_and_pickles(self):
+        records = make_portfolio(6)
+        for idx, record in enumerate(records[:4]):
+            record["sector"] = ["Energy", "Retail"][idx % 2]
+        book = CreditBook.from_portfolio(records)
+        self.assertEqual(book.to_portfolio().to_records(), records)
+
+        book.add("New", 100.0, 0.1, 0.5, sector="Tech", region="EMEA")
+        book.update(records[0]["name"], attributes={"sector": None, "rating": "BB+"})
+        rows = {row["name"]: row for row in book.to_portfolio().to_records()}
+        self.assertEqual((rows["New"]["sector"], rows["New"]["region"]), ("Tech", "EMEA"))
+        self.assertNotIn("sector", rows[records[0]["name"]])
+        self.assertEqual(rows[records[0]["name"]]["rating"], "BB+")
+        with self.assertRaises(ValueError):
+            book.add("Other", 1.0, 0.1, 0.5, colour="red")
+
+        restored = pickle.loads(pickle.dumps(book))
+        self.assertEqual(restored.to_portfolio().to_records(), book.to_portfolio().to_records())
+        restored.remove("New")
+        self.assertIn("New", book)
+
+    def test_queries_are_safe_during_concurrent_deltas(self):
+        book = CreditBook.from_portfolio(make_portfolio(2000))
+        names = list(book)
+        stop = threading.Event()
+        errors = []
+
+        def churn():
+            rng = random.Random(3)
+            while not stop.is_set():
+                name = names[rng.randrange(len(names))]
+                if name in book:
+                    book.remove(name)
+                else:
+                    book.add(name, 1_000.0, rng.uniform(0.0, 0.3), 0.4)
+
+        writer = threading.Thread(target=churn)
+        writer.start()
+        try:
+            deadline = time.monotonic() + 0.3
+            while time.monotonic() < deadline:
+                try:
+                    with book.lock:
+                        summary = book.risk_summary(0.05)
+                        count = book.high_risk_count(0.05)
+                    self.assertEqual(len(summary["high_risk_exposures"]), count)
+                    book.to_portfolio()
+                except (KeyError, RuntimeError) as exc:  # pragma: no cover - the failure being guarded against
+                    errors.append(exc)
+                    break
+        finally:
+            stop.set()
+            writer.join()
+        self.assertEqual(errors, [])
+
+
+class TestBreakdowns(unittest.TestCase):
+    def segmented_portfolio(self, size):
+        rng = random.Random(5)
+        records = make_portfolio(size)
+        for record in records:
+            record["sector"] = rng.choice(["Energy", "Retail", "Tech"])
+            if rng.random() < 0.8:
+                record["region"] = rng.choice(["EMEA", "APAC"])
+        return records
+
+    def oracle(self, records, dimensions, measure):
+        totals = {}
+        for record in records:
+            key = tuple(
+                rating_bucket(record.get("rating"), record["prob_default"]) if dimension == "rating"
+                else record.get(dimension)
+                for dimension in dimensions
+            )
+            rows, value = totals.get(key, (0, 0.0))
+            totals[key] = (rows + 1, value + measure(record))
+        return totals
+
+    def test_expected_loss_breakdowns_match_oracle(self):
+        records = self.segmented_portfolio(400)
+        analyzer = CreditRiskAnalyzer(breakdowns=("sector", ("rating", "region"), ("sector", "region")))
+        result = analyzer.execute({"credit_portfolio": ColumnarPortfolio.from_records(records)})
+        breakdowns = result["breakdowns"]
+        self.assertEqual(list(breakdowns), ["sector", "region+rating", "sector+region"])
+
+        def loss(record):
+            return record["prob_default"] * record["loss_given_default"] * record["exposure"]
+
+        for label, dimensions in (("sector", ("sector",)), ("region+rating", ("region", "rating"))):
+            expected = self.oracle(records, dimensions, loss)
+            segments = breakdowns[label]
+            self.assertEqual(len(segments), len(expected))
+            for segment in segments:
+                rows, value = expected[tuple(segment[dimension] for dimension in dimensions)]
+                self.assertEqual(segment["rows"], rows)
+                self.assertAlmostEqual(segment["expected_loss"], value, places=1)
+        self.assertAlmostEqual(sum(s["expected_loss"] for s in breakdowns["sector"]), result["expected_loss"], places=1)
+        self.assertIn(None, [segment["region"] for segment in breakdowns["sector+region"]])
+
+    def test_book_breakdowns_match_its_records(self):
+        records = self.segmented_portfolio(120)
+        book = CreditBook.from_portfolio(records)
+        groupings = ("sector", ("sector", "region"), "rating")
+        for agent in (CreditRiskAnalyzer(breakdowns=groupings), StressTester(breakdowns=groupings)):
+            from_book = agent.execute({"credit_portfolio": book})["breakdowns"]
+            self.assertEqual(from_book, agent.execute({"credit_portfolio": records})["breakdowns"])
+            self.assertEqual(len(from_book["sector"]), 3)
+
+        book.add("New", 1_000.0, 0.1, 0.5, sector="Utilities")
+        sectors = CreditRiskAnalyzer(breakdowns=("sector",)).execute({"credit_portfolio": book})["breakdowns"]["sector"]
+        self.assertIn("Utilities", [segment["sector"] for segment in sectors])
+
+    def test_chunked_accumulation_equals_single_pass(self):
+        portfolio = ColumnarPortfolio.from_records(self.segmented_portfolio(300))
+        whole = GroupByAccumulator(["sector", ("sector", "region")], ["exposure"])
+        whole.add(portfolio, {"exposure": portfolio.exposure})
+        chunked = GroupByAccumulator(["sector", ("sector", "region")], ["exposure"])
+        for start in range(0, 300, 64):
+            chunk = ColumnarPortfolio.from_records(portfolio.to_records()[start : start + 64])
+            chunked.add(chunk, {"exposure": chunk.exposure})
+        self.assertEqual(whole.result(ndigits=2), chunked.result(ndigits=2))
+
+    def test_stress_breakdown_and_rating_buckets(self):
+        records = self.segmented_portfolio(100)
+        records[0]["rating"] = "BBB+"
+        result = StressTester(breakdowns=("rating",)).execute({"credit_portfolio": records})
+        ratings = {segment["rating"]: segment for segment in result["breakdowns"]["rating"]}
+        self.assertIn("BBB", ratings)
+        self.assertEqual(sum(segment["rows"] for segment in ratings.values()), 100)
+        self.assertAlmostEqual(
+            sum(segment["stressed_loss"] for segment in ratings.values()), result["stressed_loss_estimate"], places=1
+        )
+        self.assertEqual(rating_bucket(None, 0.0001), "AAA")
+        self.assertEqual(rating_bucket(None, 0.5), "CCC")
+        self.assertNotIn("breakdowns", StressTester().execute({"credit_portfolio": records}))
+        with self.assertRaises(ValueError):
+            CreditRiskAnalyzer(breakdowns=("country",)).execute({"credit_portfolio": records})
+
+
+class TestStressTester(unittest.TestCase):
+    def test_deterministic_shock_unchanged_without_scenarios(self):
+        context = {"credit_portfolio": make_portfolio(20), "liquidity_levels": {"USD": 800_000, "EUR": 2_000_000}}
+        result = StressTester().execute(context)
+        self.assertEqual(result["liquidity_alerts"], ["USD"])
+        self.assertNotIn("loss_distribution", result)
+
+    def test_scenario_distribution_is_reproducible_across_workers(self):
+        portfolio = make_portfolio(50)
+        inline = simulate_loss_distribution(portfolio, scenarios=600, seed=11, block_size=100)
+        sharded = simulate_loss_distribution(portfolio, scenarios=600, seed=11, block_size=100, workers=2)
+        self.assertEqual(inline, sharded)
+        self.assertEqual(inline["scenarios"], 600)
+        self.assertLessEqual(inline["value_at_risk"]["95%"], inline["value_at_risk"]["99%"])
+        self.assertLessEqual(inline["value_at_risk"]["99%"], inline["expected_shortfall"]["99%"])
+        self.assertLessEqual(inline["expected_shortfall"]["99.9%"], inline["max_loss"])
+
+    def test_execute_adds_loss_distribution(self):
+        tester = StressTester(scenario_count=200, scenario_seed=3)
+        result = tester.execute({"credit_portfolio": make_portfolio(10)})
+        self.assertEqual(result["loss_distribution"]["scenarios"], 200)
+        self.assertEqual(result["loss_distribution"], tester.run_scenarios(make_portfolio(10)))
+
+
+class TestLiquidityOptimizer(unittest.TestCase):
+    def test_greedy_matches_original_transfer_order(self):
+        levels = {"USD": 800_000, "EUR": 2_500_000, "JPY": 900_000, "GBP": 1_500_000, "CHF": 100_000}
+        result = LiquidityOptimizer().execute({"liquidity_levels": levels})
+        self.assertEqual(
+            result["transfers"],
+            [("EUR", "CHF", 900000.0), ("EUR", "USD", 200000.0), ("GBP", "JPY", 100000.0)],
+        )
+        self.assertEqual(result["confidence"], 0.9)
+
+    def test_greedy_drains_surpluses_in_balance_order(self):
+        levels = {"A": 1_300_000, "B": 1_300_000, "C": 500_000}
+        transfers = LiquidityOptimizer().greedy_transfers(levels)
+        self.assertEqual(transfers, [("A", "C", 300000.0), ("B", "C", 200000.0)])
+
+    def test_min_cost_honours_corridor_costs_and_caps(self):
+        levels = {"EUR": 1_600_000, "GBP": 1_600_000, "USD": 500_000}
+        corridors = {
+            ("EUR", "USD"): {"cost": 0.001, "cap": 200_000},
+            ("GBP", "USD"): {"cost": 0.01},
+        }
+        optimizer = LiquidityOptimizer(mode="min_cost", default_corridor_cost=None)
+        result = optimizer.execute({"liquidity_levels": levels, "liquidity_corridors": corridors})
+        self.assertEqual(sorted(result["transfers"]), [("EUR", "USD", 200000.0), ("GBP", "USD", 300000.0)])
+        self.assertEqual(result["transfer_cost"], 3200.0)
+
+    def test_unknown_mode_rejected(self):
+        with self.assertRaises(ValueError):
+            LiquidityOptimizer(mode="random")
+
+
+if __name__ == "__main__":
+    unittest.main()
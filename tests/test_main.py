@@ -1,5 +1,7 @@
 import unittest
 
+from selfaware_ai_bank.agents import ColumnarPortfolio
+from selfaware_ai_bank.agents.finance import CreditBook
 from main import calculate_total_liquidity, identify_high_risk_exposures, summarize_trigger_signals
 
 
@@ -19,6 +21,15 @@ class TestMainHelpers(unittest.TestCase):
         result = identify_high_risk_exposures(context, threshold=0.05)
         self.assertEqual([item["name"] for item in result], ["B", "C"])
 
+        records = [
+            {"name": "A", "exposure": 1.0, "prob_default": 0.02, "loss_given_default": 0.5, "sector": "Energy"},
+            {"name": "B", "exposure": 2.0, "prob_default": 0.06, "loss_given_default": 0.5, "sector": "Retail"},
+        ]
+        columnar = {"credit_portfolio": ColumnarPortfolio.from_records(records)}
+        self.assertEqual(identify_high_risk_exposures(columnar, threshold=0.05), records[1:])
+        book = {"credit_portfolio": CreditBook.from_portfolio(records)}
+        self.assertEqual(identify_high_risk_exposures(book, threshold=0.05), records[1:])
+
     def test_summarize_trigger_signals(self):
         context = {"triggers": ["Fraud", "Liquidity", "Fraud"]}
         self.assertEqual(summarize_trigger_signals(context), {"Fraud": 2, "Liquidity": 1})
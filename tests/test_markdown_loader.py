@@ -0,0 +1,135 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from selfaware_ai_bank.bank_orchestrator import SelfAwareAIBank
+from selfaware_ai_bank.utils import markdown_loader
+from selfaware_ai_bank.utils.markdown_loader import MarkdownAgent, MarkdownAgentSpec, TriggerIndex, load_role_specs
+
+
+class TestMarkdownLoading(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.paths = []
+        for idx in range(6):
+            path = self.root / f"role{idx}.md"
+            path.write_text(f"# Role {idx}\nPurpose: Do thing {idx}\n- Capability {idx}\n")
+            self.paths.append(path)
+        self.cache_path = self.root / "cache" / "roles.json"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def load(self):
+        with mock.patch.object(
+            markdown_loader, "parse_role_markdown", wraps=markdown_loader.parse_role_markdown
+        ) as parser:
+            specs = load_role_specs(self.paths, cache_path=self.cache_path, max_workers=4)
+        return specs, parser.call_count
+
+    def test_parallel_load_preserves_order(self):
+        specs, parsed = self.load()
+        self.assertEqual(parsed, 6)
+        self.assertEqual([spec.name for spec in specs], [f"Role {idx}" for idx in range(6)])
+        self.assertEqual(specs[2], MarkdownAgentSpec("Role 2", "Do thing 2", ["Capability 2"]))
+
+    def test_warm_start_only_reparses_changed_files(self):
+        cold, _ = self.load()
+        warm, parsed = self.load()
+        self.assertEqual(parsed, 0)
+        self.assertEqual(warm, cold)
+
+        self.paths[3].write_text("# Renamed\nPurpose: Changed\n- New capability\n- Another\n")
+        specs, parsed = self.load()
+        self.assertEqual(parsed, 1)
+        self.assertEqual(specs[3].capabilities, ["New capability", "Another"])
+
+    def test_corrupt_cache_is_ignored(self):
+        self.cache_path.parent.mkdir(parents=True)
+        self.cache_path.write_text("{not json")
+        specs, parsed = self.load()
+        self.assertEqual(parsed, 6)
+        self.assertEqual(len(specs), 6)
+
+    def test_cache_with_unexpected_layout_is_ignored(self):
+        self.cache_path.parent.mkdir(parents=True)
+        for content in ("[]", '{"version": 1, "entries": []}', '{"version": 1, "entries": {"x": 1}}'):
+            self.cache_path.write_text(content)
+            specs, parsed = self.load()
+            self.assertEqual(parsed, 6)
+            self.assertEqual(len(specs), 6)
+
+    def test_cache_prunes_deleted_files(self):
+        self.load()
+        removed = self.paths.pop()
+        removed.unlink()
+        self.load()
+        entries = json.loads(self.cache_path.read_text())["entries"]
+        self.assertEqual(sorted(entries), sorted(str(path) for path in self.paths))
+
+    def test_cache_shared_by_two_directories_keeps_both(self):
+        first, second = self.paths[:3], self.paths[3:]
+        other = self.root / "other"
+        other.mkdir()
+        for path in second:
+            path.rename(other / path.name)
+        second = [other / path.name for path in second]
+
+        for paths in (first, second):
+            self.paths = paths
+            self.assertEqual(self.load()[1], 3)
+        for paths in (first, second, first[:1]):
+            self.paths = paths
+            self.assertEqual(self.load()[1], 0)
+        entries = json.loads(self.cache_path.read_text())["entries"]
+        self.assertEqual(sorted(entries), sorted(str(path) for path in first + second))
+
+
+class TestTriggerIndex(unittest.TestCase):
+    def setUp(self):
+        self.fraud = MarkdownAgentSpec("Fraud", "Watch", ["KYC", "Fraud Detection", "AML"]).to_agent()
+        self.ops = MarkdownAgentSpec("Ops", "Run", ["Liquidity Monitoring"]).to_agent()
+        self.idle = MarkdownAgentSpec("Idle", "Nothing", ["Unused"]).to_agent()
+
+    def test_agents_share_one_class(self):
+        self.assertIs(type(self.fraud), MarkdownAgent)
+        self.assertIs(type(self.ops), type(self.idle))
+
+    def test_match_follows_capability_order_and_omits_misses(self):
+        index = TriggerIndex()
+        for agent in (self.fraud, self.ops, self.idle):
+            index.add(agent)
+        matches = index.match(["AML", "Fraud Detection", "AML", "Liquidity Monitoring"])
+        self.assertEqual(matches, {self.fraud: ["Fraud Detection", "AML"], self.ops: ["Liquidity Monitoring"]})
+        self.assertEqual(self.fraud.match(["AML", "Fraud Detection"]), matches[self.fraud])
+
+        index.discard(self.ops)
+        self.assertNotIn(self.ops, index.match(["Liquidity Monitoring"]))
+
+    def test_bank_skips_unmatched_markdown_agents(self):
+        context = {"triggers": ["Fraud Detection", "Liquidity Monitoring"]}
+        bank = SelfAwareAIBank(context=dict(context))
+        bank.register_agents([self.fraud, self.ops, self.idle])
+        results = dict(bank.run_all())
+        self.assertEqual(list(results), ["Fraud", "Ops"])
+        self.assertEqual(results["Fraud"]["matched_capabilities"], ["Fraud Detection"])
+        self.assertEqual(results["Fraud"]["confidence"], round(0.2 + 0.8 / 3, 2))
+
+        bank = SelfAwareAIBank(context=dict(context), skip_unmatched_markdown=False)
+        bank.register_agent(self.idle)
+        self.assertEqual(bank.run_all(mode="parallel")[0][1]["matched_capabilities"], [])
+
+    def test_primed_match_only_applies_to_its_triggers(self):
+        triggers = ["AML"]
+        self.fraud.prime(["KYC", "AML"], triggers)  # deliberately not what match() would return
+        self.assertEqual(self.fraud.execute({"triggers": triggers})["matched_capabilities"], ["KYC", "AML"])
+        # A primed match left over from an earlier context is never used for a new one.
+        self.assertEqual(self.fraud.execute({"triggers": ["AML"]})["matched_capabilities"], ["AML"])
+        self.assertEqual(self.fraud.execute({"triggers": triggers})["matched_capabilities"], ["KYC", "AML"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from selfaware_ai_bank.bank_orchestrator import SelfAwareAIBank
+from selfaware_ai_bank.utils import markdown_loader
+from selfaware_ai_bank.utils.markdown_watcher import MarkdownRoleWatcher
+
+
+def write_role(path, name, capabilities):
+    lines = [f"# {name}", f"Purpose: {name} purpose"] + [f"- {cap}" for cap in capabilities]
+    path.write_text("\n".join(lines) + "\n")
+
+
+class TestMarkdownRoleWatcher(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        (self.root / "finance").mkdir()
+        write_role(self.root / "alpha.md", "Alpha", ["Fraud Detection"])
+        write_role(self.root / "finance" / "beta.md", "Beta", ["Liquidity Monitoring"])
+        self.bank = SelfAwareAIBank()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_poll_applies_added_changed_and_removed_files(self):
+        watcher = MarkdownRoleWatcher(self.bank, self.root, use_inotify=False)
+        self.assertEqual(sorted(agent.name for agent in watcher.load()), ["Alpha", "Beta"])
+        beta = self.bank.get_agent("Beta")
+
+        write_role(self.root / "alpha.md", "Alpha v2", ["Fraud Detection", "KYC"])
+        write_role(self.root / "gamma.md", "Gamma", [])
+        with mock.patch.object(
+            markdown_loader, "parse_role_markdown", wraps=markdown_loader.parse_role_markdown
+        ) as parser:
+            changes = watcher.poll()
+        # Only the two touched files are parsed; Beta is left alone.
+        self.assertEqual(parser.call_count, 2)
+        self.assertEqual(changes["added"], [self.root / "gamma.md"])
+        self.assertEqual(changes["changed"], [self.root / "alpha.md"])
+        self.assertEqual([agent.name for agent in self.bank.agents][:2], ["Alpha v2", "Beta"])
+        self.assertIs(self.bank.get_agent("Beta"), beta)
+
+        (self.root / "finance" / "beta.md").unlink()
+        self.assertEqual(watcher.poll()["removed"], [self.root / "finance" / "beta.md"])
+        self.assertIsNone(self.bank.get_agent("Beta"))
+        self.assertEqual(self.bank.introspection.analyze_performance()["agents_tracked"], 2)
+
+    def test_unreadable_file_keeps_previous_agent(self):
+        watcher = MarkdownRoleWatcher(self.bank, self.root, use_inotify=False)
+        watcher.load()
+        alpha = self.bank.get_agent("Alpha")
+
+        (self.root / "alpha.md").write_bytes(b"# Alpha\n\xff\xfe broken\n")
+        write_role(self.root / "gamma.md", "Gamma", [])
+        with self.assertLogs("selfaware_ai_bank.utils.markdown_watcher", "ERROR"):
+            changes = watcher.poll()
+        self.assertEqual(changes["failed"], [self.root / "alpha.md"])
+        self.assertEqual(changes["added"], [self.root / "gamma.md"])
+        self.assertIs(self.bank.get_agent("Alpha"), alpha)
+        # The same broken version is not retried (or logged) on every poll.
+        self.assertEqual(watcher.poll()["failed"], [])
+
+        write_role(self.root / "alpha.md", "Alpha fixed", ["KYC"])
+        self.assertEqual(watcher.poll()["changed"], [self.root / "alpha.md"])
+        self.assertIsNone(self.bank.get_agent("Alpha"))
+        self.assertIsNotNone(self.bank.get_agent("Alpha fixed"))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_background_watcher_picks_up_new_file(self):
+        watcher = MarkdownRoleWatcher(self.bank, self.root, interval=0.05)
+        watcher.start()
+        try:
+            self.assertEqual(sorted(agent.name for agent in self.bank.agents), ["Alpha", "Beta"])
+            write_role(self.root / "finance" / "delta.md", "Delta", ["Stress"])
+            deadline = time.monotonic() + 5
+            while self.bank.get_agent("Delta") is None and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            watcher.stop()
+        self.assertIsNotNone(self.bank.get_agent("Delta"))
+        self.assertFalse(watcher.running)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import csv
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from selfaware_ai_bank.agents import CreditRiskAnalyzer, PortfolioSource, StressTester
+from selfaware_ai_bank.agents.finance import ingest
+from selfaware_ai_bank.agents.finance.ingest import iter_portfolio_chunks, load_liquidity_levels
+from selfaware_ai_bank.core.memo import fingerprint
+
+
+def make_portfolio(size, seed=11):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Exposure-{idx}",
+            "exposure": rng.uniform(10_000, 5_000_000),
+            "prob_default": rng.uniform(0.0, 0.3),
+            "loss_given_default": rng.uniform(0.1, 0.9),
+        }
+        for idx in range(size)
+    ]
+
+
+class TestPortfolioIngest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.records = make_portfolio(103)
+
+        self.csv_path = self.root / "portfolio.csv"
+        with open(self.csv_path, "w", newline="") as handle:
+            writer = csv.DictWriter(handle, fieldnames=["name", "exposure", "prob_default", "loss_given_default"])
+            writer.writeheader()
+            writer.writerows(self.records)
+
+        self.jsonl_path = self.root / "portfolio.jsonl"
+        self.jsonl_path.write_text("".join(json.dumps(record) + "\n" for record in self.records))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_chunks_round_trip_both_formats(self):
+        for path in (self.csv_path, self.jsonl_path):
+            chunks = list(iter_portfolio_chunks(path, chunk_rows=10))
+            self.assertEqual([len(chunk) for chunk in chunks], [10] * 10 + [3])
+            self.assertEqual([row for chunk in chunks for row in chunk.to_records()], self.records)
+        with self.assertRaises(ValueError):
+            list(iter_portfolio_chunks(self.root / "portfolio.xlsx"))
+
+    def test_chunked_agents_match_in_memory_results(self):
+        source = PortfolioSource(self.csv_path, chunk_rows=16)
+        for agent in (CreditRiskAnalyzer(), StressTester(probability_uplift=0.8)):
+            streamed = agent.execute({"credit_portfolio": source, "liquidity_levels": {}})
+            in_memory = agent.execute({"credit_portfolio": self.records, "liquidity_levels": {}})
+            self.assertEqual(streamed, in_memory)
+
+    def test_attribute_columns_stream_into_breakdowns(self):
+        path = self.root / "segmented.csv"
+        with open(path, "w", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["name", "exposure", "prob_default", "loss_given_default", "sector", "currency"])
+            writer.writerow(["A", 100, 0.1, 0.5, "Energy", "USD"])
+            writer.writerow(["B", 200, 0.2, 0.5, "", "EUR"])
+            writer.writerow(["C", 300, 0.1, 0.5, "Energy", "USD"])
+        chunks = list(iter_portfolio_chunks(path, chunk_rows=2))
+        self.assertEqual(chunks[0].attributes, {"sector": ["Energy", None], "currency": ["USD", "EUR"]})
+        self.assertNotIn("sector", chunks[0].to_records()[1])
+
+        analyzer = CreditRiskAnalyzer(breakdowns=(("sector", "currency"),))
+        result = analyzer.execute({"credit_portfolio": PortfolioSource(path, chunk_rows=2)})
+        self.assertEqual(
+            result["breakdowns"]["sector+currency"],
+            [
+                {"sector": "Energy", "currency": "USD", "rows": 2, "exposure": 400.0, "expected_loss": 20.0},
+                {"sector": None, "currency": "EUR", "rows": 1, "exposure": 200.0, "expected_loss": 20.0},
+            ],
+        )
+
+    def test_max_flags_caps_listing_not_count(self):
+        analyzer = CreditRiskAnalyzer(max_flags=5)
+        result = analyzer.execute({"credit_portfolio": PortfolioSource(self.jsonl_path, chunk_rows=8)})
+        flagged = [record for record in self.records if record["prob_default"] >= 0.05]
+        self.assertEqual([flag["name"] for flag in result["high_risk_exposures"]], [r["name"] for r in flagged[:5]])
+        self.assertEqual(analyzer.state.notes["high_risk_count"], len(flagged))
+
+        tester = StressTester(probability_uplift=1.0, max_flags=3)
+        stressed = tester.execute({"credit_portfolio": PortfolioSource(self.csv_path, chunk_rows=8)})
+        flagged = [record for record in self.records if min(1.0, record["prob_default"] * 2) >= 0.2]
+        self.assertEqual([flag["name"] for flag in stressed["stressed_high_risk"]], [r["name"] for r in flagged[:3]])
+        self.assertEqual(stressed["stressed_high_risk_count"], len(flagged))
+
+    def test_bad_numbers_name_the_file_row_and_column(self):
+        lines = self.csv_path.read_text().splitlines()
+        lines[13] = "Broken,12x,0.1,0.5"
+        self.csv_path.write_text("\n".join(lines) + "\n")
+        with self.assertRaisesRegex(ValueError, r"portfolio\.csv: row 13: invalid exposure value '12x'"):
+            list(iter_portfolio_chunks(self.csv_path, chunk_rows=5))
+
+        path = self.root / "liquidity.jsonl"
+        path.write_text('{"account": "USD", "balance": 1}\n{"account": "EUR", "balance": "n/a"}\n')
+        with self.assertRaisesRegex(ValueError, r"row 2: invalid balance value 'n/a'"):
+            load_liquidity_levels(path)
+
+    def test_source_fingerprint_tracks_file_changes(self):
+        source = PortfolioSource(self.jsonl_path)
+        before = fingerprint(source)
+        self.assertEqual(fingerprint(source), before)
+        with open(self.jsonl_path, "a") as handle:
+            handle.write(json.dumps(self.records[0]) + "\n")
+        self.assertNotEqual(fingerprint(source), before)
+
+    def test_liquidity_levels_sum_repeated_accounts(self):
+        path = self.root / "liquidity.csv"
+        path.write_text("account,balance\nUSD,100\nEUR,250.5\nUSD,50\n")
+        self.assertEqual(load_liquidity_levels(path, chunk_rows=2), {"USD": 150.0, "EUR": 250.5})
+
+    @unittest.skipIf(ingest._parquet is None, "pyarrow is not installed")
+    def test_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = self.root / "portfolio.parquet"
+        pq.write_table(pa.Table.from_pylist(self.records), path)
+        chunks = list(iter_portfolio_chunks(path, chunk_rows=50))
+        self.assertEqual([row for chunk in chunks for row in chunk.to_records()], self.records)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from selfaware_ai_bank.bank_orchestrator import RunRecord, SelfAwareAIBank
+from selfaware_ai_bank.core.base_agent import BaseAgent
+from selfaware_ai_bank.core.run_log import RunLogReader, RunLogWriter
+
+
+class EchoAgent(BaseAgent):
+    def __init__(self, name):
+        super().__init__(name=name, category="Test", purpose="Testing")
+
+    def execute(self, context):
+        return {"status": "success", "confidence": 0.75}
+
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_record(idx):
+    timestamp = BASE_TIME + timedelta(minutes=idx)
+    return RunRecord(
+        f"Agent{idx % 3}",
+        int(timestamp.timestamp()) * 1_000_000_000,
+        {"value": idx, "transfers": [("EUR", "USD", 1.5)], "confidence": 0.5},
+    )
+
+
+class TestRunLog(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_rotation_and_replay(self):
+        with RunLogWriter(self.directory, segment_bytes=256, fsync_every=4) as writer:
+            for idx in range(10):
+                writer.append(make_record(idx))
+        with RunLogWriter(self.directory) as writer:
+            writer.append(make_record(10))
+
+        reader = RunLogReader(self.directory)
+        self.assertGreater(len(reader.segments()), 2)
+        records = list(reader.replay())
+        self.assertEqual([record.output["value"] for record in records], list(range(11)))
+        self.assertEqual(records[3].timestamp, BASE_TIME + timedelta(minutes=3))
+        self.assertEqual(records[0].output["transfers"], [["EUR", "USD", 1.5]])
+
+    def test_time_range_query(self):
+        with RunLogWriter(self.directory) as writer:
+            for idx in range(10):
+                writer.append(make_record(idx))
+
+        window = RunLogReader(self.directory).query(
+            start=BASE_TIME + timedelta(minutes=2), end=BASE_TIME + timedelta(minutes=5)
+        )
+        self.assertEqual([record.output["value"] for record in window], [2, 3, 4])
+
+    def test_torn_tail_is_ignored(self):
+        with RunLogWriter(self.directory) as writer:
+            for idx in range(3):
+                writer.append(make_record(idx))
+        segment = RunLogReader(self.directory).segments()[0]
+        data = segment.read_bytes()
+        segment.write_bytes(data[:-5])
+
+        self.assertEqual([record.output["value"] for record in RunLogReader(self.directory).replay()], [0, 1])
+
+    def test_bank_sink(self):
+        with RunLogWriter(self.directory) as writer:
+            bank = SelfAwareAIBank(run_sink=writer)
+            bank.register_agents([EchoAgent("Agent1"), EchoAgent("Agent2")])
+            bank.update_context(triggers=["Fraud"])
+            bank.run_all()
+
+        records = list(RunLogReader(self.directory).replay())
+        self.assertEqual([record.agent for record in records], ["Agent1", "Agent2"])
+        self.assertEqual(records[0].confidence, 0.75)
+        self.assertEqual(records[0].context_version, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
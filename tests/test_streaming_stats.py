@@ -0,0 +1,93 @@
+import random
+import statistics
+import unittest
+
+from selfaware_ai_bank.bank_orchestrator import SelfAwareAIBank
+from selfaware_ai_bank.core.base_agent import BaseAgent
+from selfaware_ai_bank.core.streaming_stats import EWMA, P2Quantile, RollingWindow, TimeWindow, Welford
+
+
+class ScriptedAgent(BaseAgent):
+    def __init__(self, confidences):
+        super().__init__(name="Scripted", category="Test", purpose="Testing")
+        self._confidences = iter(confidences)
+
+    def execute(self, context):
+        return {"confidence": next(self._confidences)}
+
+
+class TestAccumulators(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.values = [rng.random() for _ in range(2_000)]
+
+    def test_welford_matches_statistics(self):
+        welford = Welford()
+        for value in self.values:
+            welford.update(value)
+        self.assertAlmostEqual(welford.mean, statistics.mean(self.values))
+        self.assertAlmostEqual(welford.stddev, statistics.stdev(self.values))
+
+    def test_rolling_window_tracks_last_values(self):
+        window = RollingWindow(size=100)
+        for value in self.values:
+            window.update(value)
+        tail = self.values[-100:]
+        self.assertEqual(len(window), 100)
+        self.assertAlmostEqual(window.mean, statistics.mean(tail))
+        self.assertAlmostEqual(window.stddev, statistics.stdev(tail))
+        self.assertAlmostEqual(window.percentiles([0.5])[0.5], statistics.median(tail))
+
+    def test_rolling_window_does_not_drift_on_long_streams(self):
+        window = RollingWindow(size=10)
+        for step in range(50000):
+            window.update(1e8 + (step % 7) * 1e-3)
+        tail = [1e8 + (step % 7) * 1e-3 for step in range(49990, 50000)]
+        self.assertAlmostEqual(window.stddev, statistics.stdev(tail), places=6)
+
+        constant = TimeWindow(seconds=5)
+        for step in range(20000):
+            constant.update(1e6 + 0.1, now=float(step))
+        self.assertEqual(constant.stats(now=19999.0)["stddev"], 0.0)
+
+    def test_p2_quantile_estimates_median(self):
+        estimator = P2Quantile(0.5)
+        for value in self.values:
+            estimator.update(value)
+        self.assertAlmostEqual(estimator.value, statistics.median(self.values), delta=0.03)
+
+    def test_time_window_and_ewma(self):
+        window = TimeWindow(seconds=60)
+        window.update(1.0, now=0.0)
+        window.update(0.0, now=30.0)
+        self.assertEqual(window.stats(now=30.0)["mean"], 0.5)
+        self.assertEqual(window.stats(now=75.0), {"count": 1, "mean": 0.0, "stddev": None})
+
+        ewma = EWMA(alpha=0.5)
+        for value in (1.0, 0.0, 0.0):
+            ewma.update(value)
+        self.assertEqual(ewma.value, 0.25)
+
+
+class TestIntrospectionMetrics(unittest.TestCase):
+    def test_degrading_agent_detected(self):
+        bank = SelfAwareAIBank()
+        agent = ScriptedAgent([0.9] * 10 + [0.3] * 3 + [0.9] * 20)
+        bank.register_agent(agent)
+
+        for _ in range(13):
+            bank.run_agent(agent)
+        self.assertEqual(bank.introspection.analyze_performance()["degrading_agents"], ["Scripted"])
+        metrics = bank.introspection.agent_metrics("Scripted")
+        self.assertEqual(metrics["count"], 13)
+        self.assertEqual(metrics["latest"], 0.3)
+        self.assertEqual(metrics["rolling"]["count"], 13)
+
+        for _ in range(20):
+            bank.run_agent(agent)
+        self.assertEqual(bank.introspection.degrading_agents(), [])
+        self.assertIsNone(bank.introspection.agent_metrics("Missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()